@@ -0,0 +1,259 @@
+#!/usr/bin/python3
+
+"""
+Benchmark suite of the VCD / eVCD parsers.
+
+    python run_benchmarks.py run --cases small medium -o results.json
+    python run_benchmarks.py compare baseline.json results.json --threshold 0.1
+
+`run` generates (and caches) deterministic synthetic dumps and measures, per dump, the parse and
+streaming throughput (MB/s), the peak RSS of a full parse, and the mean latency of `get_signal` and
+of every `find_*` query. Every measurement runs in a fresh process, so peak RSS is not polluted by
+the previous ones. `compare` reports the relative change of every metric between two result files
+and exits with status 1 if any of them regressed more than the threshold.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import platform
+import resource
+import tempfile
+import multiprocessing as mp
+
+from dataclasses import asdict, replace
+from os.path     import dirname, join, abspath, isfile, getsize
+from typing      import Callable, Dict, List
+
+sys.path.insert(0, join(dirname(abspath(__file__)), "../src/"))
+
+from vcd_generator import GeneratorConfig, generate
+
+# The synthetic dumps of each case; multi-GB cases are built with --size-mb
+CASES = {
+    "small"     : GeneratorConfig(signals = 1000,  duration = 5000),
+    "medium"    : GeneratorConfig(signals = 5000,  duration = 20000, depth = 4),
+    "large"     : GeneratorConfig(signals = 20000, size_mb = 1024, depth = 5),
+    "small-evcd": GeneratorConfig(signals = 500,   duration = 5000, extended = True),
+}
+
+QUERY_SIGNALS = 10 # signals per batch query
+
+def dump_file(workdir : str, name : str, config : GeneratorConfig) -> str:
+
+    """The (cached) synthetic dump of a case; the file name holds a hash of its configuration."""
+
+    digest   = hashlib.sha1(json.dumps(asdict(config), sort_keys = True).encode()).hexdigest()[:12]
+    filename = join(workdir, f"{name}-{digest}.vcd")
+
+    if not isfile(filename):
+        generate(filename + ".tmp", config)
+        os.replace(filename + ".tmp", filename)
+
+    return filename
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux, in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+def _parser_class(extended : bool):
+
+    if extended:
+        from EVCD_Parser import EVCD_Parser
+        return EVCD_Parser
+
+    from SVCD_Parser import SVCD_Parser
+    return SVCD_Parser
+
+def _timed(function : Callable, repeats : int) -> float:
+
+    """Mean wall time of `function()`, in microseconds."""
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def measure_parse(filename : str, extended : bool) -> Dict[str, float]:
+
+    """Worker: full parse throughput and peak RSS."""
+
+    Parser = _parser_class(extended)
+    size   = getsize(filename) / (1 << 20)
+
+    start  = time.perf_counter()
+    Parser(filename)
+    elapsed = time.perf_counter() - start
+
+    return { "parse_s" : elapsed, "parse_mb_s" : size / elapsed, "parse_peak_rss_mb" : _peak_rss_mb() }
+
+def measure_stream(filename : str, extended : bool) -> Dict[str, float]:
+
+    """Worker: single-pass tokenizer throughput (streaming mode, nothing kept) and peak RSS."""
+
+    from _Tokenizer import ValueChangeConsumer
+
+    Parser = _parser_class(extended)
+    size   = getsize(filename) / (1 << 20)
+
+    start  = time.perf_counter()
+    Parser(filename, streaming = True).feed(ValueChangeConsumer())
+    elapsed = time.perf_counter() - start
+
+    return { "stream_mb_s" : size / elapsed, "stream_peak_rss_mb" : _peak_rss_mb() }
+
+def measure_queries(filename : str, extended : bool, seed : int = 1) -> Dict[str, float]:
+
+    """Worker: mean latency (us) of `get_signal` and of the `find_*` queries, on random signals."""
+
+    Parser  = _parser_class(extended)
+    rng     = random.Random(seed)
+    results = dict()
+
+    start  = time.perf_counter()
+    Lazy   = Parser(filename, lazy = True)
+    results["header_s"] = time.perf_counter() - start
+
+    paths   = list(Lazy.hierarchy.paths)
+    sampled = rng.sample(paths, min(QUERY_SIGNALS, len(paths)))
+    partial = ["/".join(path.split("/")[-2:]) for path in sampled]
+
+    results["get_signal_us"]         = _timed(lambda : [Lazy.get_signal(path) for path in paths[:1000]], 1) / min(1000, len(paths))
+    results["get_signal_partial_us"] = _timed(lambda : [Lazy.get_signal(path) for path in partial], 10) / len(partial)
+
+    # single filtered pass over the file, nothing loaded
+    results["find_signals_histories_lazy_us"] = _timed(lambda : Lazy.find_signals_histories(sampled), 1)
+
+    Loaded = Parser(filename)
+    times  = Loaded.changes.timestamps
+    points = [times[rng.randrange(len(times))] for _ in range(100)]
+    start, end = times[len(times) // 4], times[len(times) // 2]
+    signal = sampled[0]
+
+    results["find_signal_values_at_us"]        = _timed(lambda : [Loaded.find_signal_values_at(at, signal) for at in points], 1) / len(points)
+    results["find_signal_values_at_region_us"] = _timed(lambda : Loaded.find_signal_values_at_region(start, end, signal), 5)
+    results["find_all_signal_values_us"]       = _timed(lambda : Loaded.find_all_signal_values(signal), 3)
+    results["find_signals_histories_us"]       = _timed(lambda : Loaded.find_signals_histories(sampled), 3)
+    results["find_signals_values_at_region_us"] = _timed(lambda : Loaded.find_signals_values_at_region(sampled, start, end, proc_num = 1), 3)
+
+    if extended:
+        results["find_signals_ports_us"] = _timed(lambda : Loaded.find_signals_ports(sampled), 3)
+    else:
+        results["find_signal_initial_value_us"] = _timed(lambda : [Loaded.find_signal_initial_value(path) for path in sampled], 3) / len(sampled)
+        try:
+            results["find_signals_arrays_us"] = _timed(lambda : Loaded.find_signals_arrays(sampled), 3)
+        except ImportError:
+            pass # optional NumPy
+
+    return results
+
+def _isolated(function : Callable, *args) -> Dict[str, float]:
+
+    """Runs a measurement in a fresh (spawned) process."""
+
+    with mp.get_context("spawn").Pool(1) as pool:
+        return pool.apply(function, args)
+
+def run(cases : List[str], workdir : str, size_mb : float = None) -> Dict[str, object]:
+
+    """Measures every case; returns the JSON serializable results."""
+
+    results = dict()
+
+    for name in cases:
+
+        config = CASES[name] if size_mb is None else replace(CASES[name], size_mb = size_mb)
+        filename = dump_file(workdir, name, config)
+        print(f"{name} : {filename} ({getsize(filename) / (1 << 20):.1f} MB)", file = sys.stderr)
+
+        case = { "file_mb" : getsize(filename) / (1 << 20) }
+        case.update(_isolated(measure_parse, filename, config.extended))
+        case.update(_isolated(measure_stream, filename, config.extended))
+        case.update(_isolated(measure_queries, filename, config.extended))
+        results[name] = case
+
+    return {
+        "meta" : {
+            "date"     : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python"   : platform.python_version(),
+            "platform" : platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results" : results
+    }
+
+def higher_is_better(metric : str) -> bool:
+    return metric.endswith("_mb_s")
+
+def compare(baseline : Dict[str, object], current : Dict[str, object], threshold : float) -> List[str]:
+
+    """Prints the relative change of every common metric; returns the regressed `case/metric`s."""
+
+    regressions = list()
+
+    print(f"{'case/metric':<50} {'baseline':>12} {'current':>12} {'change':>8}")
+
+    for name, metrics in current["results"].items():
+
+        for metric, value in metrics.items():
+
+            old = baseline["results"].get(name, dict()).get(metric)
+            if old is None or metric == "file_mb" or not old:
+                continue
+
+            change = (value - old) / old
+            worse  = -change if higher_is_better(metric) else change
+            flag   = " !" if worse > threshold else ""
+
+            print(f"{name + '/' + metric:<50} {old:>12.3f} {value:>12.3f} {change:>+8.1%}{flag}")
+
+            if flag:
+                regressions.append(f"{name}/{metric}")
+
+    return regressions
+
+def main():
+
+    arguments = argparse.ArgumentParser(description = "Benchmark suite of the VCD / eVCD parsers.")
+    commands  = arguments.add_subparsers(dest = "command", required = True)
+
+    run_command = commands.add_parser("run", help = "Measure the parsers on synthetic dumps")
+    run_command.add_argument("--cases", nargs = "+", default = ["small", "small-evcd"], choices = list(CASES))
+    run_command.add_argument("--size-mb", type = float, help = "Override the size of the dumps (e.g., 4096)")
+    run_command.add_argument("--workdir", default = join(tempfile.gettempdir(), "vcd-py-benchmarks"), help = "Cache of the generated dumps")
+    run_command.add_argument("-o", "--output", help = "The JSON results (stdout by default)")
+
+    compare_command = commands.add_parser("compare", help = "Compare two result files")
+    compare_command.add_argument("baseline")
+    compare_command.add_argument("current")
+    compare_command.add_argument("--threshold", type = float, default = 0.1, help = "Tolerated relative regression")
+
+    options = arguments.parse_args()
+
+    if options.command == "run":
+
+        os.makedirs(options.workdir, exist_ok = True)
+        results = json.dumps(run(options.cases, options.workdir, options.size_mb), indent = 2)
+
+        if options.output:
+            with open(options.output, "w") as OUTFILE:
+                OUTFILE.write(results + "\n")
+        else:
+            print(results)
+
+    else:
+
+        with open(options.baseline) as BASEFILE, open(options.current) as CURRENTFILE:
+            regressions = compare(json.load(BASEFILE), json.load(CURRENTFILE), options.threshold)
+
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {options.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
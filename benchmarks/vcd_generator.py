@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+
+"""
+Deterministic synthetic VCD / eVCD ($dumpports) generator for the benchmark suite.
+
+The same parameters (and seed) always produce the same file, so results of different
+runs and versions are comparable. Files are written in a streaming fashion, so sizes of
+several GB only cost disk space.
+"""
+
+import random
+import argparse
+
+from dataclasses import dataclass, field, asdict
+from itertools   import count
+from typing      import List, TextIO, Tuple
+
+ID_CHARS     = [chr(code) for code in range(33, 127)] # printable ASCII, as simulators use
+BUFFER_LINES = 1 << 16
+
+@dataclass
+class GeneratorConfig():
+
+    """
+    Attributes:
+        extended (bool) : Write an eVCD ($dumpports) file instead of a standard VCD.
+        depth (int) : The depth of the $scope hierarchy.
+        fanout (int) : The number of nested $scopes per $scope.
+        signals (int) : The number of $vars, spread over the leaf $scopes.
+        bus_widths (List[int]) : The $var widths, assigned round-robin (1 is a scalar).
+        toggle_density (float) : The fraction of the $vars that change at every timestamp.
+        duration (int) : The number of timestamps (ignored if `size_mb` is given).
+        period (int) : The time between timestamps.
+        size_mb (float) : Write timestamps until the file reaches that size (0 : write `duration` timestamps).
+        seed (int) : The random seed.
+    """
+
+    extended       : bool      = False
+    depth          : int       = 3
+    fanout         : int       = 2
+    signals        : int       = 1000
+    bus_widths     : List[int] = field(default_factory = lambda : [1, 1, 1, 8, 32])
+    toggle_density : float     = 0.1
+    duration       : int       = 10000
+    period         : int       = 10
+    size_mb        : float     = 0
+    seed           : int       = 1
+
+def identifier(index : int) -> str:
+
+    """The index-th short VCD identifier (base 94 over the printable ASCII characters)."""
+
+    id = ID_CHARS[index % len(ID_CHARS)]
+    index //= len(ID_CHARS)
+
+    while index:
+        index -= 1
+        id += ID_CHARS[index % len(ID_CHARS)]
+        index //= len(ID_CHARS)
+
+    return id
+
+def leaf_scopes(config : GeneratorConfig) -> List[Tuple[str, ...]]:
+
+    """The paths (tuples of cell names) of the leaf $scopes."""
+
+    paths = [("top",)]
+
+    for level in range(1, config.depth):
+        paths = [path + (f"u{level}_{child}",) for path in paths for child in range(config.fanout)]
+
+    return paths
+
+class _Generator():
+
+    def __init__(self, config : GeneratorConfig, OUTFILE : TextIO):
+
+        self.config  = config
+        self.OUTFILE = OUTFILE
+        self.random  = random.Random(config.seed)
+        self.buffer  = list()
+        self.written = 0
+
+        self.widths  = [config.bus_widths[index % len(config.bus_widths)] for index in range(config.signals)]
+        self.ids     = [(f"<{index}" if config.extended else identifier(index)) for index in range(config.signals)]
+
+    def _write(self, line : str) -> None:
+
+        self.buffer.append(line)
+
+        if len(self.buffer) >= BUFFER_LINES:
+            self.flush()
+
+    def flush(self) -> None:
+
+        if self.buffer:
+            chunk = "\n".join(self.buffer) + "\n"
+            self.OUTFILE.write(chunk)
+            self.written += len(chunk)
+            self.buffer.clear()
+
+    def _value(self, index : int) -> str:
+
+        width = self.widths[index]
+        bits  = self.random.getrandbits(width)
+
+        # a few unknown values, as in real dumps
+        unknown = self.random.random() < 0.01
+
+        if self.config.extended:
+            states = "N" * width if unknown else "".join("DU"[(bits >> bit) & 1] for bit in reversed(range(width)))
+            return f"p{states} {'6' * width} {'6' * width} {self.ids[index]}"
+
+        if width == 1:
+            return f"{'x' if unknown else bits}{self.ids[index]}"
+
+        return f"b{'x' if unknown else format(bits, 'b')} {self.ids[index]}"
+
+    def header(self) -> None:
+
+        config = self.config
+
+        self._write("$date\n\tsynthetic\n$end")
+        self._write("$version\n\tvcd-py benchmark generator\n$end")
+        self._write(f"$comment\n\t{asdict(config)}\n$end")
+        self._write("$timescale\n\t1ns\n$end")
+
+        leaves   = leaf_scopes(config)
+        per_leaf = -(-config.signals // len(leaves))
+        open_path = tuple()
+
+        for leaf, path in enumerate(leaves):
+
+            # close and open the scopes that differ from the previous leaf
+            common = 0
+            while common < min(len(open_path), len(path)) and open_path[common] == path[common]:
+                common += 1
+
+            for _ in range(len(open_path) - common):
+                self._write("$upscope $end")
+
+            for name in path[common:]:
+                self._write(f"$scope module {name} $end")
+
+            open_path = path
+
+            for index in range(leaf * per_leaf, min((leaf + 1) * per_leaf, config.signals)):
+                width = self.widths[index]
+                if config.extended:
+                    size = "1" if width == 1 else f"[{width - 1}:0]"
+                    self._write(f"$var port {size} {self.ids[index]} sig_{index} $end")
+                else:
+                    self._write(f"$var wire {width} {self.ids[index]} sig_{index} $end")
+
+        for _ in open_path:
+            self._write("$upscope $end")
+
+        self._write("$enddefinitions $end")
+
+    def value_changes(self) -> None:
+
+        config  = self.config
+        limit   = int(config.size_mb * (1 << 20))
+        toggles = max(1, int(config.toggle_density * config.signals))
+
+        self._write("#0")
+        self._write("$dumpports" if config.extended else "$dumpvars")
+        for index in range(config.signals):
+            self._write(self._value(index))
+        self._write("$end")
+
+        for step in (count(1) if limit else range(1, config.duration)):
+
+            self._write(f"#{step * config.period}")
+
+            for index in self.random.sample(range(config.signals), toggles):
+                self._write(self._value(index))
+
+            if limit and self.written >= limit:
+                break
+
+def generate(filename : str, config : GeneratorConfig) -> int:
+
+    """
+    Writes a synthetic VCD (or eVCD) file.
+
+    Parameters:
+        filename (str) : The path of the file.
+        config (GeneratorConfig) : The shape of the file.
+
+    Returns:
+        int : The size of the file in bytes.
+    """
+
+    with open(filename, "w") as VCDFILE:
+        generator = _Generator(config, VCDFILE)
+        generator.header()
+        generator.value_changes()
+        generator.flush()
+        return generator.written
+
+def main():
+
+    arguments = argparse.ArgumentParser(description = "Writes a deterministic synthetic VCD / eVCD file.")
+    arguments.add_argument("filename")
+    arguments.add_argument("--extended", action = "store_true", help = "Write an eVCD ($dumpports) file")
+    arguments.add_argument("--depth", type = int, default = GeneratorConfig.depth)
+    arguments.add_argument("--fanout", type = int, default = GeneratorConfig.fanout)
+    arguments.add_argument("--signals", type = int, default = GeneratorConfig.signals)
+    arguments.add_argument("--bus-widths", type = int, nargs = "+", default = [1, 1, 1, 8, 32])
+    arguments.add_argument("--toggle-density", type = float, default = GeneratorConfig.toggle_density)
+    arguments.add_argument("--duration", type = int, default = GeneratorConfig.duration)
+    arguments.add_argument("--period", type = int, default = GeneratorConfig.period)
+    arguments.add_argument("--size-mb", type = float, default = GeneratorConfig.size_mb, help = "Stop at that size (e.g., 4096 for a 4 GB file)")
+    arguments.add_argument("--seed", type = int, default = GeneratorConfig.seed)
+    options = vars(arguments.parse_args())
+
+    filename = options.pop("filename")
+    size = generate(filename, GeneratorConfig(**options))
+    print(f"{filename} : {size / (1 << 20):.1f} MB")
+
+if __name__ == "__main__":
+    main()
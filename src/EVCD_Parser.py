@@ -1,71 +1,110 @@
 from dataclasses import dataclass
 from VCD_Parser import VCD_Parser 
-from utils import Section, VCD_Type 
+from utils import VCD_Type 
 
-import re
 import multiprocessing as mp
 
 from _Var        import _Var   as Var
 from _Scope      import _Scope as Scope
 from typing      import Tuple, List, Dict
+from io          import TextIOWrapper
+from _DumpFile   import open_dump
+from _PortValues import _PortHistory as PortHistory, decode_port_changes, decode_port_history
+from _ParseStats import ProgressObserver
 
 class EVCD_Parser(VCD_Parser):
 
-    def __init__(self, vcd_filename : str, sig_file : str = None):
-        super().__init__(vcd_filename, VCD_Type.Extended,  sig_file = sig_file)
+    def __init__(self, vcd_filename : str, sig_file : str = None, streaming : bool = False, index : bool = False, lazy : bool = False, filtered : bool = False, follow : bool = False, progress : ProgressObserver = None):
+        super().__init__(vcd_filename, VCD_Type.Extended, sig_file = sig_file, streaming = streaming, index = index, lazy = lazy, filtered = filtered, follow = follow, progress = progress)
 
     def find_all_signal_values(self, signal_name: str) -> List[str]: 
 
-        retvals = list()
+        return self.find_all_signals_values([signal_name])[signal_name]
 
-        extract_value = lambda section, signal_size, index : section[index - 3*signal_size : index - 2*signal_size]
+    def find_all_signals_values(self, signals : List[str]) -> Dict[str, List[str]]:
+
+        # keep the port state only i.e., p<state> of p<state> <strength0> <strength1> <id>
+        return { 
+            signal : [value.partition(' ')[0] if value is not None else None for value in values] 
+            for signal, values in super().find_all_signals_values(signals).items() 
+        }
+
+    def find_signals_ports(self, signals : List[str]) -> Dict[str, PortHistory]:
+
+        """
+        Decodes the port changes of many signals into typed parallel arrays: per change and bit, 
+        the state code (see `_PortValues.PORT_STATES`) and the two strength components. If the 
+        value changes are not loaded, a single linear pass over the file decodes all of them.
+
+        Parameters: 
+            signals (List[str]) : The hierarchical port names.
+        
+        Returns: 
+            Dict[str, PortHistory] : Per port, its _PortHistory.
+        """
+
+        ports = { signal : self.get_signal(signal) for signal in signals }
+
+        if self._loaded:
+            return { signal : decode_port_history(port.get_size(), *self._changes.history(port.get_id())) for signal, port in ports.items() }
+
+        with open_dump(self.vcd_filename) as VCDFILE:
+            VCDFILE.seek(self.value_change_offset)
+            histories = decode_port_changes(TextIOWrapper(VCDFILE), { port.get_id() : port.get_size() for port in ports.values() })
+
+        return { signal : histories[port.get_id()] for signal, port in ports.items() }
+
+    def find_signal_values_at(self, at : int, signal_name : str) -> str:
+
+        """
+        The port state in effect at timestamp `at`, found by bisection on the port's changes.
+
+        Parameters: 
+            at (int) : A timestamp of the file.
+            signal_name (str) : The hierarchical port name.
+        
+        Returns: 
+            str : The state of the port (e.g., `D`, `UDUD`).
+        """
+
+        if not self.changes.has_timestamp(at): 
+            raise KeyError(f"Timestamp {at} is not present in the VCD")
 
-        value_change = '\n'.join(self.raw_sections[Section.Value_Change])
-        timestamp_regex = r"\#[0-9]+\n"
-   
         signal = self.get_signal(signal_name)
-        signal_id = signal.get_id()
-        signal_size = signal.get_size()
-
-        # can also be done with re.finditer
-        sections = [
-            re.sub(r"\s+", r"", section,flags= re.DOTALL | re.MULTILINE)  \
-            for section in re.split(timestamp_regex, value_change, maxsplit=0, flags=re.DOTALL|re.MULTILINE)
-        ]
-     
-        previous_value = None 
-
-        for n, section in enumerate(sections): 
-            
-            if not section: continue 
-
-            in_section = section.find(signal_id)
-
-            # For both VCDs that have either #0...$dumpvars or $dumpvars...$end...#0
-            if n == 1 and (not sections[n-1]) or \
-               n == 0 and sections[n]: 
-
-                # that's the $dumpvars section i.e., initial value
-                previous_value = extract_value(section, signal_size, in_section)
-                
-  
-            if in_section == -1:
-                # signal's value didn't change in current section 
-                retvals.append(previous_value)
-                continue
-            
-            # search for multiple signal changes occuring in the section
-            while(in_section != -1):
-
-                previous_value = extract_value(section, signal_size, in_section)
-                retvals.append(extract_value(section, signal_size, in_section))
-
-                in_section = section.find(signal_id, in_section + 1)
-
-        return retvals 
-
-    def find_signal_values_at(self, start : int, end : int, signal_name : str) -> List[str]:
-        raise NotImplementedError("Soon...")
+
+        value = self.changes.value_at(signal.get_id(), at)
+
+        if value is None: 
+            raise RuntimeError(f"Signal {signal_name} : {signal} has never been assigned a value up until the region {at} you are currently searching")
+
+        return value.partition(' ')[0]
+
+    def find_signal_values_at_region(self, start : int, end : int, signal_name : str) -> List[str]:
+
+        return self.find_signals_values_at_region([signal_name], start, end)[signal_name]
+
+    def find_signals_values_at_region(self, signals : List[str], start : int, end : int, proc_num : int = mp.cpu_count()) -> Dict[str, List[str]]:
+
+        """
+        The port states of the changes with `start <= timestamp < end`, found by bisection on each port's changes.
+
+        Parameters: 
+            signals (List[str]) : The hierarchical port names.
+            start (int) : A timestamp of the file.
+            end (int) : A timestamp of the file.
+            proc_num (int) : Same signature as SVCD_Parser; the bisections are cheap enough to run in-process.
+        
+        Returns: 
+            Dict[str, List[str]] : Per port, its states in the window.
+        """
+
+        if not self.changes.has_timestamp(start) or not self.changes.has_timestamp(end): 
+            raise ValueError("Provided timestamp(s) do not exist in the VCD file.")
+
+        return { 
+            signal : [value.partition(' ')[0] for value in self.changes.changes_between(self.get_signal(signal).get_id(), start, end)[1]] 
+            for signal in signals 
+        }
 
 
 def main():
@@ -2,151 +2,87 @@ from VCD_Parser import VCD_Parser
 from utils import *
 
 import time 
-import re
 import multiprocessing as mp
 
 from os     import cpu_count
 from _Var   import _Var   as Var
 from _Scope import _Scope as Scope
-from typing import Tuple, List, Dict
-from tqdm import tqdm
+from typing import List, Dict
+from _ParseStats import ProgressObserver
 from itertools import repeat
+from _MappedVCD import parse_span
+from _ChangeStore import _ChangeStore as ChangeStore
+
+SHARD_SIZE     = 64 << 20 # upper bound (bytes) of a time shard of find_signals_values_at_region
+MIN_SHARD_SIZE = 4 << 20  # lower bound; smaller windows are searched in-process, without a pool
 
-@singleton
 class SVCD_Parser(VCD_Parser):
 
 
-    def __init__(self,vcd_filename : str, sig_file : str = None):
-        super().__init__(vcd_filename, VCD_Type.Standard, sig_file = sig_file)
-        
+    def __init__(self, vcd_filename : str, sig_file : str = None, streaming : bool = False, index : bool = False, lazy : bool = False, filtered : bool = False, follow : bool = False, progress : ProgressObserver = None):
+        super().__init__(vcd_filename, VCD_Type.Standard, sig_file = sig_file, streaming = streaming, index = index, lazy = lazy, filtered = filtered, follow = follow, progress = progress)
 
 
     def find_all_signal_values(self, signal_name: str) -> List[str]:
 
-        retvals = list()
-
-        value_change = '\n'.join(self.raw_sections[Section.Value_Change])
-        timestamp_regex = r"\#[0-9]+\n" 
-
-        signal = self.get_signal(signal_name)
-        signal_ascii_id = signal.get_id()
-        signal_size = signal.get_size()
-
-        # can also be done with re.finditer
-        sections = re.split(timestamp_regex, value_change, maxsplit=0, flags=re.DOTALL|re.MULTILINE)
-    
-        previous_value = None 
-
-        for n, section in enumerate(sections): 
-           
-            if not section: continue 
-
-            in_section = section.find(signal_ascii_id)
-
-            # For both VCDs that have either #0...$dumpvars or $dumpvars...$end...#0
-            if n == 1 and (not sections[n-1]) or \
-               n == 0 and sections[n]: 
-
-                # that's the $dumpvars section i.e., initial value
-                previous_value = section[in_section-signal_size:in_section]
-            
-            if in_section == -1:
-                # signal's value didn't change in current section 
-                retvals.append(previous_value)
-                continue
-            
-            # search for multiple signal changes occuring in the section
-            while(in_section != -1):
-                
-                if in_section + 1 < len(section) and \
-                (section[in_section + 1] == 'd'   or  # symbol == '$' && the $dumpvars line  
-                 section[in_section + 1] == 'e'   or  # symbol == '$' && the $end line      
-                 section[in_section + 1].isdigit()) : # symbol == '#' && the #[0-9]+ timestamp
-
-                    in_section = section.find(signal_ascii_id,in_section + 1)
-                    continue
-
-                previous_value = section[in_section-signal_size:in_section]
-                retvals.append(section[in_section-signal_size:in_section])
-                in_section = section.find(signal_ascii_id, in_section + 1)
-
-        return retvals 
+        return self.find_all_signals_values([signal_name])[signal_name]
 
     def find_signal_values_at_region(self, start : int, end : int, signal_name : str) -> List[str]:
       
-        retvals = list()
+        # Parsers loaded from a columnar export, or of compressed files, have no file to map
+        if self.vcd_filename is None or self.compression is not None:
+            return self._stored_values_at_region([signal_name], start, end)[signal_name]
 
-        search_space = '\n'.join(self.raw_sections[Section.Value_Change])
-                
-        search_regex = f"#{start}(.*)^#{end}"
+        # Only the [start,end[ window of the memory-mapped file is searched
+        mapped = self.mapped
 
-        # Extract the ]start,end[ segment
-        regex_results = re.search(search_regex, search_space, flags=re.DOTALL|re.MULTILINE)
-
-        if not regex_results: 
+        if not mapped.has_timestamp(start) or not mapped.has_timestamp(end): 
             raise ValueError("Provided timestamp(s) do not exist in the VCD file.")
 
-        section = regex_results[1]
-
         # Find the signal attributes in the Tree.
         signal = self.get_signal(signal_name)
         signal_ascii_id = signal.get_id()
-        signal_size = signal.get_size()
 
         # Record every value change of the signal
-        in_section = section.find(signal_ascii_id)
-
-        while(in_section != -1):
-            
-            if in_section + 1 < len(section) and \
-            (section[in_section + 1] == 'd'   or  # symbol == '$' && the $dumpvars line  
-             section[in_section + 1] == 'e'   or  # symbol == '$' && the $end line      
-             section[in_section + 1].isdigit()) : # symbol == '#' && the #[0-9]+ timestamp
-
-                in_section = section.find(signal_ascii_id,in_section + 1)
-                continue
-
-            retvals.append(section[in_section-signal_size:in_section])
-
-            in_section = section.find(signal_ascii_id,in_section+1)
-
-        return retvals
+        return mapped.values_between(signal_ascii_id, start, end)
 
     def find_signal_values_at(self, at : int, signal_name: str)  -> str: 
 
-        timestamps = [ ts for ts in self.value_change.keys() ]
-
-        if at not in timestamps: 
+        if not self.changes.has_timestamp(at): 
             raise KeyError(f"Timestamp {at} is not present in the VCD")
 
-        search_space = [ ts for ts in timestamps[timestamps.index(at)::-1] ]
-
         # Find the signal attributes in the Tree.
         signal = self.get_signal(signal_name)
         signal_ascii_id = signal.get_id()
 
-        for ts in search_space: 
+        value = self.changes.value_at(signal_ascii_id, at)
 
-            for id, val in self.value_change[ts]: 
+        if value is None: 
+            raise RuntimeError(f"Signal {signal_name} : {signal} has never been assigned a value up until the region {at} you are currently searching")
 
-                if signal_ascii_id == id : return val 
-        
-        raise RuntimeError(f"Signal {signal_name} : {signal} has never been assigned a value up until the region {at} you are currently searching")
+        return value
 
     def find_signal_initial_value(self, signal_name : str, search_space : str = None) -> str: 
         
-        search_space = '\n'.join(self.raw_sections[Section.Value_Change]) if not search_space else search_space
-
         # Find the signal attributes in the Tree.
 
         signal = self.get_signal(signal_name)
         signal_ascii_id = signal.get_id()
-        signal_size = signal.get_size()
 
+        if not search_space:
+
+            logic_value = initial_value(self.changes.history(signal_ascii_id)[1])
+
+            if logic_value is None: 
+                raise ValueError(f"Signal {signal_name} with id: {signal_ascii_id} not found in the VCD file")
+
+            return logic_value
+
+        signal_size = signal.get_size()
         found_symbol = search_space.find(signal_ascii_id)
         
         if found_symbol == -1: 
-            exit(f"Signal {signal_name} with id: {signal_ascii_id} not found in the VCD file")
+            raise ValueError(f"Signal {signal_name} with id: {signal_ascii_id} not found in the VCD file")
         
         logic_value = search_space[found_symbol-signal_size:found_symbol]
         while logic_value not in ["1","0"]:
@@ -156,51 +92,73 @@ class SVCD_Parser(VCD_Parser):
 
         return logic_value
    
-    def _thread_func(self, values : Tuple[str,int,int])->List:
-        
-        raise NotImplemented("Soon...")
-        signal, start, end = values 
-        logic_values = (start,end,signal)
+    def find_signals_values_at_region(self, signals : List[str], start : int, end : int, proc_num : int = mp.cpu_count()) -> Dict[str,List[str]]:
 
-        return signal, logic_values
+        if self.vcd_filename is None or self.compression is not None:
+            return self._stored_values_at_region(signals, start, end)
 
-    def find_signals_values_at_region(self, signals : List[str], start : int, end : int, proc_num : int = mp.cpu_count()) -> Dict[str,str]:
+        # Only the [start,end[ window of the memory-mapped file is searched
+        mapped = self.mapped
 
-        retval = dict()
+        if not mapped.has_timestamp(start) or not mapped.has_timestamp(end): 
+            raise ValueError("Provided timestamp(s) do not exist in the VCD file.")
 
-        chunksize, remainder = divmod(len(signals), 4 * proc_num)
+        ids = { signal : self.get_signal(signal).get_id() for signal in signals }
 
-        if remainder: 
-            chunksize += 1
+        # Time shards start on #<time> markers; each worker reads its own shard from the file
+        lo, hi = mapped.span(start, end)
+        count  = min(max(4 * proc_num, -(-(hi - lo) // SHARD_SIZE)), max((hi - lo) // MIN_SHARD_SIZE, 1))
+        shards = mapped.shards(start, end, count)
+        jobs   = zip(repeat(self.vcd_filename), *zip(*shards), repeat(frozenset(ids.values()))) if shards else list()
 
-        with mp.Pool(processes = proc_num) as pool: 
+        values = { id : list() for id in ids.values() }
 
-            for signal, values in pool.imap_unordered(self._thread_func, zip(signals,repeat(start),repeat(end)), chunksize=chunksize):
-                
-                retval[signal] = values 
+        if proc_num > 1 and len(shards) > 1: 
+            with mp.Pool(processes = min(proc_num, len(shards))) as pool: 
+                results = pool.starmap(parse_span, jobs)
+        else: 
+            results = [parse_span(*job) for job in jobs]
+
+        # Stitch the shards together, in time order 
+        for result in results:
+            for id, (_, shard_values) in result.items():
+                values[id].extend(shard_values)
         
-        return retval
+        return { signal : values[id] for signal, id in ids.items() }
     
+    def _stored_values_at_region(self, signals : List[str], start : int, end : int) -> Dict[str,List[str]]:
+
+        # Same [start,end[ contract as the mapped search, answered by the change store
+        if not self.changes.has_timestamp(start) or not self.changes.has_timestamp(end): 
+            raise ValueError("Provided timestamp(s) do not exist in the VCD file.")
+
+        return { signal : self.changes.changes_between(self.get_signal(signal).get_id(), start, end)[1] for signal in signals }
+
     def find_signals_initial_values(self, signals : List[str], proc_num : int = mp.cpu_count()) -> Dict[str,str]:
         
-        retval = dict()
+        # Workers attach to the change store in shared memory instead of receiving a pickled parser
+        return self.map_signals(stored_initial_value, signals, proc_num = proc_num)
+        
+def initial_value(values : List[str]) -> str:
+
+    """
+    The first fully known (0/1 only) value of a history of values, None if there is none.
+    """
 
-        values = list()
+    for value in values:
+        if value and not value.strip("01"): 
+            return value
 
-        chunksize, remainder = divmod(len(signals), proc_num)
+    return None
 
-        if remainder: 
-            chunksize += 1
+def stored_initial_value(store : ChangeStore, id : str) -> str:
 
-        with mp.Pool(processes = proc_num) as pool:
+    """
+    `initial_value` of a $var id of a change store, in the form `map_signals` expects.
+    """
 
-            for value in pool.imap(self.find_signal_initial_value, tqdm(signals), chunksize=chunksize):
-                
-                values.append(value) 
+    return initial_value(store.history(id)[1])
 
-        retval = { signal : value for signal, value in zip(signals,values) }
-        return retval 
-        
 def main():
 
     """
@@ -215,7 +173,7 @@ def main():
     #Test_SVCD.get_signal("riscv_core_i/if_stage_i/prefetch_128_prefetch_buffer_i/L0_buffer_i/addr_q_reg_1_/Qf")
 
     init_state = list()
-    for si in tqdm(Test_SVCD.signals): 
+    for si in Test_SVCD.signals: 
 
         # latch
         if "/enabled" in si :
@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+
+import csv
+import sys
+import glob
+import argparse
+import multiprocessing as mp
+
+from bisect      import bisect_right
+from dataclasses import dataclass, field
+from os          import stat
+from os.path     import isdir, join
+from itertools   import repeat
+from typing      import Iterator, List, Tuple, TextIO
+from SVCD_Parser import SVCD_Parser, initial_value
+from _Scope      import ScopeHasNoVar
+from _Var        import VarTypeUnknown
+
+# One row of the combined table : (file, signal, query, value)
+Row = Tuple[str, str, str, str]
+
+COLUMNS = ("file", "signal", "query", "value")
+
+@dataclass
+class BatchQuery():
+
+    """
+    The extraction run over every file of a batch.
+
+    Attributes:
+        signals (List[str]) : The hierarchical signal names (e.g., the lines of a sig_file).
+        initial_values (bool) : Extract the first fully known (0/1) value of every signal.
+        at (List[int]) : Extract the value of every signal in effect at each of these timestamps.
+    """
+
+    signals        : List[str]
+    initial_values : bool      = False
+    at             : List[int] = field(default_factory = list)
+
+def expand(pattern : str) -> List[str]:
+
+    """
+    The VCD files of a directory (plain or compressed, `*.vcd*`) or of a glob pattern, largest first
+    so that the biggest dumps start early and do not end up alone on the tail of the run.
+    """
+
+    files = glob.glob(join(pattern, "*.vcd*") if isdir(pattern) else pattern)
+
+    return sorted(files, key = lambda filename : stat(filename).st_size, reverse = True)
+
+def extract(vcd_filename : str, query : BatchQuery) -> List[Row]:
+
+    """
+    Worker: runs the query over one file, with a single filtered pass that keeps the
+    changes of the queried signals only. A failing file yields a single `error` row.
+    """
+
+    try:
+        parser    = SVCD_Parser(vcd_filename, lazy = True)
+        histories = parser.find_signals_histories(query.signals)
+    except (Exception, ScopeHasNoVar, VarTypeUnknown) as error:
+        return [(vcd_filename, "", "error", f"{type(error).__name__}: {error}")]
+
+    rows = list()
+
+    for signal, (times, values) in histories.items():
+
+        if query.initial_values:
+            rows.append((vcd_filename, signal, "initial", initial_value(values) or ""))
+
+        for at in query.at:
+            index = bisect_right(times, at) - 1
+            rows.append((vcd_filename, signal, f"@{at}", values[index] if index >= 0 else ""))
+
+    return rows
+
+def run_batch(files : List[str], query : BatchQuery, proc_num : int = mp.cpu_count(), max_tasks_per_child : int = None) -> Iterator[Row]:
+
+    """
+    Distributes whole files over a pool of `proc_num` processes and yields the rows of each
+    file as soon as it is done (in completion order). At most `proc_num` files are parsed
+    at a time, so peak memory is bounded by the `proc_num` largest files, not the batch size.
+
+    Parameters:
+        files (List[str]) : The VCD files (see `expand`).
+        query (BatchQuery) : The extraction run over every file.
+        proc_num (int) : The number of worker processes.
+        max_tasks_per_child (int) : Recycle workers after that many files, to return their memory to the OS.
+
+    Returns:
+        Iterator[Row] : The `(file, signal, query, value)` rows.
+    """
+
+    if proc_num <= 1:
+        for vcd_filename in files:
+            yield from extract(vcd_filename, query)
+        return
+
+    with mp.Pool(processes = proc_num, maxtasksperchild = max_tasks_per_child) as pool:
+        for rows in pool.imap_unordered(_extract, zip(files, repeat(query)), chunksize = 1):
+            yield from rows
+
+def _extract(job : Tuple[str, BatchQuery]) -> List[Row]:
+    return extract(*job)
+
+def write_table(rows : Iterator[Row], output : TextIO) -> int:
+
+    """
+    Streams the rows into one CSV table (with a header). Returns the number of rows written.
+    """
+
+    writer = csv.writer(output)
+    writer.writerow(COLUMNS)
+
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+
+    return count
+
+def main():
+
+    arguments = argparse.ArgumentParser(description = "Runs the same signal extraction over a batch of VCD files.")
+    arguments.add_argument("files", help = "A directory of VCD files or a glob pattern (quoted)")
+    arguments.add_argument("-s", "--sig-file", required = True, help = "The signals to extract, one per line")
+    arguments.add_argument("-i", "--initial", action = "store_true", help = "Extract the initial values")
+    arguments.add_argument("-a", "--at", type = int, nargs = "*", default = list(), help = "Extract the values at these timestamps")
+    arguments.add_argument("-o", "--output", help = "The CSV table (stdout by default)")
+    arguments.add_argument("-j", "--jobs", type = int, default = mp.cpu_count(), help = "The number of worker processes")
+    options = arguments.parse_args()
+
+    signals = [line.strip() for line in open(options.sig_file) if line.strip()]
+    query   = BatchQuery(signals, initial_values = options.initial, at = options.at)
+    rows    = run_batch(expand(options.files), query, proc_num = options.jobs)
+
+    if options.output:
+        with open(options.output, "w", newline = "") as OUTFILE:
+            write_table(rows, OUTFILE)
+    else:
+        write_table(rows, sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -1,179 +1,190 @@
 #!/usr/bin/python3
 
 import re
-import time
+import asyncio
 import multiprocessing as mp
 
 from utils import *
 
-from tqdm    import tqdm 
-from treelib import Tree, Node
+from time    import monotonic, sleep
+from threading import Lock
+from io      import TextIOWrapper
 from os      import cpu_count
-from os.path import isfile, dirname, join
+from os.path import isfile, abspath, getsize
 from _Var    import _Var   as Var
 from _Scope  import _Scope as Scope
-from typing  import Tuple, List, Dict
+from array   import array
+from itertools import repeat
+from functools import partial
+from concurrent.futures import Executor
+from typing  import Tuple, List, Dict, Iterator, Set, Callable
+from contextlib import nullcontext, closing, ExitStack
+
+from _Hierarchy     import _Hierarchy    as Hierarchy
+from _Tokenizer     import tokenize_value_changes, ValueChangeConsumer
+from _ChangeStore   import _ChangeStore  as ChangeStore
+from _MappedVCD     import _MappedVCD    as MappedVCD
+from _SidecarIndex  import _SidecarIndex as SidecarIndex, INDEX_SUFFIX
+from _SharedStore   import publish, apply_shared
+from _PackedHistory import _PackedHistory as PackedHistory, _PackingConsumer as PackingConsumer, pack_history, np
+from _DumpFile      import open_dump, compression_of
+from _WaveDiff      import _DiffReport   as DiffReport, diff_streams
+from _Activity      import _Activity     as Activity, rollup, timescale_of, write_saif
+from _Condition     import _Condition    as Condition, Signal, evaluate
+from _Slicer        import _SliceWriter  as SliceWriter, prune_definitions
+from _ParseStats    import _ParseStats   as ParseStats, ProgressObserver, report_progress
+
+FOLLOW_CHUNK = 8 << 20 # bytes read at once by `poll`, which never holds more than two chunks
 
 class VCD_Parser():
 
-    def __init__(self, vcd_filename : str, file_type : VCD_Type, sig_file : str = None) -> None:
+    def __init__(self, vcd_filename : str, file_type : VCD_Type, sig_file : str = None, streaming : bool = False, index : bool = False, lazy : bool = False, filtered : bool = False, follow : bool = False, progress : ProgressObserver = None) -> None:
 
         def _fill_VCD_sections() -> None:
         
             """
-            Parses the requested VCD file and fills in raw (str)
-            format the object's dictionary and generates a Tree data structure.
+            Parses the header and definitions of the requested VCD file and fills in raw (str)
+            format the object's dictionary. The file offset of the value change section is 
+            recorded so that `load_value_changes`, `stream_value_changes` and `feed` seek 
+            straight to it. Compressed (gzip, xz, bz2) files are decoded on the fly.
             """
-            with open(self.vcd_filename) as VCDFILE:
+            with open_dump(self.vcd_filename) as VCDFILE:
                 
                 # VCD HEADER # 
                 current_section = Section.Header
-                line = VCDFILE.readline()
-                timestamp="#0"
+                line = VCDFILE.readline().decode()
                 while line:  
 
                     if current_section == Section.Header and "$scope" in line: 
                         current_section = Section.Variable_Definition
                         self.raw_sections[current_section].append(line.rstrip())
-                        line = VCDFILE.readline()
+                        line = VCDFILE.readline().decode()
                         continue
                             
                     elif current_section == Section.Variable_Definition and "$enddefinitions" in line:
                         self.raw_sections[current_section].append(line.rstrip())
-                        current_section = Section.Value_Change
-                        line = VCDFILE.readline()
-                        continue
+                        self.value_change_offset = VCDFILE.tell()
+                        break
                 
                     self.raw_sections[current_section].append(line.rstrip())
-                    
-                    if line[0] == '#' and line[1].isdigit():
-                        timestamp = line 
-
-                    line = VCDFILE.readline()
-
-            # timestamps only 
-            for lineno, line in enumerate(self.raw_sections[Section.Value_Change]):
-
+                    line = VCDFILE.readline().decode()
 
-                if '$dumpvars' in line : continue 
+        def _load_index() -> bool:
 
-                if not len(line) or line[0] != '#': 
-
-                    if line[0] == 'b': 
-
-                        val, id = line[1:].split(' ')
-                        self.value_change[timestamp].append((id,val))
-
-                    else: 
+            """
+            Restores the sections, the marker table and the change store from the 
+            sidecar index file, if it exists and matches the VCD file.
+            """
+            sidecar = SidecarIndex.load(self.index_filename, self.vcd_filename)
 
-                        val = line[0]
-                        id  = line[1:]
-                        self.value_change[timestamp].append((id,val))
+            if sidecar is None:
+                return False
 
-                else: 
+            self.raw_sections[Section.Header]              = sidecar.meta["header"]
+            self.raw_sections[Section.Variable_Definition] = sidecar.meta["definitions"]
+            self.value_change_offset = sidecar.meta["value_change_offset"]
+            self._changes = sidecar.changes
+            self._loaded  = True
+            self.stats.count(timestamps = len(sidecar.times), changes = sidecar.change_count)
+            if self.compression is None:
+                self._mapped = MappedVCD(self.vcd_filename, self.value_change_offset, sidecar.times, sidecar.offsets)
+            return True
 
-                    try : 
-                        timestamp = int(line[1:])
+        def _generate_tree(type : VCD_Type) -> None:
 
-                    except Exception as err:
-                        ValueError(f"Casting to integer failed for line ({line}) in Value Change section ") 
-                    
-                    self.timestamps.append((timestamp,lineno))
-                    self.value_change[timestamp] = list()
+            self.hierarchy = Hierarchy.from_definitions(self.raw_sections[Section.Variable_Definition], type)
 
-        def _generate_tree(type : VCD_Type) -> None:
-            
-            def id_generator():
-                n = 0 
-                while True:
-                    yield n 
-                    n += 1
+        def _sanitize_file( _file : str) -> str:
             
-            seq = id_generator()
+            if not _file : 
+                return None
 
-            node_id = next(seq)
+            # relative paths are resolved against the working directory
+            if isfile(_file): 
+                return abspath(_file)
+            
+            else: 
+                raise FileNotFoundError(f"File {_file} not found")
 
-            s_regex  = re.compile(SCOPE_REGEXP)
-            v_regex  = re.compile(S_VAR_REGEXP) if type == VCD_Type.Standard else re.compile(E_VAR_REGEXP) 
+        self._init_state(_sanitize_file(vcd_filename), file_type, _sanitize_file(sig_file), streaming, progress)
 
-            current_cell   = None
-            predecessor_ids = list() 
+        if follow and (index or self.compression is not None):
+            raise ValueError("Follow mode needs a plain (uncompressed) VCD file and no sidecar index")
 
-            for raw_str in self.raw_sections[Section.Variable_Definition]:           
+        self.stats.count(bytes = getsize(self.vcd_filename))
 
-                is_scope = re.match(s_regex, raw_str)
-                is_var   = re.match(v_regex, raw_str)
+        with self.stats.phase("index") if index else nullcontext():
+            from_index = index and _load_index()
 
-                if is_scope:
+        if not from_index:
+            with self.stats.phase("header"):
+                _fill_VCD_sections()
 
-                    scope = Scope(*is_scope.groups())
-                    
-                    self.tree_metadata[scope.cell_name] = node_id
+        with self.stats.phase("hierarchy"):
+            _generate_tree(file_type)
 
-                    if self.tree.size() == 0:
-                        # this is the root node
-                        current_cell = Node(tag = scope.cell_name, identifier = node_id, data = scope)
-                        self.tree.add_node(current_cell)
-                    # current_cell = self.tree.get_node(node_id)  
-                        predecessor_ids.append(node_id) 
+        self.stats.count(
+            lines  = len(self.raw_sections[Section.Header]) + len(self.raw_sections[Section.Variable_Definition]),
+            scopes = len(self.hierarchy.scopes),
+            vars   = len(self.hierarchy.paths)
+        )
 
-                    else:
-                        
-                        # update the predecessor's nesting modules
-                        predecessor = self.tree.get_node(predecessor_ids[-1])
-                        predecessor.data.append_scope(scope)
-                        self.tree.update_node(nid = predecessor.identifier, data = predecessor.data)
+        # only the changes of the sig_file signals are kept; queries of any other signal raise
+        if filtered and not from_index:
 
-                        # add the new node as a child to the predecessor to the tree
-                        current_cell = Node(tag = scope.cell_name, identifier = node_id, data = scope)
-                        self.tree.add_node(current_cell, parent=predecessor)
-                        predecessor_ids.append(node_id)
+            if not self.signals:
+                raise ValueError("Filtered mode needs a sig_file listing the signals to keep")
 
-                    node_id = next(seq)
+            self.filter_ids = frozenset(self.get_signal(signal).get_id() for signal in self.signals)
+            self._changes   = ChangeStore(self.filter_ids)
 
-                if is_var:
+        # the file is still being written; its value changes are loaded incrementally by `poll`
+        if follow:
+            self._loaded = True
+            self.follow_offset = self.value_change_offset
+            self.poll()
 
-                    # get the current node (scope) and update the wire's list                   
-                    var = Var(*is_var.groups())
-                    current_cell.data.append_var(var)
-                    self.tree.update_node(nid=current_cell.identifier, data=current_cell.data)
+        elif not from_index:
 
-                # closing statement for module in VCD syntax
-                if "upscope" in raw_str: predecessor_ids.pop()
+            # lazy parsers load the value changes on the first value query
+            if not (lazy or streaming):
+                self.load_value_changes()
 
-        def _sanitize_file( _file : str) -> str:
-            
-            if not _file : 
-                return None
+            if index and self.filter_ids is None: 
+                self.save_index()
+    
+    def _init_state(self, vcd_filename : str, file_type : VCD_Type, sig_file : str = None, streaming : bool = False, progress : ProgressObserver = None) -> None:
 
-            is_absolute = _file[0] == '/'
-            
-            if is_absolute and isfile(_file): 
-                return _file
-            
-            elif not is_absolute and isfile(_file): 
-                return join(dirname(__file__),_file) 
-            
-            else: 
-                FileNotFoundError(f"File {_file} not found")
+        """
+        Sets every attribute of the parser to its initial (nothing parsed) state. 
+        Shared by the constructor and `load_columnar`, which has no VCD file.
+        """
 
-        self.vcd_filename  = _sanitize_file(vcd_filename)
+        self.vcd_filename  = vcd_filename
+        self.compression   = compression_of(vcd_filename) if vcd_filename else None # None, "gzip", "xz" or "bz2"
         self.type          = file_type
-        self.sig_file      = _sanitize_file(sig_file)    
+        self.sig_file      = sig_file
+        self.streaming     = streaming
         self.raw_sections  = { sec : list() for sec in [Section.Header, Section.Variable_Definition, Section.Value_Change]}
-        self.tree          = Tree()
-        self.tree_metadata = dict() # node_names : node_ids
-        self.signals       = [line.rstrip() for line in open(self.sig_file).readlines()] if sig_file else list()
-        self.timestamps    = list()
-        self.value_change  = dict() # timestamp : list[tuple(id,val)]
-
-        _fill_VCD_sections()
-        _generate_tree(file_type)
-    
+        self.hierarchy     = Hierarchy() # flat $scope table + full path : _Var
+        self.signals       = [line.rstrip() for line in open(sig_file).readlines()] if sig_file else list()
+        self._changes      = ChangeStore() # per $var id : (timestamps, values)
+        self._loaded       = False
+        self._load_lock    = Lock() # serializes the loads of the value changes
+        self.value_change_offset = 0 # byte offset right after $enddefinitions
+        self._mapped       = None
+        self.index_filename = vcd_filename + INDEX_SUFFIX if vcd_filename else None
+        self.filter_ids    = None # $var ids of the sig_file signals in filtered mode
+        self.follow_offset = None # follow mode : byte offset of the last unconfirmed #<time> marker
+        self.follow_timestamp = 0
+        self.progress      = progress # optional ProgressObserver
+        self.stats         = ParseStats(progress) # per-phase timings, counters and peak memory
+
     def get_signal(self, signal : str ) -> Var:
 
         """
-        Searches in a top-down manner in the hierarchy to find the requested port ($var).
+        Looks up the requested port ($var) by its hierarchical path, in O(1) for full paths.
+        Partial paths (starting from any $scope) are anchored on the scopes of that name.
 
         Parameters: 
             signal (str) : The hierarhical signal name 
@@ -182,13 +193,902 @@ class VCD_Parser():
             Var : The _Var object if found. 
         """
         
-        hierarchy = signal.split('/')
-        port      = hierarchy[-1]
+        return self.hierarchy.get_signal(signal)
+
+    @property
+    def changes(self) -> ChangeStore:
+
+        """
+        The per-signal change store. Lazy parsers load the value change section on first access.
+        Streaming parsers keep nothing: until `load_value_changes` is called, the store (and every 
+        query answered from it) is unavailable and the value changes are read with `feed` or 
+        `stream_value_changes`.
+
+        Returns: 
+            ChangeStore : The _ChangeStore object of the file.
+
+        Raises:
+            ValueError : The parser is in streaming mode and the value changes are not loaded.
+        """
+
+        if not self._loaded:
+
+            if self.streaming:
+                raise ValueError("Streaming parsers only support feed and stream_value_changes; call load_value_changes to query the value changes")
+
+            self.load_value_changes()
+
+        return self._changes
+
+    def load_value_changes(self) -> None:
+
+        """
+        Tokenizes the value change section, in a single pass, into the per-signal `changes` store
+        (`raw_sections` holds the header and the definitions only). 
+        It does nothing once the section has been loaded. Concurrent calls (e.g., from threads 
+        or `load_value_changes_async`) wait for the first one, and the section is marked loaded 
+        only once the store is complete.
+        """
+
+        with self._load_lock:
+
+            if self._loaded:
+                return
+
+            try:
+                self._load_value_changes()
+            except BaseException:
+                # nothing half-loaded is kept, so that a retry starts over
+                self._changes = ChangeStore(self.filter_ids)
+                raise
+
+            self._loaded = True
+
+    def _load_value_changes(self) -> None:
+
+        # only the store is kept: the raw value change lines are never collected
+        with self.stats.phase("value_changes"):
+            self.feed(self._changes)
+            self._count_changes()
+
+    def _value_change_lines(self, VCDFILE) -> Iterator[str]:
+
+        """
+        The lines of the value change section, from an open file positioned at its start.
+        With a progress observer, the bytes consumed are reported to it under the running phase 
+        (or "stream"); without one, the file is iterated directly.
+        """
+
+        lines = TextIOWrapper(VCDFILE)
+
+        if self.progress is None:
+            return lines
+
+        total = getsize(self.vcd_filename) - self.value_change_offset if self.compression is None else None
+
+        return report_progress(lines, self.progress, self.stats.current or "stream", lambda : VCDFILE.tell() - self.value_change_offset, total)
+
+    def _count_changes(self) -> None:
+
+        # derived from the store, so that nothing is counted per line
+        self.stats.count(
+            timestamps = len(self._changes.timestamps),
+            changes    = sum(len(times) for times in self._changes.times.values())
+        )
+
+    @property
+    def mapped(self) -> MappedVCD:
+
+        """
+        Memory-mapped view of the value change section, with the byte offset of every 
+        `#<time>` marker. It is built by a single scan on first access.
+        Compressed files cannot be mapped; they are only streamed.
+
+        Returns: 
+            MappedVCD : The _MappedVCD object of the file.
+        """
+
+        if self.compression is not None:
+            raise ValueError(f"The {self.compression} compressed file {self.vcd_filename} cannot be memory-mapped")
+
+        if self._mapped is None:
+            self._mapped = MappedVCD(self.vcd_filename, self.value_change_offset)
+
+        return self._mapped
+
+    def save_index(self) -> None:
+
+        """
+        Writes the sidecar index (`<vcd_filename>.idx`) holding the hierarchy, the id table, 
+        the byte offset of every timestamp and the per-signal change lists. Constructing 
+        the parser with `index=True` then loads it instead of parsing the file. 
+        The index is validated by the size, mtime and a content hash of the VCD file.
+        """
+
+        if self.filter_ids is not None:
+            raise ValueError("A filtered parser holds the sig_file signals only and cannot produce a complete index")
+
+        self.load_value_changes()
+
+        meta = { 
+            "header"              : self.raw_sections[Section.Header],
+            "definitions"         : self.raw_sections[Section.Variable_Definition],
+            "value_change_offset" : self.value_change_offset
+        }
+
+        with self.stats.phase("save_index"):
+
+            # the marker offsets of compressed files are useless, as those cannot be mapped
+            offsets = self.mapped.offsets if self.compression is None else array('q')
+
+            SidecarIndex.save(self.index_filename, self.vcd_filename, meta, self.changes, offsets)
+
+    def export_columnar(self, filename : str, compress : bool = True) -> None:
+
+        """
+        Exports the parsed file to a standalone binary columnar file: the hierarchy and the
+        per-signal (timestamps, values) columns, each one as a separate (zlib compressed) chunk.
+        `load_columnar` maps it back, decompressing the columns of a signal on its first query.
+
+        Parameters:
+            filename (str) : The path of the columnar file.
+            compress (bool) : Compress the per-signal columns.
+        """
+
+        meta = {
+            "header"              : self.raw_sections[Section.Header],
+            "definitions"         : self.raw_sections[Section.Variable_Definition],
+            "value_change_offset" : 0,
+            "type"                : self.type.name
+        }
+
+        with open(filename, "wb") as COLFILE:
+            SidecarIndex.dump(COLFILE, meta, self.changes, array('q'), compress)
+
+    @classmethod
+    def load_columnar(cls, filename : str) -> "VCD_Parser":
+
+        """
+        Loads a file written by `export_columnar`. The original VCD file is not needed: the
+        returned parser answers `get_signal` and the value queries from the mapped columns.
+
+        Parameters:
+            filename (str) : The path of the columnar file.
+
+        Returns:
+            VCD_Parser : A parser (of the calling class) with the value changes loaded.
+        """
+
+        self = cls.__new__(cls)
+        self._init_state(None, None)
+
+        with self.stats.phase("columnar"):
+            columnar  = SidecarIndex.open(filename)
+            self.type = VCD_Type[columnar.meta["type"]]
+
+        self.raw_sections[Section.Header]              = columnar.meta["header"]
+        self.raw_sections[Section.Variable_Definition] = columnar.meta["definitions"]
+        self._changes = columnar.changes
+        self._loaded  = True
+
+        with self.stats.phase("hierarchy"):
+            self.hierarchy = Hierarchy.from_definitions(self.raw_sections[Section.Variable_Definition], self.type)
+
+        self.stats.count(
+            bytes      = getsize(filename),
+            scopes     = len(self.hierarchy.scopes),
+            vars       = len(self.hierarchy.paths),
+            timestamps = len(columnar.times),
+            changes    = columnar.change_count
+        )
+
+        return self
+
+    def stream_value_changes(self, ids : Set[str] = None) -> Iterator[Tuple[int, str, str]]:
+
+        """
+        Tokenizes the value change section straight from the file, one line at a time.
+        Nothing but the current line is held in memory, regardless of the file size.
+        In filtered mode, the changes of signals outside the sig_file are dropped.
+
+        Parameters: 
+            ids (Set[str]) : Only yield the changes of these $var ids (defaults to the sig_file filter).
+
+        Returns: 
+            Iterator[Tuple[int, str, str]] : `(timestamp, id, value)` per value change and 
+                                             `(timestamp, None, None)` per `#<time>` marker.
+        """
+
+        # a pass outside of any other phase is timed as "stream"
+        with self.stats.phase("stream") if self.stats.current is None else nullcontext():
+            with open_dump(self.vcd_filename) as VCDFILE:
+                VCDFILE.seek(self.value_change_offset)
+                yield from tokenize_value_changes(self._value_change_lines(VCDFILE), ids = self.filter_ids if ids is None else ids)
+
+    def feed(self, *consumers : ValueChangeConsumer) -> None:
+
+        """
+        Feeds every value change of the file to the consumers, in a single pass.
+
+        Parameters: 
+            consumers (ValueChangeConsumer) : Index builders, statistics, writers etc.
+        """
+
+        for timestamp, id, val in self.stream_value_changes():
+
+            if id is None:
+                for consumer in consumers: consumer.on_timestamp(timestamp)
+            else:
+                for consumer in consumers: consumer.on_change(timestamp, id, val)
+
+        for consumer in consumers: consumer.on_finish()
+
+    def poll(self, *consumers : ValueChangeConsumer, final : bool = False) -> int:
+
+        """
+        Follow mode: loads the value changes appended to the file since the last call. Only the
+        changes preceding the last `#<time>` marker are confirmed (the simulator may still be 
+        writing the ones after it), so each call resumes from that marker. The changes are 
+        appended in place to the `changes` store and fed to the consumers.
+
+        Parameters: 
+            consumers (ValueChangeConsumer) : Fed with every confirmed value change.
+            final (bool) : The file is complete; confirm everything up to its end.
+
+        Returns: 
+            int : The number of #<time> markers and value changes loaded.
+        """
+
+        if self.follow_offset is None:
+            raise ValueError("The parser is not in follow mode")
+
+        size = getsize(self.vcd_filename)
+
+        if size <= self.follow_offset:
+            return 0
+
+        consumers = (self._changes,) + consumers
+        count = 0
+
+        with self.stats.phase("poll"), open(self.vcd_filename, "rb") as VCDFILE:
+
+            # confirmed up to the last marker; a marker at `follow_offset` is the unconfirmed one of the last call
+            cut = size if final else _last_marker(VCDFILE, self.follow_offset, size)
+
+            if cut <= self.follow_offset:
+                return 0
+
+            # read in bounded chunks, so that catching up with a large file does not load all of it
+            lines = _read_lines(VCDFILE, self.follow_offset, cut)
+
+            for timestamp, id, val in tokenize_value_changes(lines, self.follow_timestamp, self.filter_ids):
+
+                if id is None:
+                    for consumer in consumers: consumer.on_timestamp(timestamp)
+                else:
+                    for consumer in consumers: consumer.on_change(timestamp, id, val)
+
+                self.follow_timestamp = timestamp
+                count += 1
+
+            # the next call resumes on a marker line, so no partial line is carried across calls
+            self.follow_offset = cut
+            self._mapped = None # the marker table of the mapped file is out of date
+
+            self._count_changes()
+            self.stats.count(bytes = self.follow_offset)
+
+        return count
+
+    def follow(self, *consumers : ValueChangeConsumer, interval : float = 1.0, idle_timeout : float = None, until : Callable[[], bool] = None) -> None:
+
+        """
+        Follow mode: keeps loading the value changes appended to the file by a running simulator,
+        polling its size every `interval` seconds, and feeds them to the consumers as they are confirmed.
+        It returns once `until()` is true (e.g., an early-abort check of a consumer) or the file has not 
+        grown for `idle_timeout` seconds; in the latter case the file is considered complete.
+
+        Parameters: 
+            consumers (ValueChangeConsumer) : Fed with every confirmed value change.
+            interval (float) : The polling period in seconds.
+            idle_timeout (float) : Stop after that many seconds without growth (never, if None).
+            until (Callable[[], bool]) : Stop as soon as it returns True, checked after every poll.
+        """
+
+        idle_since = monotonic()
+
+        while True:
+
+            if self.poll(*consumers):
+                idle_since = monotonic()
+
+            if until is not None and until():
+                break
+
+            if idle_timeout is not None and monotonic() - idle_since >= idle_timeout:
+                self.poll(*consumers, final = True)
+                break
+
+            sleep(interval)
+
+        for consumer in consumers: consumer.on_finish()
+
+    def diff(self, other : "VCD_Parser", signals : List[str] = None, stop_at_first : bool = False) -> DiffReport:
+
+        """
+        Compares the value changes of two dumps (e.g., a golden RTL and a gate-level or fault-injected one)
+        in a single streaming pass over both files (or over the change store of a dump whose value changes 
+        are loaded). Signals are matched by full hierarchical path and compared at every timestamp at 
+        which they change in either dump.
+
+        Parameters: 
+            other (VCD_Parser) : The dump to compare against.
+            signals (List[str]) : The (full or partial) paths to compare, which must exist in both dumps
+                                  (defaults to every full path that exists in both hierarchies).
+            stop_at_first (bool) : Stop reading at the first timestamp with a mismatch.
+
+        Returns: 
+            DiffReport : Per signal and in total, the first mismatch timestamp and the mismatch count.
+        """
+
+        first, second = dict(self.hierarchy.iter_signals()), dict(other.hierarchy.iter_signals())
+
+        if signals is None:
+            pairs = { path : (first[path], second[path]) for path in first if path in second }
+        else:
+            pairs = { signal : (self.get_signal(signal), other.get_signal(signal)) for signal in signals }
+
+        report = DiffReport(
+            pairs,
+            [path for path in first if path not in second],
+            [path for path in second if path not in first]
+        )
+
+        first_ids, second_ids = dict(), dict()
+        for path, (first_var, second_var) in pairs.items():
+            first_ids.setdefault(first_var.get_id(), list()).append((path, first_var.get_size()))
+            second_ids.setdefault(second_var.get_id(), list()).append((path, second_var.get_size()))
+
+        return diff_streams(
+            self._value_changes_of(set(first_ids)), 
+            other._value_changes_of(set(second_ids)), 
+            first_ids, second_ids, report, stop_at_first = stop_at_first
+        )
+
+    def switching_activity(self, start : int = 0, end : int = None, scope : str = None) -> Activity:
+
+        """
+        Per-bit toggle count and time at 0, at 1 and at X/Z of every $var (of the `scope` subtree, 
+        if given) within the [start, end] window, in a single pass over the value changes 
+        (or over the loaded store). Reading stops at the end of the window.
+
+        Parameters: 
+            start (int) : The window start.
+            end (int) : The window end (defaults to the last timestamp of the file).
+            scope (str) : The full path of a $scope; only its $vars are tracked.
+
+        Returns: 
+            Activity : The (finished) _Activity counters, per $var id.
+        """
+
+        prefix = scope.rstrip('/') + '/' if scope else ""
+
+        # real $vars have no bits to toggle
+        widths = { 
+            var.get_id() : var.get_size() for path, var in self.hierarchy.iter_signals() 
+            if path.startswith(prefix) and var.var_type != "real" 
+        }
+
+        activity = Activity(widths, start, end)
+
+        if self._loaded:
+
+            for id in widths:
+                for timestamp, value in zip(*self._changes.history(id)):
+                    if end is not None and timestamp > end: break
+                    activity.on_change(timestamp, id, value)
+
+            if len(self._changes.timestamps):
+                activity.on_timestamp(self._changes.timestamps[-1])
+
+        else:
+
+            for timestamp, id, value in self.stream_value_changes(set(widths)):
+                if end is not None and timestamp > end: break
+                if id is None: activity.on_timestamp(timestamp)
+                else: activity.on_change(timestamp, id, value)
+
+        activity.on_finish()
+
+        return activity
+
+    def activity_per_scope(self, start : int = 0, end : int = None, scope : str = None) -> Dict[int, Tuple[int, int, int, int]]:
+
+        """
+        The switching activity rolled up through the $scope hierarchy: per $scope index (its full 
+        path is `hierarchy.scope_paths[index]`; a re-entered $scope keeps its own entry), the 
+        (toggle count, time at 0, time at 1, time at X/Z) totals of its $vars and nested $scopes.
+        """
+
+        return rollup(self.hierarchy, self.switching_activity(start, end, scope))
+
+    def write_saif(self, filename : str, start : int = 0, end : int = None, scope : str = None) -> Activity:
+
+        """
+        Writes the switching activity of the [start, end] window as a (backward) SAIF file,
+        one net per bit, for power analysis.
+
+        Parameters: 
+            filename (str) : The path of the SAIF file.
+            start, end, scope : See `switching_activity`.
+
+        Returns: 
+            Activity : The exported _Activity counters.
+        """
+
+        activity = self.switching_activity(start, end, scope)
+
+        with open(filename, "w") as SAIFFILE:
+            write_saif(SAIFFILE, self.hierarchy, activity, timescale_of(self.raw_sections[Section.Header]))
+
+        return activity
+
+    def write_slice(self, filename : str, start : int, end : int, signals : List[str] = None, scopes : List[str] = None) -> int:
+
+        """
+        Writes the excerpt of the [start, end] window and of a subset of the signals as a valid VCD file:
+        the header, the pruned $scope/$var tree, a synthesized `$dumpvars` with the state of every kept 
+        signal at `start` and the changes of the window. Only the current value of each kept signal 
+        is held in memory. With the value changes loaded (e.g., from the sidecar index), the state at 
+        `start` comes from the store and the file is read from the first marker of the window on 
+        (the changes are replayed from the store if there is no seekable file). In filtered mode, 
+        kept signals outside the sig_file are streamed from the file.
+
+        Parameters: 
+            filename (str) : The path of the excerpt.
+            start (int) : The window start.
+            end (int) : The window end.
+            signals (List[str]) : The (full or partial) paths of the signals to keep.
+            scopes (List[str]) : The full paths of the $scopes whose $vars to keep.
+                                 Every $var is kept if neither `signals` nor `scopes` is given.
+        
+        Returns: 
+            int : The number of value changes written.
+        """
+
+        kept = dict()
+
+        if signals is None and scopes is None:
+            kept.update((var.get_id(), var) for _, var in self.hierarchy.iter_signals())
+
+        for signal in signals or ():
+            var = self.get_signal(signal)
+            kept[var.get_id()] = var
+
+        for scope in scopes or ():
+            prefix = scope.rstrip('/') + '/'
+            kept.update((var.get_id(), var) for path, var in self.hierarchy.iter_signals() if path.startswith(prefix))
+
+        kinds = { 
+            id : "port" if var.var_type == "port" else "real" if var.var_type == "real" else "scalar" if var.get_size() == 1 else "vector" 
+            for id, var in kept.items() 
+        }
+
+        # a filtered store lacks the kept signals outside the sig_file: those are streamed from the file
+        covered = self._loaded and (self._changes.kept is None or kinds.keys() <= self._changes.kept)
+        seek    = covered and self.compression is None and self.vcd_filename is not None
+
+        with ExitStack() as stack:
+
+            SLICEFILE = stack.enter_context(open(filename, "w"))
+            SLICEFILE.write("\n".join(self.raw_sections[Section.Header] + prune_definitions(self.raw_sections[Section.Variable_Definition], kept, self.type)) + "\n")
+
+            if seek:
+                # the state right before the first marker of the window
+                offset  = self.mapped.span(start, end)[0]
+                writer  = SliceWriter(SLICEFILE, kinds, start, end, { id : self._changes.value_at(id, start - 1) for id in kinds })
+                VCDFILE = stack.enter_context(open_dump(self.vcd_filename))
+                VCDFILE.seek(offset)
+                tokens  = tokenize_value_changes(TextIOWrapper(VCDFILE), ids = kinds.keys())
+            elif covered:
+                # no seekable file (e.g., after `load_columnar`, or compressed): replayed from the store
+                writer  = SliceWriter(SLICEFILE, kinds, start, end)
+                tokens  = self._changes.value_changes(set(kinds), markers = True)
+            else:
+                writer  = SliceWriter(SLICEFILE, kinds, start, end)
+                tokens  = stack.enter_context(closing(self.stream_value_changes(set(kinds))))
+
+            for timestamp, id, val in tokens:
+
+                if id is None:
+                    writer.on_timestamp(timestamp)
+                    if writer.done: break
+                else:
+                    writer.on_change(timestamp, id, val)
+
+            writer.on_finish()
+
+        return writer.written
+
+    def find_signals_histories(self, signals : List[str]) -> Dict[str, Tuple[array, List[str]]]:
+
+        """
+        Extracts the full history of many signals at once. If the value changes are not 
+        loaded (lazy, streaming modes) a single filtered pass over the file collects all 
+        of them, instead of one pass per signal.
+
+        Parameters: 
+            signals (List[str]) : The hierarchical signal names.
+        
+        Returns: 
+            Dict[str, Tuple[array, List[str]]] : Per signal, the timestamps and values of its changes.
+        """
+
+        ids = { signal : self.get_signal(signal).get_id() for signal in signals }
+
+        store = self._changes_of(set(ids.values()))
+
+        return { signal : store.history(id) for signal, id in ids.items() }
+
+    def find_all_signals_values(self, signals : List[str]) -> Dict[str, List[str]]:
+
+        """
+        Batch version of `find_all_signal_values`: one pass over the data for all the signals.
+        Each signal gets one value per timestamp: every value it took at that timestamp, 
+        or its previous value if it did not change.
+
+        Parameters: 
+            signals (List[str]) : The hierarchical signal names.
+        
+        Returns: 
+            Dict[str, List[str]] : Per signal, its values per timestamp.
+        """
+
+        ids = { signal : self.get_signal(signal).get_id() for signal in signals }
+
+        store = self._changes_of(set(ids.values()))
+
+        return { signal : _values_per_timestamp(store.timestamps, *store.history(id)) for signal, id in ids.items() }
+
+    def find_signals_arrays(self, signals : List[str]) -> Dict[str, PackedHistory]:
+
+        """
+        Returns the history of every signal as NumPy arrays (optional dependency): int64 
+        timestamps, 0/1 values packed in uint64 (or bit-packed uint8 rows for buses wider 
+        than 64 bits) and a sparse X/Z mask. If the value changes are not loaded, a single 
+        filtered pass packs them straight from the tokenizer, without keeping per-change strings.
+
+        Parameters: 
+            signals (List[str]) : The hierarchical signal names.
+        
+        Returns: 
+            Dict[str, PackedHistory] : Per signal, its _PackedHistory.
+
+        Raises:
+            TypeError : A signal is a real $var, which has no bits to pack.
+        """
+
+        if self.type != VCD_Type.Standard:
+            raise ValueError("Packed arrays hold standard VCD values only")
+
+        variables = { signal : self.get_signal(signal) for signal in signals }
+
+        for signal, var in variables.items():
+            if var.var_type == "real":
+                raise TypeError(f"Signal {signal} is a real $var; packed arrays hold bit vectors only")
+        widths    = { var.get_id() : var.get_size() for var in variables.values() }
+
+        if self._loaded:
+            histories = { id : pack_history(width, *self._changes.history(id)) for id, width in widths.items() }
+
+        else:
+            consumer = PackingConsumer(widths)
+            for timestamp, id, val in self.stream_value_changes(set(widths)):
+                if id is not None: consumer.on_change(timestamp, id, val)
+            histories = consumer.histories()
+
+        return { signal : histories[var.get_id()] for signal, var in variables.items() }
+
+    def sample_signals(self, signals : List[str], period : int, start : int = 0, end : int = None) -> "np.ndarray":
+
+        """
+        Strobes the signals every `period` time units in [start, end] and returns the dense 
+        (signals x samples) int64 matrix of their values (NumPy is required). Column `k` holds 
+        the values in effect at `start + k * period`; X/Z or not yet assigned values are -1. 
+        All the histories come from one (filtered) pass and are sampled with vectorized bisection.
+
+        Parameters: 
+            signals (List[str]) : The hierarchical signal names (at most 63 bits wide).
+            period (int) : The strobe period.
+            start (int) : The first strobe time.
+            end (int) : The last strobe time (defaults to the last timestamp of the file).
+        
+        Returns: 
+            np.ndarray : The (len(signals), samples) matrix.
+        """
+
+        if period <= 0:
+            raise ValueError(f"Strobe period must be positive, got {period}")
+
+        if end is None:
+            timestamps = self.mapped.times if not self._loaded and self.compression is None else self.changes.timestamps
+            end = timestamps[-1] if len(timestamps) else start
+
+        histories = self.find_signals_arrays(signals)
+        samples   = np.arange(start, end + 1, period, dtype = np.int64)
+        matrix    = np.empty((len(signals), len(samples)), dtype = np.int64)
+
+        for row, signal in enumerate(signals):
+            matrix[row] = histories[signal].sample(samples)
+
+        return matrix
+
+    def find_timestamps(self, condition : Condition) -> "np.ndarray":
+
+        """
+        Every timestamp at which a condition over signal values holds, e.g.
+        `Signal("clk").rising() & (Signal("en") == 1) & (Signal("state") == 3)`. The condition is 
+        evaluated with vectorized (NumPy) operations on the packed changes of its signals, at every
+        timestamp at which any of them changes. X/Z values never satisfy a comparison.
+
+        Parameters: 
+            condition (Condition) : Built from `Signal`s with comparisons, edges, `&`, `|`, `^` and `~`.
+        
+        Returns: 
+            np.ndarray : The sorted int64 timestamps.
+        """
+
+        return evaluate(condition, self.find_signals_arrays(sorted(condition.signals())))
+
+    def map_signals(self, func : Callable[[ChangeStore, str], object], signals : List[str], proc_num : int = mp.cpu_count()) -> Dict[str, object]:
+
+        """
+        Applies `func(store, id)` to every signal, fanned out over a process pool. The change store 
+        is published once in shared memory and the workers attach to it by name, decoding only the 
+        columns they query; nothing but the shared memory name and the ids is pickled per task.
+
+        Parameters: 
+            func (Callable[[ChangeStore, str], object]) : A module-level (picklable) function.
+            signals (List[str]) : The hierarchical signal names.
+            proc_num (int) : The number of worker processes (1 runs in-process).
+        
+        Returns: 
+            Dict[str, object] : Per signal, the result of `func`.
+        """
+
+        ids = { signal : self.get_signal(signal).get_id() for signal in signals }
+        unique_ids = list(dict.fromkeys(ids.values()))
+
+        # the workers attach to a copy of the columns, which does not know the filter
+        for id in unique_ids:
+            self.changes.require(id)
+
+        if proc_num <= 1 or len(unique_ids) < 2:
+
+            results = [func(self.changes, id) for id in unique_ids]
+
+        else:
+
+            chunksize, remainder = divmod(len(unique_ids), 4 * proc_num)
+
+            if remainder: 
+                chunksize += 1
+
+            chunks = [unique_ids[n:n + chunksize] for n in range(0, len(unique_ids), chunksize)]
+            shm    = publish(self.changes)
+
+            try:
+                with mp.Pool(processes = proc_num) as pool:
+                    results = [
+                        result for chunk in pool.starmap(apply_shared, zip(repeat(shm.name), repeat(func), chunks)) 
+                               for result in chunk
+                    ]
+            finally:
+                shm.close()
+                shm.unlink()
+
+        results = dict(zip(unique_ids, results))
+
+        return { signal : results[id] for signal, id in ids.items() }
+
+    def _value_changes_of(self, ids : Set[str]) -> Iterator[Tuple[int, str, str]]:
+
+        # replayed from the loaded store (there may be no file, e.g. after `load_columnar`); streamed otherwise
+        if self._loaded:
+            return self._changes.value_changes(ids)
+
+        return self.stream_value_changes(ids)
+
+    def _changes_of(self, ids : Set[str]) -> ChangeStore:
+
+        # the loaded store already holds every id; otherwise collect the requested ones in one pass
+        if self._loaded:
+            return self._changes
+
+        return load_store(self.vcd_filename, self.value_change_offset, ids)
+
+    @classmethod
+    async def open_async(cls, *args, executor : Executor = None, **kwargs) -> "VCD_Parser":
+
+        """
+        Asyncio counterpart of the constructor (same arguments). The header is parsed in the default 
+        executor of the event loop and the value change section is tokenized in `executor`, 
+        so the event loop never blocks on the file.
+
+        Parameters: 
+            executor (Executor) : Runs the tokenizer; a ProcessPoolExecutor takes it off the GIL.
+                                  Defaults to the default executor of the event loop.
+
+        Returns: 
+            VCD_Parser : A parser (of the calling class).
+        """
+
+        lazy = kwargs.pop("lazy", False)
+
+        self = await asyncio.get_running_loop().run_in_executor(None, partial(cls, *args, lazy = True, **kwargs))
+
+        if not (lazy or self.streaming):
+            await self.load_value_changes_async(executor)
+
+        return self
+
+    async def load_value_changes_async(self, executor : Executor = None) -> None:
+
+        """
+        Asyncio counterpart of `load_value_changes`, run in `executor`. Only the `changes` 
+        store is loaded, as in streaming mode; `raw_sections` stays empty.
+
+        Parameters: 
+            executor (Executor) : Runs the tokenizer. Defaults to the default executor of the event loop.
+        """
+
+        if self._loaded:
+            return
+
+        loop  = asyncio.get_running_loop()
+        store = await loop.run_in_executor(executor, load_store, self.vcd_filename, self.value_change_offset, self.filter_ids)
+
+        # waits (off the event loop) for a concurrent sync load, whose complete store then wins
+        await loop.run_in_executor(None, self._adopt_store, store)
+
+    def _adopt_store(self, store : ChangeStore) -> None:
+
+        with self._load_lock:
+            if not self._loaded:
+                self._changes, self._loaded = store, True
+                self._count_changes()
+
+    async def find_signals_histories_async(self, signals : List[str], executor : Executor = None) -> Dict[str, Tuple[array, List[str]]]:
+
+        """
+        Asyncio counterpart of `find_signals_histories`; the single filtered pass (if the 
+        value changes are not loaded) runs in `executor`.
+        """
+
+        ids = { signal : self.get_signal(signal).get_id() for signal in signals }
+
+        store = self._changes if self._loaded else await asyncio.get_running_loop().run_in_executor(executor, load_store, self.vcd_filename, self.value_change_offset, frozenset(ids.values()))
+
+        return { signal : store.history(id) for signal, id in ids.items() }
+
+    async def query_async(self, query : Callable, *args, **kwargs) -> object:
+
+        """
+        Runs any (blocking) query method, e.g. `parser.find_signal_values_at`, in the default 
+        executor of the event loop, once the value changes are loaded.
+
+        Parameters: 
+            query (Callable) : A bound query method of the parser.
+            args, kwargs : Its arguments.
+
+        Returns: 
+            object : The result of the query.
+        """
+
+        if not self.streaming:
+            await self.load_value_changes_async()
+
+        return await asyncio.get_running_loop().run_in_executor(None, partial(query, *args, **kwargs))
+
+def load_store(vcd_filename : str, offset : int, ids : Set[str] = None) -> ChangeStore:
+
+    """
+    Tokenizes the value change section (starting at the byte `offset`) into a change store, 
+    keeping the changes of `ids` only (if given). Module-level so that process pools can run it.
+    """
+
+    store = ChangeStore(ids)
+
+    with open_dump(vcd_filename) as VCDFILE:
+
+        VCDFILE.seek(offset)
+
+        for timestamp, id, val in tokenize_value_changes(TextIOWrapper(VCDFILE), ids = ids):
+            if id is None: store.on_timestamp(timestamp)
+            else: store.on_change(timestamp, id, val)
+
+    return store
+
+def _last_marker(VCDFILE, start : int, end : int) -> int:
+
+    """
+    The byte offset of the last `#<time>` marker line that starts in ]start, end[ of a binary file, 
+    searched backwards in blocks of FOLLOW_CHUNK bytes; `start` if there is none.
+    """
+
+    hi = end
+
+    while hi > start:
+
+        lo = max(hi - FOLLOW_CHUNK, start)
+        VCDFILE.seek(lo)
+        found = VCDFILE.read(hi - lo).rfind(b"\n#")
+
+        if found != -1:
+            return lo + found + 1
+
+        if lo == start:
+            break
+
+        # the next block overlaps by one byte, for a newline right before the boundary
+        hi = lo + 1
+
+    return start
+
+def _read_lines(VCDFILE, start : int, end : int) -> Iterator[str]:
+
+    """
+    The lines of the [start, end[ byte range of a binary file, read FOLLOW_CHUNK bytes at a time.
+    The partial last line of a chunk is carried over to the next one.
+    """
+
+    VCDFILE.seek(start)
+    remaining, pending = end - start, b""
+
+    while remaining > 0:
+
+        chunk = VCDFILE.read(min(FOLLOW_CHUNK, remaining))
+
+        if not chunk:
+            break
+
+        remaining -= len(chunk)
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+
+        for line in lines:
+            yield line.decode()
+
+    if pending:
+        yield pending.decode()
+
+def _values_per_timestamp(timestamps : array, times : array, values : List[str]) -> List[str]:
+
+    """
+    Expands the changes of a signal to one entry per `#<time>` marker: every value it took 
+    at that timestamp, or its previous value if it did not change (None if never assigned).
+    Changes preceding the first marker (a leading $dumpvars) come first.
+    """
+
+    retvals, previous, index = list(), None, 0
+
+    first = timestamps[0] if len(timestamps) else None
+
+    while index < len(times) and (first is None or times[index] < first):
+        previous = values[index]
+        retvals.append(previous)
+        index += 1
+
+    for marker in timestamps:
+
+        start = index
+        while index < len(times) and times[index] <= marker:
+            index += 1
 
-        # Search tree to acquire the leaf's (signal) parental node i.e., nesting cell
-        subtree = None 
-        for module in hierarchy[:-1]:
-            _tree_id = self.tree_metadata[module]
-            subtree = self.tree.get_node(_tree_id)
+        if index > start:
+            retvals.extend(values[start:index])
+            previous = values[index - 1]
+        else:
+            retvals.append(previous)
 
-        return subtree.data.get_var(port)
\ No newline at end of file
+    return retvals
@@ -0,0 +1,287 @@
+import re
+
+from array      import array
+from typing     import Dict, List, Optional, TextIO, Tuple
+from _Tokenizer import ValueChangeConsumer
+from _WaveDiff  import normalize
+from _Hierarchy import _Hierarchy as Hierarchy
+from _Scope     import _Scope     as Scope
+
+# Per bit state codes : 0, 1, X/Z (unknown, and unassigned)
+STATE_TABLE = bytes(0 if byte == ord('0') else 1 if byte == ord('1') else 2 for byte in range(256))
+UNKNOWN     = 2
+
+TIMESCALE_REGEXP = r"\$timescale\s*([0-9]+)\s*([a-z]+)\s*\$end"
+
+# (TC, T0, T1, TX)
+Counters = Tuple[int, int, int, int]
+
+class _Activity(ValueChangeConsumer):
+
+	"""Switching activity (toggle count, time at 0, at 1 and at X/Z) of `$var`s, accumulated in a single pass.
+
+	Every bit of every tracked identifier owns a slot in compact parallel arrays. A change only touches the
+	slots of its bits that change state: the time spent in the previous state is added to the matching
+	duration array and 0 <-> 1 transitions are counted as toggles. Only time and toggles within the
+	`[start, end]` window are counted; before its first change a bit is at X/Z.
+
+	### Attributes
+	1. start : int
+	2. end : Optional[int]
+		- The window; it ends at the last `#<time>` marker if `end` is None.
+	3. slots : Dict[ _Var.id : Tuple[int, int] ]
+		- Per identifier, its first slot and its width (bit 0 of the slot range is the MSB).
+	4. toggles, t0, t1, tx : array[int]
+		- The counters, per slot.
+
+	### Methods
+	- of(id : str) : List[Counters]
+		- The (TC, T0, T1, TX) counters of every bit (MSB first) of an identifier.
+	- totals(id : str) : Counters
+		- The counters of an identifier, summed over its bits.
+	"""
+
+	def __init__(self, widths : Dict[str, int], start : int = 0, end : Optional[int] = None):
+		"""Constructor
+
+		### Parameters
+		1. widths : Dict[str, int]
+			- The bit length of every identifier to track.
+		2. start : int
+		3. end : Optional[int]
+
+		### Returns
+		`_Activity` object instance.
+		"""
+		self.start = start
+		self.end   = end
+		self.slots = dict()
+
+		count = 0
+		for id, width in widths.items():
+			self.slots[id] = (count, width)
+			count += width
+
+		self.toggles = array('q', bytes(8 * count))
+		self.t0      = array('q', bytes(8 * count))
+		self.t1      = array('q', bytes(8 * count))
+		self.tx      = array('q', bytes(8 * count))
+		self.states  = bytearray([UNKNOWN]) * count
+		self.since   = array('q', [start]) * count
+		self.last    = start # the last #<time> marker
+
+	def __repr__(self) -> str:
+		"""String representation for the _Activity object instance
+
+		### Parameters
+		- None
+
+		### Returns
+		- str
+		"""
+		return f"_Activity(#ids={len(self.slots)}, #bits={len(self.states)}, window=[{self.start}, {self.end}])"
+
+	def _spend(self, slot : int, until : int) -> None:
+
+		lo = self.since[slot] if self.since[slot] > self.start else self.start
+		hi = until if self.end is None or until < self.end else self.end
+
+		if hi > lo:
+			(self.t0, self.t1, self.tx)[self.states[slot]][slot] += hi - lo
+
+	def on_timestamp(self, timestamp : int) -> None:
+		self.last = timestamp
+
+	def on_change(self, timestamp : int, id : str, value : str) -> None:
+
+		slot = self.slots.get(id)
+		if slot is None:
+			return
+
+		base, width = slot
+		codes = normalize(value, width)[-width:].encode().translate(STATE_TABLE)
+		counted = self.start <= timestamp and (self.end is None or timestamp <= self.end)
+
+		for bit, code in enumerate(codes):
+
+			slot = base + bit
+			previous = self.states[slot]
+
+			if code == previous:
+				continue
+
+			self._spend(slot, timestamp)
+
+			if counted and previous != UNKNOWN and code != UNKNOWN:
+				self.toggles[slot] += 1
+
+			self.states[slot] = code
+			self.since[slot]  = timestamp
+
+	def on_finish(self) -> None:
+
+		# close the window : the time since the last change of every bit
+		if self.end is None:
+			self.end = self.last
+
+		for slot in range(len(self.states)):
+			self._spend(slot, self.end)
+			self.since[slot] = self.end
+
+	@property
+	def duration(self) -> int:
+		return max((self.end if self.end is not None else self.last) - self.start, 0)
+
+	def of(self, id : str) -> List[Counters]:
+		"""Returns the (TC, T0, T1, TX) counters of every bit (MSB first) of an identifier.
+
+		### Parameters
+		1. id : str
+
+		### Returns
+		- List[Counters]
+		"""
+		base, width = self.slots[id]
+		return [(self.toggles[slot], self.t0[slot], self.t1[slot], self.tx[slot]) for slot in range(base, base + width)]
+
+	def totals(self, id : str) -> Counters:
+		"""Returns the (TC, T0, T1, TX) counters of an identifier, summed over its bits.
+
+		### Parameters
+		1. id : str
+
+		### Returns
+		- Counters
+		"""
+		return tuple(map(sum, zip(*self.of(id))))
+
+def rollup(hierarchy : Hierarchy, activity : _Activity) -> Dict[int, Counters]:
+	"""Sums the counters of the tracked `$var`s of every `$scope` and of all its nested `$scope`s.
+
+	Scopes are keyed by their index in `hierarchy.scopes` (see `hierarchy.scope_paths`), so that
+	a re-entered `$scope`, whose path repeats, keeps its own totals.
+
+	### Parameters
+	1. hierarchy : _Hierarchy
+	2. activity : _Activity
+
+	### Returns
+	- Dict[int, Counters] : per `$scope` index, the (TC, T0, T1, TX) totals.
+	"""
+	totals = [[0, 0, 0, 0] for _ in hierarchy.scopes]
+
+	for scope, counters in zip(hierarchy.scopes, totals):
+		for var in scope.vars.values():
+			if var.get_id() in activity.slots:
+				for field, value in enumerate(activity.totals(var.get_id())):
+					counters[field] += value
+
+	# nested scopes are defined after their parent
+	for scope in reversed(range(len(hierarchy.scopes))):
+		parent = hierarchy.parents[scope]
+		if parent != -1:
+			for field, value in enumerate(totals[scope]):
+				totals[parent][field] += value
+
+	return { scope : tuple(counters) for scope, counters in enumerate(totals) }
+
+def timescale_of(header : List[str]) -> Tuple[int, str]:
+	"""Returns the (number, unit) `$timescale` of a VCD header, (1, "ns") if it has none.
+
+	### Parameters
+	1. header : List[str]
+		- The lines of the header section.
+
+	### Returns
+	- Tuple[int, str]
+	"""
+	match = re.search(TIMESCALE_REGEXP, " ".join(header))
+	return (int(match[1]), match[2]) if match else (1, "ns")
+
+def _escape(name : str) -> str:
+	return name.replace('[', '\\[').replace(']', '\\]')
+
+def _saif_nets(var, activity : _Activity) -> List[Tuple[str, Counters]]:
+
+	name = var.get_reference().replace(' ', '')
+	bits = activity.of(var.get_id())
+
+	# a bit-blasted net (e.g., `warp_state_out [1]`, `stack_mem [31][65]`) keeps its selects
+	if len(bits) == 1:
+		return [(_escape(name), bits[0])]
+
+	# a vector is one net per bit : name[msb] ... name[lsb]; only its last select is a part select
+	base, bracket, select = name.rpartition('[')
+	msb, colon, lsb = select.rstrip(']').partition(':')
+
+	if bracket and colon and msb.isdigit() and lsb.isdigit():
+		msb, lsb = int(msb), int(lsb)
+	else:
+		# no part select (e.g., `data` or the array word `mem[3]`)
+		base, msb, lsb = name, len(bits) - 1, 0
+
+	step = -1 if msb >= lsb else 1
+
+	return [(f"{_escape(base)}\\[{msb + step * bit}\\]", counters) for bit, counters in enumerate(bits)]
+
+def _saif_instance(scope : Scope, activity : _Activity, depth : int) -> List[str]:
+
+	indent = "  " * depth
+	lines  = list()
+
+	nets = [net for var in scope.vars.values() if var.get_id() in activity.slots for net in _saif_nets(var, activity)]
+
+	if nets:
+		lines.append(f"{indent}  (NET")
+		for name, (tc, t0, t1, tx) in nets:
+			lines.append(f"{indent}    ({name}")
+			lines.append(f"{indent}      (T0 {t0}) (T1 {t1}) (TX {tx})")
+			lines.append(f"{indent}      (TC {tc}) (IG 0)")
+			lines.append(f"{indent}    )")
+		lines.append(f"{indent}  )")
+
+	for nested in scope.scopes:
+		lines += _saif_instance(nested, activity, depth + 1)
+
+	# instances without tracked nets are left out
+	if not lines:
+		return lines
+
+	return [f"{indent}(INSTANCE {scope.cell_name}"] + lines + [f"{indent})"]
+
+def write_saif(SAIFFILE : TextIO, hierarchy : Hierarchy, activity : _Activity, timescale : Tuple[int, str], date : str = "") -> None:
+	"""Writes the activity as a (backward) SAIF 2.0 file.
+
+	### Parameters
+	1. SAIFFILE : TextIO
+	2. hierarchy : _Hierarchy
+	3. activity : _Activity
+		- The (finished) activity of the `$var`s to write.
+	4. timescale : Tuple[int, str]
+		- The `$timescale` of the VCD file, e.g. (1, "ns").
+	5. date : str
+
+	### Returns
+	- None
+	"""
+	lines = [
+		"(SAIFILE",
+		"(SAIFVERSION \"2.0\")",
+		"(DIRECTION \"backward\")",
+		"(DESIGN )",
+		f"(DATE \"{date}\")",
+		"(VENDOR \"vcd-py\")",
+		"(PROGRAM_NAME \"vcd-py\")",
+		"(VERSION \"1.0\")",
+		"(DIVIDER / )",
+		f"(TIMESCALE {timescale[0]} {timescale[1]})",
+		f"(DURATION {activity.duration})",
+	]
+
+	for scope, parent in zip(hierarchy.scopes, hierarchy.parents):
+		if parent == -1:
+			lines += _saif_instance(scope, activity, 0)
+
+	lines.append(")")
+
+	SAIFFILE.write("\n".join(lines) + "\n")
@@ -0,0 +1,201 @@
+from array      import array
+from bisect     import bisect_left, bisect_right
+from heapq      import merge
+from itertools  import repeat
+from operator   import itemgetter
+from typing     import AbstractSet, Iterable, Iterator, List, Optional, Tuple
+from _Tokenizer import ValueChangeConsumer
+
+class _ChangeStore(ValueChangeConsumer):
+
+	"""Per-`$var` columnar store of the value changes of a VCD file.
+
+	Every identifier owns a sorted timestamp array and a parallel value list, so that
+	point queries are answered by bisection in O(log changes) of the queried signal,
+	independently of the length of the simulation.
+
+	### Attributes
+	1. timestamps : array[int]
+		- Every `#<time>` marker of the value change section, in file order.
+	2. times : Dict[ _Var.id : array[int] ]
+		- The timestamps at which each identifier changed value.
+	3. values : Dict[ _Var.id : List[str] ]
+		- The values each identifier took, parallel to `times`.
+	4. kept : Optional[AbstractSet[str]]
+		- The only identifiers recorded (e.g., the sig_file signals of a filtered parser); None keeps every one.
+
+	### Methods
+	- require(id : str) : None
+		- Raises KeyError if the identifier is not recorded by a filtered store.
+	- has_timestamp(at : int) : bool
+		- Whether `#<at>` is a marker of the value change section.
+	- value_at(id : str, at : int) : str
+		- The value of the identifier in effect at time `at` (None if unassigned).
+	- history(id : str) : Tuple[array, List[str]]
+		- Every (timestamp, value) change of the identifier.
+	- changes_between(id : str, start : int, end : int) : Tuple[array, List[str]]
+		- The changes of the identifier with `start <= timestamp < end`.
+	- value_changes(ids : Iterable[str]) : Iterator[Tuple[int, str, str]]
+		- Replays the changes of the identifiers as a token stream, in time order.
+	"""
+
+	def __init__(self, kept : Optional[AbstractSet[str]] = None):
+		"""Constructor
+
+		### Parameters
+		1. kept : Optional[AbstractSet[str]]
+			- Queries of any other identifier raise, instead of answering as if it never changed.
+
+		### Returns
+		`_ChangeStore` object instance.
+		"""
+		self.timestamps = array('q')
+		self.times      = dict() # Dict[str, array]
+		self.values     = dict() # Dict[str, List[str]]
+		self.kept       = kept
+
+	def __repr__(self) -> str:
+		"""String representation for the _ChangeStore object instance
+
+		### Parameters
+		- None
+
+		### Returns
+		- str
+		"""
+		return f"_ChangeStore(#timestamps={len(self.timestamps)}, #ids={len(self.times)})"
+
+	def on_timestamp(self, timestamp : int) -> None:
+		self.timestamps.append(timestamp)
+
+	def on_change(self, timestamp : int, id : str, value : str) -> None:
+
+		times = self.times.get(id)
+
+		if times is None:
+			times = self.times[id] = array('q')
+			self.values[id] = list()
+
+		times.append(timestamp)
+		self.values[id].append(value)
+
+	def require(self, id : str) -> None:
+		"""Checks that the changes of the identifier are recorded.
+
+		### Parameters
+		1. id : str
+
+		### Returns
+		- None
+
+		Raises
+		------
+		- KeyError
+			- The store is filtered and the identifier is not one of the kept ones.
+		"""
+		if self.kept is not None and id not in self.kept:
+			raise KeyError(f"$var id {id} is excluded by the sig_file filter; only the changes of the sig_file signals are kept")
+
+	def has_timestamp(self, at : int) -> bool:
+		"""Searches (by bisection) the `#<time>` markers for `at`.
+
+		### Parameters
+		1. at : int
+
+		### Returns
+		- bool
+		"""
+		index = bisect_left(self.timestamps, at)
+		return index < len(self.timestamps) and self.timestamps[index] == at
+
+	def value_at(self, id : str, at : int) -> Optional[str]:
+		"""Returns the value of the identifier in effect at time `at`, i.e., its last change at or before `at`.
+
+		### Parameters
+		1. id : str
+			- The `_Var.id` of the signal.
+		2. at : int
+			- The timestamp.
+
+		### Returns
+		- str or None if the identifier has not been assigned a value up until `at`.
+		"""
+		self.require(id)
+
+		times = self.times.get(id)
+
+		if times is None:
+			return None
+
+		index = bisect_right(times, at)
+		return self.values[id][index - 1] if index else None
+
+	def history(self, id : str) -> Tuple[array, List[str]]:
+		"""Returns every change of the identifier.
+
+		### Parameters
+		1. id : str
+			- The `_Var.id` of the signal.
+
+		### Returns
+		- Tuple[array, List[str]] : the timestamps and the values of the changes.
+		"""
+		self.require(id)
+
+		return self.times.get(id, array('q')), self.values.get(id, list())
+
+	def changes_between(self, id : str, start : int, end : int) -> Tuple[array, List[str]]:
+		"""Returns the changes of the identifier with `start <= timestamp < end`.
+
+		### Parameters
+		1. id : str
+			- The `_Var.id` of the signal.
+		2. start : int
+		3. end : int
+
+		### Returns
+		- Tuple[array, List[str]] : the timestamps and the values of the changes.
+		"""
+		times, values = self.history(id)
+
+		lo = bisect_left(times, start)
+		hi = bisect_left(times, end, lo)
+
+		return times[lo:hi], values[lo:hi]
+
+	def value_changes(self, ids : Iterable[str], markers : bool = False) -> Iterator[Tuple[int, Optional[str], Optional[str]]]:
+		"""Replays the changes of the identifiers as a token stream (see `tokenize_value_changes`), in time order:
+		a `(timestamp, None, None)` marker precedes the changes of every timestamp at which any of them changes.
+
+		### Parameters
+		1. ids : Iterable[str]
+		2. markers : bool
+			- Also replay the markers of the timestamps at which none of them changes, as a file pass would.
+
+		### Returns
+		- Iterator[Tuple[int, str, str]]
+		"""
+		# merge is stable: within a timestamp, the changes come in the (deterministic) order of the ids
+		histories  = [zip(times, repeat(id), values) for id in sorted(ids) for times, values in [self.history(id)]]
+		timestamps = self.timestamps if markers else ()
+		current    = None
+		pending    = 0
+
+		for timestamp, id, value in merge(*histories, key = itemgetter(0)):
+
+			if timestamp != current:
+
+				while pending < len(timestamps) and timestamps[pending] < timestamp:
+					yield timestamps[pending], None, None
+					pending += 1
+
+				if pending < len(timestamps) and timestamps[pending] == timestamp:
+					pending += 1
+
+				current = timestamp
+				yield timestamp, None, None
+
+			yield timestamp, id, value
+
+		for timestamp in timestamps[pending:]:
+			yield timestamp, None, None
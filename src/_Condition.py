@@ -0,0 +1,207 @@
+import operator
+
+from abc            import ABC, abstractmethod
+from typing         import Dict, FrozenSet
+from _PackedHistory import _PackedHistory as PackedHistory, UNKNOWN_VALUE, require_numpy, np
+
+class _Context():
+
+	"""The evaluation grid of a condition and the sampled values of its signals, computed once per signal."""
+
+	def __init__(self, grid, histories : Dict[str, PackedHistory]):
+		self.grid      = grid
+		self.histories = histories
+		self._now      = dict()
+		self._before   = dict()
+
+	def now(self, signal : str):
+		"""The value of the signal at every grid time, after the changes of that time."""
+		if signal not in self._now:
+			self._now[signal] = self.histories[signal].sample(self.grid)
+		return self._now[signal]
+
+	def before(self, signal : str):
+		"""The value of the signal right before every grid time."""
+		if signal not in self._before:
+			self._before[signal] = self.histories[signal].sample(self.grid - 1)
+		return self._before[signal]
+
+class _Condition(ABC):
+
+	"""A boolean expression over signal values, evaluated on all the grid times at once.
+
+	Conditions are combined with `&`, `|`, `^` and `~`; `and`, `or`, `not` and `if` raise
+	a TypeError, as a condition has no truth value of its own. Building a condition needs no
+	NumPy: its (element-wise) operators only run in `evaluate`.
+
+	### Methods
+	- signals() : FrozenSet[str]
+		- The signal paths the condition depends on.
+	- evaluate(context : _Context) : np.ndarray[bool]
+		- Whether the condition holds at every grid time.
+	"""
+
+	@abstractmethod
+	def signals(self) -> FrozenSet[str]:
+		...
+
+	@abstractmethod
+	def evaluate(self, context : _Context):
+		...
+
+	def __bool__(self):
+		raise TypeError("use & | ~ to combine conditions")
+
+	def __and__(self, other : "_Condition") -> "_Condition":
+		return _Combine(operator.and_, self, other)
+
+	def __or__(self, other : "_Condition") -> "_Condition":
+		return _Combine(operator.or_, self, other)
+
+	def __xor__(self, other : "_Condition") -> "_Condition":
+		return _Combine(operator.xor, self, other)
+
+	def __invert__(self) -> "_Condition":
+		return _Not(self)
+
+class _Combine(_Condition):
+
+	def __init__(self, operator, left : _Condition, right : _Condition):
+		self.operator, self.left, self.right = operator, left, right
+
+	def __repr__(self) -> str:
+		return f"({self.left!r} {self.operator.__name__} {self.right!r})"
+
+	def signals(self) -> FrozenSet[str]:
+		return self.left.signals() | self.right.signals()
+
+	def evaluate(self, context : _Context):
+		return self.operator(self.left.evaluate(context), self.right.evaluate(context))
+
+class _Not(_Condition):
+
+	def __init__(self, operand : _Condition):
+		self.operand = operand
+
+	def __repr__(self) -> str:
+		return f"~{self.operand!r}"
+
+	def signals(self) -> FrozenSet[str]:
+		return self.operand.signals()
+
+	def evaluate(self, context : _Context):
+		return ~self.operand.evaluate(context)
+
+class _Compare(_Condition):
+
+	def __init__(self, operator, signal : str, constant : int):
+		self.operator, self.signal, self.constant = operator, signal, constant
+
+	def __repr__(self) -> str:
+		return f"({self.signal} {self.operator.__name__} {self.constant})"
+
+	def signals(self) -> FrozenSet[str]:
+		return frozenset([self.signal])
+
+	def evaluate(self, context : _Context):
+		# X/Z (or unassigned) values never compare true
+		values = context.now(self.signal)
+		return self.operator(values, self.constant) & (values != UNKNOWN_VALUE)
+
+class _Edge(_Condition):
+
+	def __init__(self, signal : str, before : int, after : int):
+		self.signal, self.from_value, self.to_value = signal, before, after
+
+	def __repr__(self) -> str:
+		return f"edge({self.signal}, {self.from_value}->{self.to_value})"
+
+	def signals(self) -> FrozenSet[str]:
+		return frozenset([self.signal])
+
+	def evaluate(self, context : _Context):
+		before, now = context.before(self.signal), context.now(self.signal)
+		if self.from_value is None:
+			return before != now
+		return (before == self.from_value) & (now == self.to_value)
+
+class Signal():
+
+	"""A signal (full or partial hierarchical path) in a condition.
+
+	Comparing it to an integer (`==`, `!=`, `<`, `<=`, `>`, `>=`) gives a condition on its
+	value; `rising()`, `falling()` and `changed()` give edge conditions.
+
+	### Methods
+	- rising() : _Condition
+		- The signal goes from 0 to 1.
+	- falling() : _Condition
+		- The signal goes from 1 to 0.
+	- changed() : _Condition
+		- The value of the signal changes.
+	"""
+
+	__hash__ = None
+
+	def __init__(self, path : str):
+		"""Constructor
+
+		### Parameters
+		1. path : str
+			- The hierarchical signal name.
+
+		### Returns
+		`Signal` object instance.
+		"""
+		self.path = path
+
+	def __repr__(self) -> str:
+		return f"Signal({self.path})"
+
+	def __eq__(self, constant : int) -> _Condition:
+		return _Compare(operator.eq, self.path, constant)
+
+	def __ne__(self, constant : int) -> _Condition:
+		return _Compare(operator.ne, self.path, constant)
+
+	def __lt__(self, constant : int) -> _Condition:
+		return _Compare(operator.lt, self.path, constant)
+
+	def __le__(self, constant : int) -> _Condition:
+		return _Compare(operator.le, self.path, constant)
+
+	def __gt__(self, constant : int) -> _Condition:
+		return _Compare(operator.gt, self.path, constant)
+
+	def __ge__(self, constant : int) -> _Condition:
+		return _Compare(operator.ge, self.path, constant)
+
+	def rising(self) -> _Condition:
+		return _Edge(self.path, 0, 1)
+
+	def falling(self) -> _Condition:
+		return _Edge(self.path, 1, 0)
+
+	def changed(self) -> _Condition:
+		return _Edge(self.path, None, None)
+
+def evaluate(condition : _Condition, histories : Dict[str, PackedHistory]):
+	"""Evaluates a condition at every timestamp at which any of its signals changes.
+
+	Each signal is sampled once on that grid (after the changes of each timestamp, and right before
+	it for edges), then the whole expression is computed with array operations.
+
+	### Parameters
+	1. condition : _Condition
+	2. histories : Dict[str, _PackedHistory]
+		- The packed changes of every signal of the condition, by path.
+
+	### Returns
+	- np.ndarray[int64] : the (sorted) timestamps at which the condition holds.
+	"""
+	require_numpy()
+
+	times = [histories[signal].times for signal in condition.signals()]
+	grid  = np.unique(np.concatenate(times)) if times else np.empty(0, dtype = np.int64)
+
+	return grid[condition.evaluate(_Context(grid, histories))]
@@ -0,0 +1,56 @@
+import io
+import bz2
+import gzip
+import lzma
+
+from typing import BinaryIO, Optional
+
+# Leading bytes of the compressed formats, and the stdlib codec that decodes each one
+COMPRESSION_MAGIC = {
+	b"\x1f\x8b"         : ("gzip", gzip.GzipFile),
+	b"\xfd7zXZ\x00"     : ("xz",   lzma.LZMAFile),
+	b"BZh"              : ("bz2",  bz2.BZ2File),
+}
+
+CHUNK_SIZE = 1 << 20 # bytes decompressed per read
+
+def compression_of(filename : str) -> Optional[str]:
+	"""Detects the compression of a dump file from its magic bytes (not from its suffix).
+
+	### Parameters
+	1. filename : str
+
+	### Returns
+	- Optional[str] : "gzip", "xz", "bz2", or None for an uncompressed file.
+	"""
+	with open(filename, "rb") as DUMPFILE:
+		head = DUMPFILE.read(6)
+
+	for magic, (name, _) in COMPRESSION_MAGIC.items():
+		if head.startswith(magic):
+			return name
+
+	return None
+
+def open_dump(filename : str) -> BinaryIO:
+	"""Opens a (possibly compressed) dump file as a binary stream of its uncompressed contents.
+
+	Compressed files are decoded on the fly in `CHUNK_SIZE` chunks; the uncompressed contents
+	are never written out or held in memory as a whole. Seeking is supported (forward seeks
+	decode and discard the skipped bytes), so byte offsets of the uncompressed contents can
+	be used as with a plain file.
+
+	### Parameters
+	1. filename : str
+
+	### Returns
+	- BinaryIO
+	"""
+	compression = compression_of(filename)
+
+	if compression is None:
+		return open(filename, "rb")
+
+	codec = next(codec for name, codec in COMPRESSION_MAGIC.values() if name == compression)
+
+	return io.BufferedReader(codec(filename, "rb"), buffer_size = CHUNK_SIZE)
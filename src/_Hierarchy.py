@@ -0,0 +1,208 @@
+import re
+
+from array  import array
+from typing import Iterable, Iterator, Tuple
+from utils  import VCD_Type, SCOPE_REGEXP, S_VAR_REGEXP, E_VAR_REGEXP
+from _Var   import _Var   as Var
+from _Scope import _Scope as Scope, ScopeHasNoVar
+
+class _Hierarchy():
+
+	"""Flat representation of the `$scope` / `$var` hierarchy of a VCD/eVCD file.
+
+	Scopes are kept in a table (in definition order) with the index of their parent, and
+	every `$var` is registered under its full hierarchical path (`top/.../cell/var`), so that
+	a full path resolves with a single hash lookup. Instances with the same cell name in
+	different branches have distinct paths and never collide.
+
+	### Attributes
+	1. scopes : List[ _Scope ]
+		- The table of `$scope`s, in definition order.
+	2. parents : array[int]
+		- The index of each scope's parent in `scopes` (-1 for top-level scopes).
+	3. scope_paths : List[str]
+		- The full path of each scope, parallel to `scopes`.
+	4. paths : Dict[ str : _Var ]
+		- Full `$var` path to `_Var`.
+
+	### Methods
+	- from_definitions(definitions : Iterable[str], type : VCD_Type) : _Hierarchy
+		- Builds the hierarchy of a Variable Definition section.
+	- open_scope(scope : _Scope) : None
+		- Enters a `$scope` nested in the current one.
+	- close_scope() : None
+		- Leaves the current `$scope` (`$upscope`).
+	- add_var(var : _Var) : None
+		- Registers a `$var` in the current `$scope`.
+	- get_signal(signal : str) : _Var
+		- Resolves a full or partial hierarchical path to its `_Var`.
+	- iter_signals() : Iterator[Tuple[str, _Var]]
+		- Every (full path, `_Var`) pair, in definition order.
+	"""
+
+	def __init__(self):
+		"""Constructor
+
+		### Parameters
+		- None
+
+		### Returns
+		`_Hierarchy` object instance.
+		"""
+		self.scopes      = list()     # List[Scope]
+		self.parents     = array('l')
+		self.scope_paths = list()     # List[str]
+		self.paths       = dict()     # Dict[str, Var]
+		self._by_name    = dict()     # Dict[cell_name, List[scope index]]
+		self._stack      = list()     # indices of the currently open scopes
+
+	def __repr__(self) -> str:
+		"""String representation for the _Hierarchy object instance
+
+		### Parameters
+		- None
+
+		### Returns
+		- str
+		"""
+		return f"_Hierarchy(#scopes={len(self.scopes)}, #vars={len(self.paths)})"
+
+	@classmethod
+	def from_definitions(cls, definitions : Iterable[str], type : VCD_Type) -> "_Hierarchy":
+		"""Builds the hierarchy from the lines of a Variable Definition section.
+
+		### Parameters
+		1. definitions : Iterable[str]
+			- The `$scope`, `$var`, `$upscope` (...) lines.
+		2. type : VCD_Type
+			- Selects the standard or extended `$var` syntax.
+
+		### Returns
+		`_Hierarchy` object instance.
+		"""
+		hierarchy = cls()
+
+		s_regex  = re.compile(SCOPE_REGEXP)
+		v_regex  = re.compile(S_VAR_REGEXP) if type == VCD_Type.Standard else re.compile(E_VAR_REGEXP)
+
+		for raw_str in definitions:
+
+			# dispatch on the keyword; only the matching regex is tried
+			if raw_str.startswith("$var"):
+
+				is_var = v_regex.match(raw_str)
+				if is_var: hierarchy.add_var(Var(*is_var.groups()))
+
+			elif raw_str.startswith("$scope"):
+
+				is_scope = s_regex.match(raw_str)
+				if is_scope: hierarchy.open_scope(Scope(*is_scope.groups()))
+
+			# closing statement for module in VCD syntax
+			elif raw_str.startswith("$upscope"):
+				hierarchy.close_scope()
+
+		return hierarchy
+
+	def open_scope(self, scope : Scope) -> None:
+		"""Enters a `$scope` nested in the currently open one (or a top-level one).
+
+		### Parameters
+		1. scope : _Scope
+
+		### Returns
+		- None
+		"""
+		index  = len(self.scopes)
+		parent = self._stack[-1] if self._stack else -1
+
+		if parent != -1:
+			self.scopes[parent].append_scope(scope)
+			path = f"{self.scope_paths[parent]}/{scope.cell_name}"
+		else:
+			path = scope.cell_name
+
+		self.scopes.append(scope)
+		self.parents.append(parent)
+		self.scope_paths.append(path)
+		self._by_name.setdefault(scope.cell_name, list()).append(index)
+		self._stack.append(index)
+
+	def close_scope(self) -> None:
+		"""Leaves the currently open `$scope`.
+
+		### Parameters
+		- None
+
+		### Returns
+		- None
+		"""
+		self._stack.pop()
+
+	def add_var(self, var : Var) -> None:
+		"""Registers a `$var` in the currently open `$scope`.
+
+		### Parameters
+		1. var : _Var
+
+		### Returns
+		- None
+		"""
+		current = self._stack[-1]
+
+		self.scopes[current].append_var(var)
+		self.paths[f"{self.scope_paths[current]}/{var.get_reference()}"] = var
+
+	def get_signal(self, signal : str) -> Var:
+		"""Resolves a hierarchical signal path to its `_Var`.
+
+		Full paths (starting from a top-level `$scope`) are resolved with one hash lookup.
+		Partial paths (starting from any `$scope`, e.g. `cell/sub_cell/var`) are anchored
+		on every scope named like their first component and must resolve to a single `$var`.
+
+		### Parameters
+		1. signal : str
+			- The hierarchical signal name.
+
+		### Returns
+		`_Var` object reference.
+
+		Raises
+		------
+		- ScopeHasNoVar
+			- No `$var` is found under the requested path.
+		- ValueError
+			- The partial path matches `$var`s in more than one branch of the hierarchy.
+		"""
+		var = self.paths.get(signal)
+
+		if var is not None:
+			return var
+
+		first, _, rest = signal.partition('/')
+
+		matches = list()
+		for index in self._by_name.get(first, ()):
+			var = self.paths.get(f"{self.scope_paths[index]}/{rest}")
+			if var is not None:
+				matches.append((self.scope_paths[index], var))
+
+		if not matches:
+			raise ScopeHasNoVar(f"VCD $var {signal} not found in the hierarchy")
+
+		if len(matches) > 1:
+			candidates = ','.join(path for path, _ in matches)
+			raise ValueError(f"VCD $var {signal} is ambiguous, it exists under scopes:\n {candidates}")
+
+		return matches[0][1]
+
+	def iter_signals(self) -> Iterator[Tuple[str, Var]]:
+		"""Yields every (full path, `_Var`) pair in definition order.
+
+		### Parameters
+		- None
+
+		### Returns
+		- Iterator[Tuple[str, _Var]]
+		"""
+		return iter(self.paths.items())
@@ -0,0 +1,241 @@
+import re
+import mmap
+
+from array      import array
+from bisect     import bisect_left
+from typing     import AbstractSet, Dict, List, Tuple
+from _Tokenizer import tokenize_value_changes
+
+TIMESTAMP_REGEXP = rb"^#([0-9]+)[ \t]*\r?$"
+SCALAR_DIGITS    = rb"01xXzZuUwWlLhH-"
+
+class _MappedVCD():
+
+	"""Memory-mapped view of the value change section of a VCD file.
+
+	A single scan over the mapped file records the byte offset of every `#<time>` marker.
+	Region and point queries then work on slices of the mapping, so their cost follows
+	the size of the requested time window instead of the size of the file.
+
+	### Attributes
+	1. filename : str
+		- The mapped VCD file.
+	2. offset : int
+		- Byte offset of the value change section (right after `$enddefinitions`).
+	3. times : array[int]
+		- Every `#<time>` marker of the value change section, in file order.
+	4. offsets : array[int]
+		- The byte offset of each marker line, parallel to `times`.
+
+	### Methods
+	- has_timestamp(at : int) : bool
+		- Whether `#<at>` is a marker of the value change section.
+	- span(start : int, end : int) : Tuple[int, int]
+		- The byte range holding the changes with `start <= timestamp < end`.
+	- window(start : int, end : int) : memoryview
+		- Zero-copy view over `span(start, end)`.
+	- changes_at(at : int) : List[Tuple[str, str]]
+		- The (id, value) changes recorded under `#<at>`.
+	- values_between(id : str, start : int, end : int) : List[str]
+		- The values the identifier took with `start <= timestamp < end`.
+	- shards(start : int, end : int, count : int) : List[Tuple[int, int]]
+		- Splits `span(start, end)` into byte ranges that start on `#<time>` markers.
+	- close() : None
+		- Releases the mapping.
+	"""
+
+	def __init__(self, filename : str, offset : int = 0, times : array = None, offsets : array = None):
+		"""Constructor
+
+		### Parameters
+		1. filename : str
+			- The VCD file to map.
+		2. offset : int
+			- Byte offset of the value change section.
+		3. times, offsets : array[int]
+			- A previously recorded marker table (e.g., from an index file); skips the scan.
+
+		### Returns
+		`_MappedVCD` object instance.
+		"""
+		self.filename = filename
+		self.offset   = offset
+		self.times    = array('q') if times is None else times
+		self.offsets  = array('q') if offsets is None else offsets
+
+		with open(filename, "rb") as VCDFILE:
+			self.mm = mmap.mmap(VCDFILE.fileno(), 0, access = mmap.ACCESS_READ)
+
+		if times is not None:
+			return
+
+		for match in re.compile(TIMESTAMP_REGEXP, re.MULTILINE).finditer(self.mm, offset):
+			self.times.append(int(match[1]))
+			self.offsets.append(match.start())
+
+	def __repr__(self) -> str:
+		"""String representation for the _MappedVCD object instance
+
+		### Parameters
+		- None
+
+		### Returns
+		- str
+		"""
+		return f"_MappedVCD(file={self.filename}, #timestamps={len(self.times)}, size={len(self.mm)})"
+
+	def has_timestamp(self, at : int) -> bool:
+		"""Searches (by bisection) the `#<time>` markers for `at`.
+
+		### Parameters
+		1. at : int
+
+		### Returns
+		- bool
+		"""
+		index = bisect_left(self.times, at)
+		return index < len(self.times) and self.times[index] == at
+
+	def span(self, start : int, end : int) -> Tuple[int, int]:
+		"""Returns the byte range of the mapping that holds the changes with `start <= timestamp < end`.
+
+		### Parameters
+		1. start : int
+		2. end : int
+
+		### Returns
+		- Tuple[int, int] : the (first, past the last) byte offsets.
+		"""
+		lo = bisect_left(self.times, start)
+		hi = bisect_left(self.times, end, lo)
+
+		lo = self.offsets[lo] if lo < len(self.offsets) else len(self.mm)
+		hi = self.offsets[hi] if hi < len(self.offsets) else len(self.mm)
+
+		return lo, hi
+
+	def window(self, start : int, end : int) -> memoryview:
+		"""Returns a zero-copy view over the value changes with `start <= timestamp < end`, marker lines included.
+
+		### Parameters
+		1. start : int
+		2. end : int
+
+		### Returns
+		- memoryview
+		"""
+		lo, hi = self.span(start, end)
+		return memoryview(self.mm)[lo:hi]
+
+	def changes_at(self, at : int) -> List[Tuple[str, str]]:
+		"""Returns the value changes recorded under the `#<at>` marker.
+
+		### Parameters
+		1. at : int
+
+		### Returns
+		- List[Tuple[str, str]] : the (id, value) changes.
+
+		Raises
+		------
+		- KeyError
+			- `#<at>` is not a marker of the value change section.
+		"""
+		if not self.has_timestamp(at):
+			raise KeyError(f"Timestamp {at} is not present in the VCD")
+
+		lo, hi = self.span(at, at + 1)
+		lines  = self.mm[lo:hi].decode().splitlines()
+
+		return [(id, value) for _, id, value in tokenize_value_changes(lines, at) if id is not None]
+
+	def values_between(self, id : str, start : int, end : int) -> List[str]:
+		"""Returns the values the identifier took with `start <= timestamp < end`.
+
+		The identifier is searched directly in the mapping (no copy of the window is made).
+
+		### Parameters
+		1. id : str
+			- The `_Var.id` of the signal.
+		2. start : int
+		3. end : int
+
+		### Returns
+		- List[str]
+		"""
+		lo, hi = self.span(start, end)
+
+		regex = re.compile(rb"^(?:[bBrR](\S+?)[ \t]*|([" + SCALAR_DIGITS + rb"]))" + re.escape(id.encode()) + rb"[ \t]*\r?$", re.MULTILINE)
+
+		return [(match[1] or match[2]).decode() for match in regex.finditer(self.mm, lo, hi)]
+
+	def shards(self, start : int, end : int, count : int) -> List[Tuple[int, int]]:
+		"""Splits the byte range of the changes with `start <= timestamp < end` into (at most) `count` 
+		contiguous ranges of similar size. Every range starts on a `#<time>` marker, so each one
+		can be tokenized on its own.
+
+		### Parameters
+		1. start : int
+		2. end : int
+		3. count : int
+
+		### Returns
+		- List[Tuple[int, int]] : the (first, past the last) byte offsets of each shard, in time order.
+		"""
+		lo, hi = self.span(start, end)
+		step   = max((hi - lo) // max(count, 1), 1)
+
+		bounds = [lo]
+		for position in range(lo + step, hi, step):
+			# next marker at or after the cut
+			index = bisect_left(self.offsets, position)
+			if index < len(self.offsets) and bounds[-1] < self.offsets[index] < hi:
+				bounds.append(self.offsets[index])
+		bounds.append(hi)
+
+		return list(zip(bounds[:-1], bounds[1:]))
+
+	def close(self) -> None:
+		"""Releases the mapping.
+
+		### Parameters
+		- None
+
+		### Returns
+		- None
+		"""
+		self.mm.close()
+
+def parse_span(filename : str, lo : int, hi : int, ids : AbstractSet[str]) -> Dict[str, Tuple[array, List[str]]]:
+	"""Tokenizes the byte range [lo, hi[ of a VCD file (that starts on a `#<time>` marker) and 
+	collects the changes of the requested identifiers. Only the range is read from the file, so it 
+	is suitable as a worker function of a process pool (nothing but the arguments is pickled).
+
+	### Parameters
+	1. filename : str
+	2. lo, hi : int
+		- The byte range, as returned by `_MappedVCD.shards`.
+	3. ids : AbstractSet[str]
+		- The `_Var.id`s to collect.
+
+	### Returns
+	- Dict[str, Tuple[array, List[str]]] : per identifier, the timestamps and values of its changes in the range.
+	"""
+	with open(filename, "rb") as VCDFILE:
+		VCDFILE.seek(lo)
+		lines = VCDFILE.read(hi - lo).decode().splitlines()
+
+	retval = dict()
+
+	for timestamp, id, value in tokenize_value_changes(lines, ids = ids):
+
+		if id is None:
+			continue
+
+		if id not in retval:
+			retval[id] = (array('q'), list())
+
+		retval[id][0].append(timestamp)
+		retval[id][1].append(value)
+
+	return retval
@@ -0,0 +1,223 @@
+from array      import array
+from typing     import Dict, Iterable
+from _Tokenizer import ValueChangeConsumer
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+# 4-state (and VHDL 9-state) value characters, split in a value bit and an X/Z mask bit.
+# X-like characters are (mask=1, value=0) and Z is (mask=1, value=1).
+VALUE_BITS = str.maketrans("xXuUwW-zZlLhH", "0000000110011")
+MASK_BITS  = str.maketrans("xXuUwW-zZlLhH1", "11111111100000")
+UNKNOWN    = frozenset("xXuUwW-zZ")
+
+# Sampled value of a signal that holds X/Z bits or has not been assigned yet
+UNKNOWN_VALUE = -1
+
+def require_numpy() -> None:
+	"""Raises an ImportError with a hint if the optional NumPy dependency is missing."""
+	if np is None:
+		raise ImportError("NumPy is required for array based storage and queries (pip install numpy)")
+
+class _PackedHistory():
+
+	"""The value changes of one `$var` as NumPy arrays, without per-change Python strings.
+
+	Vectors up to 64 bits wide are packed into one `uint64` per change; wider ones into rows of
+	`uint8` (big-endian, i.e., the last byte holds the LSBs). X/Z bits are kept apart in a sparse mask:
+	only the changes that hold any X/Z bit have an entry in `xz_index` / `xz_mask`, and the
+	corresponding bits of `values` are 0 for X and 1 for Z.
+
+	### Attributes
+	1. width : int
+		- The bit length of the `$var`.
+	2. times : np.ndarray[int64]
+		- The timestamps of the changes.
+	3. values : np.ndarray[uint64] or np.ndarray[uint8, (changes, bytes)]
+		- The packed value of each change.
+	4. xz_index : np.ndarray[int64]
+		- The indices (in `times`) of the changes with X/Z bits.
+	5. xz_mask : np.ndarray[uint64] or np.ndarray[uint8, (xz changes, bytes)]
+		- The X/Z bits of those changes, packed like `values`.
+
+	### Methods
+	- is_known() : np.ndarray[bool]
+		- Per change, whether it is free of X/Z bits.
+	- sample(at : np.ndarray[int64]) : np.ndarray[int64]
+		- The value in effect at each of the given times.
+	"""
+
+	def __init__(self, width : int, times, values, xz_index, xz_mask):
+		"""Constructor
+
+		### Parameters
+		1. width : int
+		2. times, values, xz_index, xz_mask : np.ndarray
+
+		### Returns
+		`_PackedHistory` object instance.
+		"""
+		self.width    = width
+		self.times    = times
+		self.values   = values
+		self.xz_index = xz_index
+		self.xz_mask  = xz_mask
+
+	def __repr__(self) -> str:
+		"""String representation for the _PackedHistory object instance
+
+		### Parameters
+		- None
+
+		### Returns
+		- str
+		"""
+		return f"_PackedHistory(width={self.width}, #changes={len(self.times)}, #xz_changes={len(self.xz_index)})"
+
+	def __len__(self) -> int:
+		return len(self.times)
+
+	def is_known(self):
+		"""Returns, per change, whether the value is free of X/Z bits.
+
+		### Parameters
+		- None
+
+		### Returns
+		- np.ndarray[bool]
+		"""
+		known = np.ones(len(self.times), dtype = bool)
+		known[self.xz_index] = False
+		return known
+
+	def sample(self, at):
+		"""Returns the value in effect at each of the (sorted) times `at`, i.e., the last change at or before it.
+
+		### Parameters
+		1. at : np.ndarray[int64]
+
+		### Returns
+		- np.ndarray[int64] : `UNKNOWN_VALUE` where the value holds X/Z bits or is not assigned yet.
+
+		Raises
+		------
+		- ValueError
+			- The `$var` is wider than 63 bits and does not fit a signed 64-bit sample.
+		"""
+		if self.width > 63:
+			raise ValueError(f"Cannot sample a {self.width} bit wide $var into 64-bit integers")
+
+		values = self.values.astype(np.int64)
+		values[self.xz_index] = UNKNOWN_VALUE
+
+		index   = np.searchsorted(self.times, at, side = "right") - 1
+		sampled = np.full(len(at), UNKNOWN_VALUE, dtype = np.int64)
+		valid   = index >= 0
+
+		sampled[valid] = values[index[valid]]
+		return sampled
+
+class _Packer():
+
+	"""Growable (stdlib `array` / `bytearray`) buffers of a `_PackedHistory` under construction."""
+
+	def __init__(self, width : int):
+		self.width    = width
+		self.nbytes   = (width + 7) // 8
+		self.wide     = width > 64
+		self.times    = array('q')
+		self.values   = bytearray() if self.wide else array('Q')
+		self.xz_index = array('q')
+		self.xz_mask  = bytearray() if self.wide else array('Q')
+
+	def append(self, timestamp : int, value : str) -> None:
+
+		if not value.strip("01"):
+			bits, mask = int(value, 2), 0
+		else:
+			# left-extend with X/Z if the leftmost bit is X/Z (with 0 otherwise)
+			if len(value) < self.width and value[0] in UNKNOWN:
+				value = value[0] * (self.width - len(value)) + value
+			bits = int(value.translate(VALUE_BITS), 2)
+			mask = int(value.translate(MASK_BITS), 2)
+
+		if self.wide:
+			self.values += bits.to_bytes(self.nbytes, "big")
+		else:
+			self.values.append(bits)
+
+		if mask:
+			self.xz_index.append(len(self.times))
+			if self.wide:
+				self.xz_mask += mask.to_bytes(self.nbytes, "big")
+			else:
+				self.xz_mask.append(mask)
+
+		self.times.append(timestamp)
+
+	def freeze(self) -> _PackedHistory:
+
+		def _column(buffer, dtype, packed = False):
+			column = np.frombuffer(buffer, dtype = dtype) if len(buffer) else np.empty(0, dtype = dtype)
+			return column.reshape(-1, self.nbytes) if packed and self.wide else column
+
+		dtype = np.uint8 if self.wide else np.uint64
+
+		return _PackedHistory(
+			self.width,
+			_column(self.times, np.int64),
+			_column(self.values, dtype, packed = True),
+			_column(self.xz_index, np.int64),
+			_column(self.xz_mask, dtype, packed = True)
+		)
+
+class _PackingConsumer(ValueChangeConsumer):
+
+	"""Packs the value changes of selected identifiers straight from the tokenizer.
+
+	### Methods
+	- histories() : Dict[str, _PackedHistory]
+		- The packed changes per identifier.
+	"""
+
+	def __init__(self, widths : Dict[str, int]):
+		"""Constructor
+
+		### Parameters
+		1. widths : Dict[str, int]
+			- The bit length of every identifier to pack.
+
+		### Returns
+		`_PackingConsumer` object instance.
+		"""
+		require_numpy()
+		self.packers = { id : _Packer(width) for id, width in widths.items() }
+
+	def on_change(self, timestamp : int, id : str, value : str) -> None:
+		packer = self.packers.get(id)
+		if packer is not None:
+			packer.append(timestamp, value)
+
+	def histories(self) -> Dict[str, _PackedHistory]:
+		return { id : packer.freeze() for id, packer in self.packers.items() }
+
+def pack_history(width : int, times : Iterable[int], values : Iterable[str]) -> _PackedHistory:
+	"""Packs an already parsed (e.g., `_ChangeStore`) history.
+
+	### Parameters
+	1. width : int
+	2. times : Iterable[int]
+	3. values : Iterable[str]
+
+	### Returns
+	- _PackedHistory
+	"""
+	require_numpy()
+	packer = _Packer(width)
+
+	for timestamp, value in zip(times, values):
+		packer.append(timestamp, value)
+
+	return packer.freeze()
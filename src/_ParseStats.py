@@ -0,0 +1,265 @@
+import sys
+
+from contextlib  import contextmanager
+from dataclasses import dataclass
+from time        import perf_counter, process_time
+from typing      import Callable, Dict, Iterable, Iterator, Optional
+
+try:
+	import resource
+except ImportError: # not available on Windows
+	resource = None
+
+PROGRESS_LINES = 1 << 16 # lines between two progress reports
+
+class ProgressObserver():
+
+	"""Base class for the progress observers passed to the parsers (`progress=`).
+
+	Subclasses override any of the hooks below; the default implementations do nothing. Without an
+	observer the parsers do no per-line progress work at all.
+
+	### Methods
+	- on_phase_start(phase : str) : None
+		- Called when a parsing phase (e.g., "header", "hierarchy", "value_changes") starts.
+	- on_progress(phase : str, done : int, total : Optional[int]) : None
+		- Called every `PROGRESS_LINES` lines of the value change section, and once at its end, with
+		  the bytes consumed so far and the size of the section (None if unknown, e.g. compressed files).
+	- on_phase_end(phase : str, stats : _PhaseStats) : None
+		- Called when the phase ends, with its accumulated timings.
+	"""
+
+	def on_phase_start(self, phase : str) -> None:
+		pass
+
+	def on_progress(self, phase : str, done : int, total : Optional[int]) -> None:
+		pass
+
+	def on_phase_end(self, phase : str, stats : "_PhaseStats") -> None:
+		pass
+
+@dataclass
+class _PhaseStats():
+
+	"""Accumulated timings of a parsing phase.
+
+	### Attributes
+	1. wall : float
+		- Wall time (s) spent in the phase.
+	2. cpu : float
+		- CPU time (s) of the process spent in the phase.
+	3. calls : int
+		- The number of times the phase ran (e.g., once per `poll` in follow mode).
+	4. peak_rss : Optional[int]
+		- The peak resident set size (bytes) of the process at the end of the phase (None if unknown).
+	"""
+
+	wall     : float = 0.0
+	cpu      : float = 0.0
+	calls    : int   = 0
+	peak_rss : Optional[int] = None
+
+def peak_rss() -> Optional[int]:
+	"""Returns the peak resident set size (bytes) of the process, None if the platform does not report it.
+
+	### Parameters
+	- None
+
+	### Returns
+	- Optional[int]
+	"""
+	if resource is None:
+		return None
+
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+	# kilobytes on Linux, bytes on macOS
+	return peak if sys.platform == "darwin" else peak * 1024
+
+class _ParseStats():
+
+	"""Per-phase timings, counters and peak memory of a parser.
+
+	Phases are timed as a whole (a few clock reads per phase), and the counters are filled in from the
+	structures built by each phase, so recording them costs nothing per line.
+
+	### Attributes
+	1. phases : Dict[ str : _PhaseStats ]
+		- The timings of every phase that ran, in order.
+	2. counters : Dict[ str : int ]
+		- bytes, lines, timestamps, changes, scopes and vars (those known so far).
+	3. observer : Optional[ProgressObserver]
+		- Notified of the start and end of every phase.
+	4. current : Optional[str]
+		- The running phase.
+
+	### Methods
+	- phase(name : str) : ContextManager
+		- Times a phase.
+	- count(**counters : int) : None
+		- Sets counters.
+	- as_dict() : Dict
+		- JSON serializable form.
+	"""
+
+	def __init__(self, observer : Optional[ProgressObserver] = None):
+		"""Constructor
+
+		### Parameters
+		1. observer : Optional[ProgressObserver]
+
+		### Returns
+		`_ParseStats` object instance.
+		"""
+		self.phases   = dict() # Dict[str, _PhaseStats]
+		self.counters = dict() # Dict[str, int]
+		self.observer = observer
+		self.current  = None
+
+	def __repr__(self) -> str:
+		"""String representation for the _ParseStats object instance
+
+		### Parameters
+		- None
+
+		### Returns
+		- str
+		"""
+		phases = ", ".join(f"{name}={stats.wall:.3f}s" for name, stats in self.phases.items())
+		return f"_ParseStats({phases}, peak_rss={self.peak_rss}, {self.counters})"
+
+	@contextmanager
+	def phase(self, name : str) -> Iterator[None]:
+		"""Times the enclosed block as (another run of) the phase `name`.
+
+		### Parameters
+		1. name : str
+
+		### Returns
+		- ContextManager
+		"""
+		if self.observer is not None:
+			self.observer.on_phase_start(name)
+
+		outer, self.current = self.current, name
+		wall, cpu = perf_counter(), process_time()
+
+		try:
+			yield
+		finally:
+			stats = self.phases.setdefault(name, _PhaseStats())
+			stats.wall    += perf_counter() - wall
+			stats.cpu     += process_time() - cpu
+			stats.calls   += 1
+			stats.peak_rss = peak_rss()
+			self.current   = outer
+
+		if self.observer is not None:
+			self.observer.on_phase_end(name, stats)
+
+	def count(self, **counters : int) -> None:
+		"""Sets counters, e.g. `count(timestamps = 10, changes = 250)`.
+
+		### Parameters
+		1. counters : int
+
+		### Returns
+		- None
+		"""
+		self.counters.update(counters)
+
+	@property
+	def peak_rss(self) -> Optional[int]:
+		"""The peak resident set size (bytes) of the process, as of the end of the last phase."""
+		peaks = [stats.peak_rss for stats in self.phases.values() if stats.peak_rss is not None]
+		return max(peaks) if peaks else None
+
+	@property
+	def wall(self) -> float:
+		"""The total wall time (s) of the phases."""
+		return sum(stats.wall for stats in self.phases.values())
+
+	def as_dict(self) -> Dict[str, object]:
+		"""Returns the stats in JSON serializable form.
+
+		### Parameters
+		- None
+
+		### Returns
+		- Dict[str, object]
+		"""
+		return {
+			"phases"   : { name : vars(stats).copy() for name, stats in self.phases.items() },
+			"counters" : dict(self.counters),
+			"peak_rss" : self.peak_rss
+		}
+
+def report_progress(lines : Iterable[str], observer : ProgressObserver, phase : str, tell : Callable[[], int], total : Optional[int] = None) -> Iterator[str]:
+	"""Passes the lines through, reporting the bytes consumed every `PROGRESS_LINES` lines and at the end.
+
+	### Parameters
+	1. lines : Iterable[str]
+	2. observer : ProgressObserver
+	3. phase : str
+	4. tell : Callable[[], int]
+		- The bytes consumed so far (e.g., the position of the underlying binary file).
+	5. total : Optional[int]
+		- The size (bytes) of the input, if known.
+
+	### Returns
+	- Iterator[str]
+	"""
+	countdown = PROGRESS_LINES
+
+	for line in lines:
+
+		countdown -= 1
+
+		if not countdown:
+			observer.on_progress(phase, tell(), total)
+			countdown = PROGRESS_LINES
+
+		yield line
+
+	observer.on_progress(phase, tell(), total)
+
+class TqdmProgress(ProgressObserver):
+
+	"""Shows a tqdm progress bar (bytes) per phase. Needs the optional `tqdm` package."""
+
+	def __init__(self, **options):
+		"""Constructor
+
+		### Parameters
+		1. options
+			- Forwarded to every `tqdm` bar (e.g., `file`, `leave`, `disable`).
+
+		### Returns
+		`TqdmProgress` object instance.
+
+		Raises
+		------
+		- ImportError
+			- tqdm is not installed.
+		"""
+		from tqdm import tqdm
+
+		self.tqdm    = tqdm
+		self.options = options
+		self.bars    = dict()
+
+	def on_progress(self, phase : str, done : int, total : Optional[int]) -> None:
+
+		bar = self.bars.get(phase)
+
+		if bar is None:
+			bar = self.bars[phase] = self.tqdm(desc = phase, total = total, unit = "B", unit_scale = True, **self.options)
+
+		bar.update(done - bar.n)
+
+	def on_phase_end(self, phase : str, stats : _PhaseStats) -> None:
+
+		bar = self.bars.pop(phase, None)
+
+		if bar is not None:
+			bar.close()
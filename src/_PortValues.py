@@ -0,0 +1,223 @@
+from array  import array
+from enum   import Enum
+from typing import Dict, Iterable, List, Tuple
+from utils  import eVCD_Input_Values, eVCD_Output_Values, eVCD_Uknown_Direction_Values, eVCD_Strenth_Value
+
+# Every port state, indexed by its state code. Input and output states are written by
+# their member name in a `$dumpports` file (e.g., `pD`), the unknown direction ones by value (e.g., `p?`).
+PORT_STATES  = tuple(eVCD_Input_Values) + tuple(eVCD_Output_Values) + tuple(eVCD_Uknown_Direction_Values)
+STATE_CHARS  = "".join(state.name if isinstance(state, (eVCD_Input_Values, eVCD_Output_Values)) else state.value for state in PORT_STATES)
+STRENGTHS    = tuple(eVCD_Strenth_Value)
+
+INVALID_CODE = 0xFF
+
+def _code_table(chars : str) -> bytes:
+	"""Byte translation table: the i-th character of `chars` to i, every other byte to `INVALID_CODE`."""
+	table = bytearray([INVALID_CODE]) * 256
+	for code, char in enumerate(chars):
+		table[ord(char)] = code
+	return bytes(table)
+
+STATE_TABLE    = _code_table(STATE_CHARS)
+STRENGTH_TABLE = _code_table("01234567")
+CHAR_TABLE     = bytes.maketrans(bytes(range(len(STATE_CHARS))), STATE_CHARS.encode())
+
+class _PortHistory():
+
+	"""The value changes of one eVCD port as compact parallel arrays.
+
+	Each change of a `width` bit port takes `width` bytes in every one of `states`, `strength0`
+	and `strength1` (one byte per bit, MSB first): the state code (an index in `PORT_STATES`)
+	and the strength (an `eVCD_Strenth_Value`) of the 0 and 1 components.
+
+	### Attributes
+	1. width : int
+		- The bit length of the port.
+	2. times : array[int]
+		- The timestamps of the changes.
+	3. states : bytearray
+		- The state codes, `width` per change.
+	4. strength0 : bytearray
+		- The strengths of the 0 component, `width` per change.
+	5. strength1 : bytearray
+		- The strengths of the 1 component, `width` per change.
+
+	### Methods
+	- append(timestamp : int, state : str, strength0 : str, strength1 : str) : None
+		- Adds a `p<state> <strength0> <strength1>` change.
+	- value(index : int) : str
+		- The state characters of a change (e.g., `DU`).
+	- states_of(index : int) : List[Enum]
+		- The state of each bit of a change.
+	- strengths_of(index : int) : List[Tuple[eVCD_Strenth_Value, eVCD_Strenth_Value]]
+		- The (0, 1) strength components of each bit of a change.
+	"""
+
+	def __init__(self, width : int):
+		"""Constructor
+
+		### Parameters
+		1. width : int
+			- The bit length of the port.
+
+		### Returns
+		`_PortHistory` object instance.
+		"""
+		self.width     = width
+		self.times     = array('q')
+		self.states    = bytearray()
+		self.strength0 = bytearray()
+		self.strength1 = bytearray()
+
+	def __repr__(self) -> str:
+		"""String representation for the _PortHistory object instance
+
+		### Parameters
+		- None
+
+		### Returns
+		- str
+		"""
+		return f"_PortHistory(width={self.width}, #changes={len(self.times)})"
+
+	def __len__(self) -> int:
+		return len(self.times)
+
+	def _codes(self, field : str, table : bytes) -> bytes:
+
+		# left-extend a short field with its leftmost character
+		if len(field) < self.width:
+			field = field[0] * (self.width - len(field)) + field
+
+		codes = field.encode().translate(table)
+
+		if len(codes) != self.width or INVALID_CODE in codes:
+			raise ValueError(f"Invalid eVCD port field ({field}) for a {self.width} bit port")
+
+		return codes
+
+	def append(self, timestamp : int, state : str, strength0 : str, strength1 : str) -> None:
+		"""Adds the change `p<state> <strength0> <strength1>` at `timestamp`.
+
+		### Parameters
+		1. timestamp : int
+		2. state : str
+		3. strength0 : str
+		4. strength1 : str
+
+		### Returns
+		- None
+
+		Raises
+		------
+		- ValueError
+			- A field holds an unknown state/strength character or is wider than the port.
+		"""
+		self.states    += self._codes(state, STATE_TABLE)
+		self.strength0 += self._codes(strength0, STRENGTH_TABLE)
+		self.strength1 += self._codes(strength1, STRENGTH_TABLE)
+		self.times.append(timestamp)
+
+	def value(self, index : int) -> str:
+		"""Returns the state characters of the `index`-th change, as written in the file.
+
+		### Parameters
+		1. index : int
+
+		### Returns
+		- str
+		"""
+		return self.states[index * self.width : (index + 1) * self.width].translate(CHAR_TABLE).decode()
+
+	def states_of(self, index : int) -> List[Enum]:
+		"""Returns the state of each bit (MSB first) of the `index`-th change.
+
+		### Parameters
+		1. index : int
+
+		### Returns
+		- List[Enum] : `eVCD_Input_Values`, `eVCD_Output_Values` or `eVCD_Uknown_Direction_Values` members.
+		"""
+		return [PORT_STATES[code] for code in self.states[index * self.width : (index + 1) * self.width]]
+
+	def strengths_of(self, index : int) -> List[Tuple[eVCD_Strenth_Value, eVCD_Strenth_Value]]:
+		"""Returns the (0, 1) strength components of each bit (MSB first) of the `index`-th change.
+
+		### Parameters
+		1. index : int
+
+		### Returns
+		- List[Tuple[eVCD_Strenth_Value, eVCD_Strenth_Value]]
+		"""
+		span = slice(index * self.width, (index + 1) * self.width)
+		return [(STRENGTHS[s0], STRENGTHS[s1]) for s0, s1 in zip(self.strength0[span], self.strength1[span])]
+
+def decode_port_changes(lines : Iterable[str], widths : Dict[str, int], timestamp : int = 0) -> Dict[str, _PortHistory]:
+	"""Decodes the `p<state> <strength0> <strength1> <id>` changes of a `$dumpports` value change
+	section into one `_PortHistory` per requested port, in a single linear pass.
+
+	### Parameters
+	1. lines : Iterable[str]
+		- The lines of the value change section.
+	2. widths : Dict[str, int]
+		- The bit length of every port identifier to decode; the changes of other ports are skipped.
+	3. timestamp : int
+		- The timestamp assigned to changes that precede the first `#<time>` marker.
+
+	### Returns
+	- Dict[str, _PortHistory]
+
+	Raises
+	------
+	- ValueError
+		- A `#<time>` marker does not hold an integer timestamp, or a port field is malformed.
+	"""
+	histories = { id : _PortHistory(width) for id, width in widths.items() }
+	lines     = iter(lines)
+
+	for line in lines:
+
+		fields = line.split()
+
+		if not fields:
+			continue
+
+		head = fields[0][0]
+
+		if head == 'p' and len(fields) == 4:
+
+			history = histories.get(fields[3])
+			if history is not None:
+				history.append(timestamp, fields[0][1:], fields[1], fields[2])
+
+		elif head == '#':
+
+			try:
+				timestamp = int(fields[0][1:])
+			except ValueError:
+				raise ValueError(f"Casting to integer failed for line ({line.strip()}) in Value Change section ") from None
+
+		elif fields[0] == "$comment" and "$end" not in fields:
+
+			for line in lines:
+				if "$end" in line: break
+
+	return histories
+
+def decode_port_history(width : int, times : Iterable[int], values : Iterable[str]) -> _PortHistory:
+	"""Decodes an already parsed (e.g., `_ChangeStore`) port history of `<state> <strength0> <strength1>` values.
+
+	### Parameters
+	1. width : int
+	2. times : Iterable[int]
+	3. values : Iterable[str]
+
+	### Returns
+	- _PortHistory
+	"""
+	history = _PortHistory(width)
+
+	for timestamp, value in zip(times, values):
+		history.append(timestamp, *value.split())
+
+	return history
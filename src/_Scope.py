@@ -48,8 +48,8 @@ class _Scope():
 
 		self.scope_type = scope_type
 		self.cell_name  = cell_name
-		self.vars      	= Dict[str, Var]
-		self.scopes    	= List["_Scope"]
+		self.vars      	= dict() # Dict[str, Var]
+		self.scopes    	= list() # List["_Scope"]
 
 	def __repr__(self) -> str:
 		"""String representation for the _Scope object instance 
@@ -111,7 +111,7 @@ class _Scope():
 			- The `variable_name` does not match any of the names of `$vars` that belong to the current `$scope`. Indicates
 		"""
 		if variable_name not in self.vars.keys(): 
-			scopes_vars_are = ','.join([var.get_reference() for var in self.vars.keys()])
+			scopes_vars_are = ','.join(self.vars.keys())
 			raise ScopeHasNoVar(f"VCD $var {variable_name} not found in $scope {self}. Variables are:\n {scopes_vars_are}")
 
 		return self.vars[variable_name]
\ No newline at end of file
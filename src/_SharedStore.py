@@ -0,0 +1,67 @@
+from array         import array
+from typing        import Callable, Dict, List, Tuple
+from multiprocessing.shared_memory import SharedMemory
+from _ChangeStore  import _ChangeStore  as ChangeStore
+from _SidecarIndex import _SidecarIndex as SidecarIndex
+
+# Stores attached by the current (worker) process, by shared memory name
+_attached : Dict[str, Tuple[SharedMemory, ChangeStore]] = dict()
+
+def publish(store : ChangeStore) -> SharedMemory:
+	"""Copies a change store into a new shared memory block, in the layout of the sidecar index.
+
+	The caller owns the block and must `close()` and `unlink()` it once the workers are done.
+
+	### Parameters
+	1. store : _ChangeStore
+
+	### Returns
+	- SharedMemory : workers attach to it by `.name`.
+	"""
+	# serialized once; the block is sized from the chunks
+	chunks = SidecarIndex.image(dict(), store, array('q'))
+
+	shm = SharedMemory(create = True, size = max(sum(map(len, chunks)), 1))
+
+	position = 0
+	for chunk in chunks:
+		shm.buf[position : position + len(chunk)] = chunk
+		position += len(chunk)
+
+	return shm
+
+def attach(name : str) -> ChangeStore:
+	"""Attaches (once per process) to a store published by `publish`. Per-signal columns
+	are decoded from the shared block only when first queried.
+
+	### Parameters
+	1. name : str
+		- The name of the shared memory block.
+
+	### Returns
+	- _ChangeStore
+	"""
+	if name not in _attached:
+
+		# pool workers share the resource tracker of the publishing process, which owns (and unlinks) the block
+		shm = SharedMemory(name = name)
+
+		_attached[name] = (shm, SidecarIndex.from_buffer(shm.buf).changes)
+
+	return _attached[name][1]
+
+def apply_shared(name : str, func : Callable[[ChangeStore, str], object], ids : List[str]) -> List[object]:
+	"""Worker entry point: applies `func(store, id)` to every identifier against the shared store.
+
+	### Parameters
+	1. name : str
+		- The name of the shared memory block.
+	2. func : Callable[[_ChangeStore, str], object]
+		- A module-level (picklable) function.
+	3. ids : List[str]
+
+	### Returns
+	- List[object] : the results, in the order of `ids`.
+	"""
+	store = attach(name)
+	return [func(store, id) for id in ids]
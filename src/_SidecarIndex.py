@@ -0,0 +1,323 @@
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+
+from array        import array
+from itertools    import accumulate, chain
+from operator     import sub
+from hashlib      import blake2b
+from typing       import Dict, List, Optional
+from _ChangeStore import _ChangeStore as ChangeStore
+
+INDEX_SUFFIX  = ".idx"
+INDEX_MAGIC   = b"VCDIDX03"
+HASH_BLOCK    = 1 << 16 # bytes hashed per sample
+HASH_SAMPLES  = 64      # evenly spread samples, plus the first and the last block
+
+def fingerprint(vcd_filename : str) -> Dict[str, object]:
+	"""Returns the size, mtime and content hash that validate an index against its VCD file.
+
+	The hash covers the first and last blocks of the file plus evenly spread samples in
+	between, so validating a multi-GB dump reads a few MB instead of the whole file.
+
+	### Parameters
+	1. vcd_filename : str
+
+	### Returns
+	- Dict[str, object]
+	"""
+	stat   = os.stat(vcd_filename)
+	digest = blake2b(digest_size = 16)
+
+	with open(vcd_filename, "rb") as VCDFILE:
+
+		step = max(stat.st_size // (HASH_SAMPLES + 1), HASH_BLOCK)
+
+		for position in range(0, stat.st_size, step):
+			VCDFILE.seek(position)
+			digest.update(VCDFILE.read(HASH_BLOCK))
+
+		VCDFILE.seek(max(stat.st_size - HASH_BLOCK, 0))
+		digest.update(VCDFILE.read(HASH_BLOCK))
+
+	return {"size" : stat.st_size, "mtime_ns" : stat.st_mtime_ns, "hash" : digest.hexdigest()}
+
+def _deltas(column : array) -> array:
+	"""Returns the differences between consecutive items of an int64 column (the first one is kept as is).
+
+	### Parameters
+	1. column : array[int]
+
+	### Returns
+	- array[int]
+	"""
+	return array('q', map(sub, column, chain((0,), column)))
+
+class _LazyColumns(dict):
+
+	"""Dictionary of per-`$var` columns that are decoded from the index buffer on first access."""
+
+	def __init__(self, directory : Dict[str, object], decode):
+		super().__init__()
+		self.directory = directory
+		self.decode    = decode
+
+	def __missing__(self, id : str):
+		if id not in self.directory:
+			raise KeyError(id)
+		column = self[id] = self.decode(id)
+		return column
+
+	def __contains__(self, id : str) -> bool:
+		return id in self.directory
+
+	def __iter__(self):
+		return iter(self.directory)
+
+	def __len__(self) -> int:
+		return len(self.directory)
+
+	def get(self, id : str, default = None):
+		return self[id] if id in self.directory else default
+
+	def keys(self):
+		return self.directory.keys()
+
+class _SidecarIndex():
+
+	"""Compact binary image of a parsed VCD file.
+
+	It holds the header and definitions (hierarchy and id table), the byte offsets of the
+	`#<time>` markers and the per-signal change lists. The layout is
+
+		INDEX_MAGIC | u64 header length | JSON header | int64 / utf-8 blobs
+
+	and every per-signal column is decoded from the underlying buffer only when it is
+	first queried, so loading costs little more than reading the JSON header. The columns 
+	may be zlib compressed (one chunk per column, the int64 ones delta encoded first), which 
+	a flag of the header records.
+
+	### Attributes
+	1. meta : Dict[str, object]
+		- The JSON header (fingerprint, sections, blob directory).
+	2. changes : _ChangeStore
+		- The per-signal change store, backed by the buffer.
+	3. times : array[int]
+		- The `#<time>` markers.
+	4. offsets : array[int]
+		- The byte offset of each marker in the VCD file.
+
+	### Methods
+	- image(meta, store, offsets, compress) : List[bytes]
+		- Serializes a parsed file to the chunks of its image.
+	- dump(VCDFILE, meta, store, offsets, compress) : None
+		- Serializes a parsed file to a stream.
+	- from_buffer(buffer) : _SidecarIndex
+		- Deserializes (lazily) from any buffer e.g., a mapped file.
+	- save(index_filename, vcd_filename, meta, store, offsets) : None
+		- Writes the index file next to the VCD.
+	- open(filename) : _SidecarIndex
+		- Maps an image file, without validation.
+	- load(index_filename, vcd_filename) : _SidecarIndex
+		- Maps the index file; None if it is missing or stale.
+	"""
+
+	def __init__(self, meta : Dict[str, object], buffer, data_offset : int):
+		"""Constructor
+
+		### Parameters
+		1. meta : Dict[str, object]
+			- The decoded JSON header.
+		2. buffer : buffer
+			- The buffer (e.g., mmap) holding the image.
+		3. data_offset : int
+			- Where the blobs start in `buffer`.
+
+		### Returns
+		`_SidecarIndex` object instance.
+		"""
+		self.meta    = meta
+		self.buffer  = buffer
+		self.base    = data_offset
+		self.times   = self._array(*meta["timestamps"])
+		self.offsets = self._array(*meta["offsets"])
+
+		# per signal : [times offset, #changes, values offset, values length, times length]
+		signals = meta["signals"]
+
+		self.changes            = ChangeStore()
+		self.changes.timestamps = self.times
+		self.changes.times      = _LazyColumns(signals, lambda id : self._array(signals[id][0], signals[id][1], signals[id][4]))
+		self.changes.values     = _LazyColumns(signals, lambda id : self._strings(signals[id][2], signals[id][3], signals[id][1]))
+
+	@property
+	def change_count(self) -> int:
+		"""The number of value changes stored, read from the blob directory (nothing is decoded)."""
+		return sum(entry[1] for entry in self.meta["signals"].values())
+
+	def _blob(self, offset : int, length : int) -> bytes:
+		blob = self.buffer[self.base + offset : self.base + offset + length]
+		return zlib.decompress(blob) if self.meta.get("compressed") else blob
+
+	def _array(self, offset : int, count : int, length : int) -> array:
+		column = array('q')
+		column.frombytes(self._blob(offset, length))
+		return array('q', accumulate(column)) if self.meta.get("compressed") else column
+
+	def _strings(self, offset : int, length : int, count : int) -> List[str]:
+		return bytes(self._blob(offset, length)).decode().split('\n') if count else list()
+
+	@staticmethod
+	def image(meta : Dict[str, object], store : ChangeStore, offsets : array, compress : bool = False) -> List[bytes]:
+		"""Serializes a parsed file, once, to the chunks of its binary image (magic, header length, header, blobs).
+
+		### Parameters
+		1. meta : Dict[str, object]
+			- JSON-able header entries (fingerprint, sections).
+		2. store : _ChangeStore
+			- The per-signal change store.
+		3. offsets : array[int]
+			- The byte offset of each `#<time>` marker.
+		4. compress : bool
+			- zlib-compress the columns (the int64 ones delta encoded).
+
+		### Returns
+		- List[bytes] : the chunks, to be written in order; their total length is the image size.
+		"""
+		blobs, position = list(), 0
+
+		def _blob(data : bytes) -> int:
+			nonlocal position
+			start = position
+			blobs.append(data)
+			position += len(data)
+			# keep every int64 column 8-byte aligned
+			padding = -position % 8
+			blobs.append(b"\0" * padding)
+			position += padding
+			return start
+
+		def _column(column : array) -> bytes:
+			# sorted times and offsets: their (small) deltas compress far better than the values
+			return zlib.compress(_deltas(column).tobytes(), 1) if compress else column.tobytes()
+
+		meta = dict(meta, byteorder = sys.byteorder, compressed = compress)
+		timestamps, markers = _column(store.timestamps), _column(offsets)
+		meta["timestamps"] = [_blob(timestamps), len(store.timestamps), len(timestamps)]
+		meta["offsets"]    = [_blob(markers), len(offsets), len(markers)]
+		meta["signals"]    = dict()
+
+		for id in store.times:
+			times, values = store.history(id)
+			times, strings = _column(times), '\n'.join(values).encode()
+			if compress:
+				strings = zlib.compress(strings, 1)
+			meta["signals"][id] = [_blob(times), len(values), _blob(strings), len(strings), len(times)]
+
+		header = json.dumps(meta, separators = (',', ':')).encode()
+		header += b" " * (-(len(INDEX_MAGIC) + 8 + len(header)) % 8)
+
+		return [INDEX_MAGIC, struct.pack("<Q", len(header)), header] + blobs
+
+	@staticmethod
+	def dump(VCDFILE, meta : Dict[str, object], store : ChangeStore, offsets : array, compress : bool = False) -> None:
+		"""Serializes a parsed file to the binary stream `VCDFILE`.
+
+		### Parameters
+		1. VCDFILE : BinaryIO
+			- The output stream.
+		2. meta, store, offsets, compress
+			- See `image`.
+
+		### Returns
+		- None
+		"""
+		for chunk in _SidecarIndex.image(meta, store, offsets, compress):
+			VCDFILE.write(chunk)
+
+	@classmethod
+	def from_buffer(cls, buffer) -> "_SidecarIndex":
+		"""Deserializes an image produced by `dump`. Per-signal columns are decoded lazily.
+
+		### Parameters
+		1. buffer : buffer
+
+		### Returns
+		`_SidecarIndex` object instance.
+
+		Raises
+		------
+		- ValueError
+			- The buffer does not hold an index image of this platform.
+		"""
+		if bytes(buffer[:len(INDEX_MAGIC)]) != INDEX_MAGIC:
+			raise ValueError("Buffer does not hold a VCD index")
+
+		start  = len(INDEX_MAGIC) + 8
+		length = struct.unpack("<Q", buffer[len(INDEX_MAGIC) : start])[0]
+		meta   = json.loads(bytes(buffer[start : start + length]))
+
+		if meta["byteorder"] != sys.byteorder:
+			raise ValueError("VCD index was written on a platform of different byte order")
+
+		return cls(meta, buffer, start + length)
+
+	@staticmethod
+	def save(index_filename : str, vcd_filename : str, meta : Dict[str, object], store : ChangeStore, offsets : array) -> None:
+		"""Writes the index file (atomically) and stamps it with the fingerprint of `vcd_filename`.
+
+		### Parameters
+		1. index_filename : str
+		2. vcd_filename : str
+		3. meta : Dict[str, object]
+			- JSON-able header entries (sections).
+		4. store : _ChangeStore
+		5. offsets : array[int]
+
+		### Returns
+		- None
+		"""
+		meta = dict(meta, fingerprint = fingerprint(vcd_filename))
+
+		with open(index_filename + ".tmp", "wb") as IDXFILE:
+			_SidecarIndex.dump(IDXFILE, meta, store, offsets)
+
+		os.replace(index_filename + ".tmp", index_filename)
+
+	@classmethod
+	def open(cls, filename : str) -> "_SidecarIndex":
+		"""Maps an image file (index or columnar export) without validating it against any VCD file.
+
+		### Parameters
+		1. filename : str
+
+		### Returns
+		`_SidecarIndex` object instance.
+		"""
+		with open(filename, "rb") as IDXFILE:
+			return cls.from_buffer(mmap.mmap(IDXFILE.fileno(), 0, access = mmap.ACCESS_READ))
+
+	@classmethod
+	def load(cls, index_filename : str, vcd_filename : str) -> Optional["_SidecarIndex"]:
+		"""Maps the index file if it exists and its fingerprint matches `vcd_filename`.
+
+		### Parameters
+		1. index_filename : str
+		2. vcd_filename : str
+
+		### Returns
+		- `_SidecarIndex` object instance or None if the index is missing or stale.
+		"""
+		if not os.path.isfile(index_filename):
+			return None
+
+		try:
+			index = cls.open(index_filename)
+		except (ValueError, KeyError, struct.error):
+			# empty, truncated or foreign file
+			return None
+
+		return index if index.meta.get("fingerprint") == fingerprint(vcd_filename) else None
@@ -0,0 +1,162 @@
+import re
+
+from typing     import AbstractSet, Dict, Iterable, List, Optional, TextIO
+from utils      import VCD_Type, S_VAR_REGEXP, E_VAR_REGEXP
+from _Tokenizer import ValueChangeConsumer
+
+BUFFER_LINES = 1 << 16 # lines written per bulk write
+
+# Value change line of each kind of $var
+FORMATS = {
+	"scalar" : "{value}{id}",
+	"vector" : "b{value} {id}",
+	"real"   : "r{value} {id}",
+	"port"   : "p{value} {id}",
+}
+
+def prune_definitions(definitions : Iterable[str], ids : AbstractSet[str], type : VCD_Type) -> List[str]:
+	"""Keeps the `$var`s of the given identifiers and the `$scope`s that (transitively) hold any of them.
+
+	### Parameters
+	1. definitions : Iterable[str]
+		- The lines of the Variable Definition section.
+	2. ids : AbstractSet[str]
+		- The identifiers to keep.
+	3. type : VCD_Type
+		- Selects the standard or extended `$var` syntax.
+
+	### Returns
+	- List[str] : the pruned lines, in their original formatting.
+	"""
+	v_regex = re.compile(S_VAR_REGEXP) if type == VCD_Type.Standard else re.compile(E_VAR_REGEXP)
+
+	pruned  = list()
+	pending = list() # [line, written] of the currently open scopes
+
+	for line in definitions:
+
+		if line.startswith("$scope"):
+			pending.append([line, False])
+
+		elif line.startswith("$upscope"):
+			if pending and pending.pop()[1]:
+				pruned.append(line)
+
+		elif line.startswith("$var"):
+
+			is_var = v_regex.match(line)
+			if not is_var or is_var[3] not in ids:
+				continue
+
+			# the enclosing scopes are written with their first kept $var
+			for scope in pending:
+				if not scope[1]:
+					pruned.append(scope[0])
+					scope[1] = True
+
+			pruned.append(line)
+
+		else:
+			pruned.append(line)
+
+	return pruned
+
+class _SliceWriter(ValueChangeConsumer):
+
+	"""Writes the value changes of a `[start, end]` window, fed in file order, as the value change section of a VCD file.
+
+	Until the first `#<time>` marker past `start`, the changes only update the current value of each
+	kept identifier. That marker triggers `#<start>` and a synthesized `$dumpvars` block holding the state
+	at `start`; the later changes of the window are copied. Lines are written in bulk, every `BUFFER_LINES`.
+
+	### Attributes
+	1. current : Dict[ _Var.id : Optional[str] ]
+		- The current value of every kept identifier (None if unassigned).
+	2. done : bool
+		- A marker past `end` has been reached; the remaining changes can be skipped.
+	3. written : int
+		- The number of value changes written (`$dumpvars` included).
+	"""
+
+	def __init__(self, OUTFILE : TextIO, kinds : Dict[str, str], start : int, end : int, current : Dict[str, Optional[str]] = None):
+		"""Constructor
+
+		### Parameters
+		1. OUTFILE : TextIO
+		2. kinds : Dict[str, str]
+			- Per kept identifier, its `FORMATS` kind.
+		3. start, end : int
+			- The window.
+		4. current : Dict[str, Optional[str]]
+			- The state right before the first change fed, if the feed does not start at the beginning of the file.
+
+		### Returns
+		`_SliceWriter` object instance.
+		"""
+		self.OUTFILE = OUTFILE
+		self.formats = { id : FORMATS[kind] for id, kind in kinds.items() }
+		self.start   = start
+		self.end     = end
+		self.current = { id : None for id in kinds } if current is None else current
+		self.started = False
+		self.done    = False
+		self.written = 0
+		self.buffer  = list()
+
+	def _write(self, line : str) -> None:
+		self.buffer.append(line)
+		if len(self.buffer) >= BUFFER_LINES:
+			self.flush()
+
+	def flush(self) -> None:
+		self.OUTFILE.write("\n".join(self.buffer) + "\n" if self.buffer else "")
+		self.buffer.clear()
+
+	def _dump_start(self) -> None:
+
+		self.started = True
+		self._write(f"#{self.start}")
+		self._write("$dumpvars")
+
+		for id, value in self.current.items():
+
+			if value is None:
+				# unassigned : x for 4-state $vars, nothing for reals and ports
+				if self.formats[id] not in (FORMATS["scalar"], FORMATS["vector"]): continue
+				value = 'x'
+
+			self._write(self.formats[id].format(value = value, id = id))
+			self.written += 1
+
+		self._write("$end")
+
+	def on_timestamp(self, timestamp : int) -> None:
+
+		if timestamp > self.end:
+			self.done = True
+			return
+
+		if timestamp > self.start:
+			if not self.started:
+				self._dump_start()
+			self._write(f"#{timestamp}")
+
+	def on_change(self, timestamp : int, id : str, value : str) -> None:
+
+		if self.done or id not in self.formats:
+			return
+
+		if not self.started:
+			self.current[id] = value
+			return
+
+		self._write(self.formats[id].format(value = value, id = id))
+		self.written += 1
+
+	def on_finish(self) -> None:
+
+		# the window holds no marker past `start`
+		if not self.started:
+			self._dump_start()
+
+		self.flush()
@@ -0,0 +1,120 @@
+from typing import AbstractSet, Iterable, Iterator, Optional, Tuple
+
+# Characters that may appear in the value field of a vector change that is
+# written without the separating blank (e.g., `b0101!` instead of `b0101 !`).
+VECTOR_DIGITS = frozenset("01xXzZuUwWlLhH-")
+
+ValueChange = Tuple[int, Optional[str], Optional[str]]
+
+class ValueChangeConsumer():
+
+	"""Base class for objects fed by `VCD_Parser.feed` during a single pass over the value change section.
+
+	Subclasses override any of the hooks below; the default implementations do nothing.
+
+	### Methods
+	- on_timestamp(timestamp : int) : None
+		- Called for every `#<time>` marker of the value change section.
+	- on_change(timestamp : int, id : str, value : str) : None
+		- Called for every value change, with the timestamp it belongs to.
+	- on_finish() : None
+		- Called once, after the last value change has been consumed.
+	"""
+
+	def on_timestamp(self, timestamp : int) -> None:
+		pass
+
+	def on_change(self, timestamp : int, id : str, value : str) -> None:
+		pass
+
+	def on_finish(self) -> None:
+		pass
+
+def _split_vector(line : str) -> Tuple[str, str]:
+	"""Splits a `b<value> <id>` / `r<value> <id>` line into its (value, id) fields.
+
+	### Parameters
+	1. line : str
+		- The stripped value change line, including the leading `b`/`r`.
+
+	### Returns
+	- Tuple[str, str]
+	"""
+	value, sep, id = line[1:].partition(' ')
+
+	if sep:
+		return value, id.strip()
+
+	# No blank between value and identifier; the value ends at the first non-digit
+	end = 1
+	while end < len(line) and line[end] in VECTOR_DIGITS:
+		end += 1
+
+	return line[1:end], line[end:]
+
+def tokenize_value_changes(lines : Iterable[str], timestamp : int = 0, ids : Optional[AbstractSet[str]] = None) -> Iterator[ValueChange]:
+	"""Tokenizes the value change section of a VCD/eVCD file in a single pass.
+
+	The lines are consumed lazily, so `lines` can be an open file handle positioned
+	right after `$enddefinitions` and nothing but the current line is held in memory.
+
+	### Parameters
+	1. lines : Iterable[str]
+		- The lines of the value change section.
+	2. timestamp : int
+		- The timestamp assigned to changes that precede the first `#<time>` marker (e.g., a leading `$dumpvars`).
+	3. ids : AbstractSet[str]
+		- If given, only the changes of these identifiers are yielded; the rest are discarded on the spot.
+
+	### Returns
+	- Iterator[Tuple[int, str, str]]
+		- `(timestamp, id, value)` for every value change and `(timestamp, None, None)` for every `#<time>` marker.
+
+	Raises
+	------
+	- ValueError
+		- A `#<time>` marker does not hold an integer timestamp.
+	"""
+	lines = iter(lines)
+
+	for line in lines:
+
+		line = line.strip()
+
+		if not line:
+			continue
+
+		head = line[0]
+
+		if head == '#':
+
+			try:
+				timestamp = int(line[1:])
+			except ValueError:
+				raise ValueError(f"Casting to integer failed for line ({line}) in Value Change section ") from None
+
+			yield timestamp, None, None
+
+		elif head == '$':
+
+			# $dumpvars, $dumpall, $dumpon, $dumpoff and their $end are just delimiters
+			if line.startswith("$comment") and "$end" not in line:
+				for line in lines:
+					if "$end" in line: break
+
+		elif head in "bBrR":
+
+			value, id = _split_vector(line)
+			if ids is None or id in ids:
+				yield timestamp, id, value
+
+		elif head == 'p':
+
+			# eVCD port value : p<state> <strength0> <strength1> <id>
+			value, _, id = line[1:].rpartition(' ')
+			if ids is None or id in ids:
+				yield timestamp, id, value
+
+		elif ids is None or line[1:] in ids:
+
+			yield timestamp, line[1:], head
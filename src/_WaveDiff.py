@@ -0,0 +1,164 @@
+from typing     import Dict, Iterable, Iterator, List, Optional, Tuple
+from _Tokenizer import ValueChange
+
+NEVER = float("inf")
+
+class _SignalDiff():
+
+	"""The differences of one signal between two dumps.
+
+	### Attributes
+	1. path : str
+		- The full hierarchical path of the signal.
+	2. first_mismatch : Optional[int]
+		- The first timestamp at which the two values differ (None if they never do).
+	3. mismatches : int
+		- The number of timestamps, among the changes of the signal in either dump, after which the two values differ.
+	"""
+
+	def __init__(self, path : str):
+		self.path           = path
+		self.first_mismatch = None
+		self.mismatches     = 0
+
+	def __repr__(self) -> str:
+		return f"_SignalDiff(path={self.path}, first_mismatch={self.first_mismatch}, mismatches={self.mismatches})"
+
+class _DiffReport():
+
+	"""The outcome of the comparison of two dumps, signal by signal.
+
+	### Attributes
+	1. signals : Dict[ str : _SignalDiff ]
+		- Per compared full path, its differences.
+	2. first_mismatch : Optional[int]
+		- The first timestamp at which any compared signal differs (None if none does).
+	3. mismatches : int
+		- The total of the per signal mismatch counts.
+	4. only_in_first, only_in_second : List[str]
+		- The full paths that exist in one of the two hierarchies only (not compared).
+	5. stopped : bool
+		- Whether the comparison stopped early at the first mismatch.
+
+	### Methods
+	- identical() : bool
+		- Whether no compared signal differs.
+	- mismatching() : List[_SignalDiff]
+		- The signals that differ, by first mismatch.
+	"""
+
+	def __init__(self, paths : Iterable[str], only_in_first : List[str], only_in_second : List[str]):
+		self.signals        = { path : _SignalDiff(path) for path in paths }
+		self.first_mismatch = None
+		self.mismatches     = 0
+		self.only_in_first  = only_in_first
+		self.only_in_second = only_in_second
+		self.stopped        = False
+
+	def __repr__(self) -> str:
+		return f"_DiffReport(#signals={len(self.signals)}, first_mismatch={self.first_mismatch}, mismatches={self.mismatches})"
+
+	def identical(self) -> bool:
+		return self.first_mismatch is None
+
+	def mismatching(self) -> List[_SignalDiff]:
+		return sorted((diff for diff in self.signals.values() if diff.mismatches), key = lambda diff : diff.first_mismatch)
+
+def normalize(value : Optional[str], width : int) -> Optional[str]:
+	"""Left-extends a vector value to the `$var` width (`b1` and `b0001` are the same value), as of the VCD rules:
+	with 0 for a leading 0/1, with the leading bit for X/Z.
+
+	### Parameters
+	1. value : Optional[str]
+	2. width : int
+
+	### Returns
+	- Optional[str]
+	"""
+	if value is None or len(value) >= width:
+		return value
+
+	return ('0' if value[0] in "01" else value[0]) * (width - len(value)) + value
+
+def _grouped(stream : Iterator[ValueChange]) -> Iterator[Tuple[int, List[Tuple[str, str]]]]:
+	"""Groups a token stream into (timestamp, [(id, value), ...]) per timestamp with changes."""
+
+	timestamp, changes = 0, list()
+
+	for at, id, value in stream:
+
+		if id is not None:
+			changes.append((id, value))
+			continue
+
+		if changes:
+			yield timestamp, changes
+			changes = list()
+
+		timestamp = at
+
+	if changes:
+		yield timestamp, changes
+
+def diff_streams(first : Iterator[ValueChange], second : Iterator[ValueChange], first_ids : Dict[str, List[Tuple[str, int]]], second_ids : Dict[str, List[Tuple[str, int]]], report : _DiffReport, stop_at_first : bool = False) -> _DiffReport:
+	"""Walks two token streams in lockstep, timestamp by timestamp, and compares the value of every
+	signal that changed at that timestamp in either stream. Only the current value of each signal is kept.
+
+	### Parameters
+	1. first, second : Iterator[ValueChange]
+		- The token streams (see `tokenize_value_changes`) of the two dumps.
+	2. first_ids, second_ids : Dict[str, List[Tuple[str, int]]]
+		- Per identifier of each dump, the (full path, width) of the compared signals it carries.
+	3. report : _DiffReport
+		- Filled in with the differences.
+	4. stop_at_first : bool
+		- Stop at the first timestamp with a mismatch.
+
+	### Returns
+	- _DiffReport : `report`.
+	"""
+	current = ({ path : None for path in report.signals }, { path : None for path in report.signals })
+
+	streams = (_grouped(first), _grouped(second))
+	ids     = (first_ids, second_ids)
+	heads   = [next(stream, (NEVER, None)) for stream in streams]
+
+	while min(heads[0][0], heads[1][0]) != NEVER:
+
+		timestamp = min(heads[0][0], heads[1][0])
+		touched   = set()
+
+		for side in (0, 1):
+
+			if heads[side][0] != timestamp:
+				continue
+
+			for id, value in heads[side][1]:
+				for path, width in ids[side].get(id, ()):
+					current[side][path] = normalize(value, width)
+					touched.add(path)
+
+			heads[side] = next(streams[side], (NEVER, None))
+
+		for path in touched:
+
+			if current[0][path] == current[1][path]:
+				continue
+
+			diff = report.signals[path]
+			if diff.first_mismatch is None:
+				diff.first_mismatch = timestamp
+			diff.mismatches += 1
+			report.mismatches += 1
+
+			if report.first_mismatch is None:
+				report.first_mismatch = timestamp
+
+		if stop_at_first and report.first_mismatch is not None:
+			report.stopped = True
+			break
+
+	for stream in streams:
+		stream.close()
+
+	return report
@@ -75,7 +75,8 @@ class eVCD_Uknown_Direction_Values(Enum):
 
 #$var var_type size < identifier_code reference $end
 
-S_VAR_REGEXP = "^\$var\s+([a-z]+)\s+([0-9]+)\s+(.*)\s+([a-zA-Z0-9_]+)\s+\$end"
+# the reference may carry bit or part selects, e.g. `data [7:0]`, `warp_state_out [1]` or `stack_mem [31][65]`
+S_VAR_REGEXP = "^\$var\s+([a-z]+)\s+([0-9]+)\s+(.*)\s+([a-zA-Z0-9_]+(?:\s*\[[0-9]+(?::[0-9]+)?\])*)\s+\$end"
 E_VAR_REGEXP = "^\$var\s+(port)\s+(1|\[[0-9]+:[0-9]+\])\s+(<[0-9]+)\s(.*)\s\$end" 
 SCOPE_REGEXP = "^\$scope\s+(.*)\s+(.*)\s+\$end"
 
@@ -0,0 +1,75 @@
+import unittest
+import sys
+
+sys.path.insert(0, "../src/")
+
+from EVCD_Parser import EVCD_Parser
+from utils import *
+
+DUMPPORTS_FILE = "../misc/dumpports.vcd"
+
+class TestPortDecoding(unittest.TestCase):
+
+    def test_find_signals_ports(self):
+
+        TestObject = EVCD_Parser(DUMPPORTS_FILE, lazy=True)
+        ports = TestObject.find_signals_ports(["dut/data_in", "dut/bus", "dut/ready"])
+
+        data_in = ports["dut/data_in"]
+        self.assertEqual(list(data_in.times), [0, 5, 15])
+        self.assertEqual([data_in.value(index) for index in range(len(data_in))], ["DDDD", "UDUD", "NNZZ"])
+        self.assertEqual(data_in.states_of(1), [eVCD_Input_Values.U, eVCD_Input_Values.D, eVCD_Input_Values.U, eVCD_Input_Values.D])
+        self.assertEqual(data_in.strengths_of(1)[0], (eVCD_Strenth_Value.HIGHZ, eVCD_Strenth_Value.STRONG))
+
+        self.assertEqual(ports["dut/bus"].states_of(1), [eVCD_Uknown_Direction_Values.U, eVCD_Uknown_Direction_Values.A])
+
+        # the commented out change is skipped
+        ready = ports["dut/ready"]
+        self.assertEqual(list(ready.times), [0, 10, 20])
+        self.assertEqual(ready.states_of(1), [eVCD_Output_Values.H])
+
+    def test_find_signals_ports_from_store(self):
+
+        Lazy   = EVCD_Parser(DUMPPORTS_FILE, lazy=True)
+        Loaded = EVCD_Parser(DUMPPORTS_FILE)
+
+        for signal in ["dut/clk", "dut/data_in", "dut/bus"]:
+
+            streamed, stored = Lazy.find_signals_ports([signal])[signal], Loaded.find_signals_ports([signal])[signal]
+            self.assertEqual(list(streamed.times), list(stored.times))
+            self.assertEqual(streamed.states, stored.states)
+            self.assertEqual(streamed.strength0, stored.strength0)
+            self.assertEqual(streamed.strength1, stored.strength1)
+
+    def test_find_all_signal_values(self):
+
+        TestObject = EVCD_Parser(DUMPPORTS_FILE)
+
+        self.assertEqual(TestObject.find_all_signal_values("dut/ready"), ["L", "L", "H", "H", "L"])
+
+class TestValueQueries(unittest.TestCase):
+
+    def test_find_signal_values_at(self):
+
+        TestObject = EVCD_Parser(DUMPPORTS_FILE, lazy=True)
+
+        self.assertEqual(TestObject.find_signal_values_at(0, "dut/data_in"), "DDDD")
+        self.assertEqual(TestObject.find_signal_values_at(10, "dut/data_in"), "UDUD")
+        self.assertEqual(TestObject.find_signal_values_at(20, "tb/dut/bus"), "?A")
+
+        with self.assertRaises(KeyError):
+            TestObject.find_signal_values_at(7, "dut/clk")
+
+    def test_find_signal_values_at_region(self):
+
+        TestObject = EVCD_Parser(DUMPPORTS_FILE)
+
+        self.assertEqual(TestObject.find_signal_values_at_region(5, 20, "dut/clk"), ["U", "D", "U"])
+        self.assertEqual(TestObject.find_signals_values_at_region(["dut/ready", "dut/bus"], 0, 10), { "dut/ready" : ["L"], "dut/bus" : ["FF"] })
+        self.assertEqual(TestObject.find_signals_values_at_region(["dut/ready"], 0, 10, proc_num=1), { "dut/ready" : ["L"] })
+
+        with self.assertRaises(ValueError):
+            TestObject.find_signal_values_at_region(1, 20, "dut/clk")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,270 @@
+import unittest
+import sys
+import os
+import tempfile
+
+from unittest import mock
+
+sys.path.insert(0, "../src/")
+
+from SVCD_Parser import SVCD_Parser
+from VCD_Parser import Signal
+from _Condition import _Condition
+from utils import *
+
+WIKI_FILE = "../misc/wikipedia.vcd"
+BRANCH_UNIT_FILE = "../misc/branch_unit.vcd"
+
+class TestValueQueries(unittest.TestCase):
+
+    def test_find_signal_values_at(self):
+
+        TestObject = SVCD_Parser(WIKI_FILE)
+
+        self.assertEqual(TestObject.find_signal_values_at(0, "logic/data"), "10000011")
+        self.assertEqual(TestObject.find_signal_values_at(2211, "logic/tx_en"), "0")
+        self.assertEqual(TestObject.find_signal_values_at(2302, "logic/data"), "0")
+        self.assertEqual(TestObject.find_signal_values_at(2302, "logic/data_valid"), "0")
+
+    def test_find_signal_values_at_unknown_timestamp(self):
+
+        TestObject = SVCD_Parser(WIKI_FILE)
+
+        with self.assertRaises(KeyError):
+            TestObject.find_signal_values_at(2300, "logic/data")
+
+    def test_find_signal_values_at_matches_history(self):
+
+        TestObject = SVCD_Parser(BRANCH_UNIT_FILE)
+        signal = TestObject.get_signal("uBranchExecuteUnit/branch_exec_done")
+        times, values = TestObject.changes.history(signal.get_id())
+
+        for at, value in zip(times, values):
+            self.assertEqual(TestObject.find_signal_values_at(at, "uBranchExecuteUnit/branch_exec_done"), value)
+
+    def test_find_signal_values_at_region(self):
+
+        TestObject = SVCD_Parser(WIKI_FILE)
+
+        self.assertEqual(TestObject.find_signal_values_at_region(0, 2302, "logic/data"), ["10000011", "0"])
+        self.assertEqual(TestObject.find_signal_values_at_region(2211, 2302, "logic/data_valid"), ["1"])
+        self.assertEqual(TestObject.mapped.changes_at(2296), [("#", "0"), ("$", "1")])
+
+        with self.assertRaises(ValueError):
+            TestObject.find_signal_values_at_region(1, 2302, "logic/data")
+
+    def test_find_signal_values_at_region_matches_store(self):
+
+        TestObject = SVCD_Parser(BRANCH_UNIT_FILE)
+        signal = TestObject.get_signal("uBranchExecuteUnit/branch_exec_done")
+        start, end = TestObject.changes.timestamps[10], TestObject.changes.timestamps[-10]
+
+        self.assertEqual(TestObject.find_signal_values_at_region(start, end, "uBranchExecuteUnit/branch_exec_done"), 
+                         TestObject.changes.changes_between(signal.get_id(), start, end)[1])
+
+    def test_find_all_signal_values(self):
+
+        TestObject = SVCD_Parser(WIKI_FILE)
+
+        self.assertEqual(TestObject.find_all_signal_values("logic/data"), ["xxxxxxxx", "10000011", "10000011", "0", "0"])
+        self.assertEqual(TestObject.find_all_signal_values("logic/data_valid"), ["x", "0", "0", "1", "0"])
+
+    def test_find_signals_histories_single_pass(self):
+
+        Eager = SVCD_Parser(BRANCH_UNIT_FILE)
+        Lazy = SVCD_Parser(BRANCH_UNIT_FILE, lazy=True)
+        signals = ["uBranchExecuteUnit/branch_exec_done", "uBranchExecuteUnit/warp_div_grant_in"]
+
+        histories = Lazy.find_signals_histories(signals)
+
+        self.assertFalse(Lazy._loaded)
+        for signal in signals:
+            times, values = Eager.changes.history(Eager.get_signal(signal).get_id())
+            self.assertEqual(list(histories[signal][0]), list(times))
+            self.assertEqual(histories[signal][1], values)
+
+        self.assertEqual(Lazy.find_all_signals_values(signals), Eager.find_all_signals_values(signals))
+
+    def test_find_signals_values_at_region_parallel(self):
+
+        TestObject = SVCD_Parser(BRANCH_UNIT_FILE)
+        signals = ["uBranchExecuteUnit/branch_exec_done", "uBranchExecuteUnit/warp_div_grant_in"]
+        start, end = TestObject.changes.timestamps[5], TestObject.changes.timestamps[-5]
+
+        # small shards, so that the small file is still searched by a pool
+        with mock.patch("SVCD_Parser.MIN_SHARD_SIZE", 1 << 10):
+            parallel = TestObject.find_signals_values_at_region(signals, start, end, proc_num=2)
+
+        for signal in signals:
+            self.assertEqual(parallel[signal], TestObject.find_signal_values_at_region(start, end, signal))
+
+        self.assertEqual(TestObject.find_signals_values_at_region(signals, start, end, proc_num=1), parallel)
+
+    def test_find_signals_values_at_region_small_window(self):
+
+        TestObject = SVCD_Parser(BRANCH_UNIT_FILE)
+        signals = ["uBranchExecuteUnit/branch_exec_done"]
+        start, end = TestObject.changes.timestamps[5], TestObject.changes.timestamps[50]
+
+        # a window below MIN_SHARD_SIZE is searched in-process
+        with mock.patch("SVCD_Parser.mp.Pool", side_effect=AssertionError("no pool expected")):
+            values = TestObject.find_signals_values_at_region(signals, start, end, proc_num=8)
+
+        self.assertEqual(values[signals[0]], TestObject.find_signal_values_at_region(start, end, signals[0]))
+
+    def test_find_signals_initial_values_shared_memory(self):
+
+        TestObject = SVCD_Parser(WIKI_FILE)
+        signals = ["logic/data", "logic/data_valid", "logic/tx_en", "logic/empty"]
+        expected = {"logic/data" : "10000011", "logic/data_valid" : "0", "logic/tx_en" : "1", "logic/empty" : "1"}
+
+        self.assertEqual(TestObject.find_signals_initial_values(signals, proc_num=2), expected)
+        self.assertEqual(TestObject.find_signals_initial_values(signals, proc_num=1), expected)
+        self.assertEqual(TestObject.find_signal_initial_value("logic/data_valid"), "0")
+
+    def test_find_signal_initial_value_unassigned(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            filename = os.path.join(directory, "unassigned.vcd")
+            with open(filename, "w") as VCDFILE:
+                VCDFILE.write("$scope module top $end\n$var wire 1 ! en $end\n$var wire 1 \" rst $end\n$upscope $end\n$enddefinitions $end\n")
+                VCDFILE.write("#0\n1!\n#10\n0!\n")
+
+            TestObject = SVCD_Parser(filename)
+
+            self.assertEqual(TestObject.find_signal_initial_value("top/en"), "1")
+
+            with self.assertRaisesRegex(ValueError, "top/rst"):
+                TestObject.find_signal_initial_value("top/rst")
+
+    def test_find_signals_arrays(self):
+
+        TestObject = SVCD_Parser(WIKI_FILE)
+        Lazy = SVCD_Parser(WIKI_FILE, lazy=True)
+
+        for Parser in [TestObject, Lazy]:
+
+            data = Parser.find_signals_arrays(["logic/data"])["logic/data"]
+
+            self.assertEqual(data.times.tolist(), [0, 0, 2296])
+            self.assertEqual(data.values.tolist(), [0, 0b10000011, 0])
+            self.assertEqual(data.xz_index.tolist(), [0])
+            self.assertEqual(data.xz_mask.tolist(), [0xff])
+            self.assertEqual(data.is_known().tolist(), [False, True, True])
+
+        self.assertFalse(Lazy._loaded)
+
+    def test_find_signals_arrays_real(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            filename = os.path.join(directory, "real.vcd")
+            with open(filename, "w") as VCDFILE:
+                VCDFILE.write("$scope module top $end\n$var real 64 ! temp $end\n$var wire 1 \" en $end\n$upscope $end\n$enddefinitions $end\n")
+                VCDFILE.write("#0\nr0.5 !\n1\"\n#10\nr1.25 !\n")
+
+            TestObject = SVCD_Parser(filename)
+
+            with self.assertRaisesRegex(TypeError, "top/temp"):
+                TestObject.find_signals_arrays(["top/temp", "top/en"])
+
+            self.assertEqual(TestObject.find_signals_arrays(["top/en"])["top/en"].values.tolist(), [1])
+
+    def test_sample_signals(self):
+
+        TestObject = SVCD_Parser(WIKI_FILE, lazy=True)
+
+        matrix = TestObject.sample_signals(["logic/data", "logic/data_valid", "logic/tx_en"], 1, start=2210, end=2212)
+        self.assertEqual(matrix.tolist(), [[131, 131, 131], [0, 0, 0], [1, 0, 0]])
+
+        matrix = TestObject.sample_signals(["logic/data", "logic/data_valid"], 1000)
+        self.assertEqual(matrix.shape, (2, 3))
+
+        with self.assertRaises(ValueError):
+            TestObject.sample_signals(["logic/data"], 0)
+
+class TestConditionSearch(unittest.TestCase):
+
+    def test_find_timestamps(self):
+
+        TestObject = SVCD_Parser(WIKI_FILE, lazy=True)
+
+        # x -> 1 at #0 is not a rising edge
+        self.assertEqual(TestObject.find_timestamps(Signal("logic/tx_en").rising()).tolist(), [])
+        self.assertEqual(TestObject.find_timestamps(Signal("logic/tx_en").falling()).tolist(), [2211])
+        self.assertEqual(TestObject.find_timestamps(Signal("logic/tx_en").falling() | (Signal("logic/data") == 131)).tolist(), [0, 2211])
+        self.assertEqual(TestObject.find_timestamps(Signal("logic/data_valid").changed() & ~(Signal("logic/data") == 0)).tolist(), [0])
+        self.assertEqual(TestObject.find_timestamps((Signal("logic/data") > 100) ^ (Signal("logic/data_valid") == 0)).tolist(), [2302])
+
+    def test_find_timestamps_matches_histories(self):
+
+        TestObject = SVCD_Parser(BRANCH_UNIT_FILE)
+        signal = "uBranchExecuteUnit/branch_exec_done"
+        times, values = TestObject.changes.history(TestObject.get_signal(signal).get_id())
+
+        expected = [at for at, before, value in zip(times[1:], values, values[1:]) if before == "0" and value == "1"]
+        self.assertEqual(TestObject.find_timestamps(Signal(signal).rising()).tolist(), expected)
+
+    def test_condition_without_numpy(self):
+
+        TestObject = SVCD_Parser(WIKI_FILE, lazy=True)
+
+        # conditions are built without NumPy; the search raises the install hint
+        with mock.patch("_PackedHistory.np", None), mock.patch("_Condition.np", None):
+            condition = Signal("logic/tx_en").falling() | ~(Signal("logic/data") >= 131)
+
+            with self.assertRaisesRegex(ImportError, "pip install numpy"):
+                TestObject.find_timestamps(condition)
+
+        self.assertEqual(TestObject.find_timestamps(condition).tolist(), [2211, 2296])
+
+    def test_condition_truth_value(self):
+
+        rising, enabled = Signal("logic/tx_en").rising(), Signal("logic/data_valid") == 1
+
+        # Python boolean operators would silently drop one of the conditions
+        with self.assertRaisesRegex(TypeError, "use & | ~"):
+            rising and enabled
+
+        with self.assertRaises(TypeError):
+            not rising
+
+        with self.assertRaises(TypeError):
+            bool(Signal("logic/data") == 3)
+
+        with self.assertRaises(TypeError):
+            _Condition()
+
+class TestColumnarExport(unittest.TestCase):
+
+    def test_columnar_roundtrip(self):
+
+        Parsed = SVCD_Parser(BRANCH_UNIT_FILE)
+        signal = "uBranchExecuteUnit/branch_exec_done"
+        start, end = Parsed.changes.timestamps[10], Parsed.changes.timestamps[-10]
+
+        for compress in [True, False]:
+            with tempfile.TemporaryDirectory() as directory:
+
+                filename = os.path.join(directory, "branch_unit.col")
+                Parsed.export_columnar(filename, compress=compress)
+
+                Loaded = SVCD_Parser.load_columnar(filename)
+                self.assertIsInstance(Loaded, SVCD_Parser)
+                self.assertEqual(Loaded.get_signal(signal).get_id(), Parsed.get_signal(signal).get_id())
+                self.assertEqual(Loaded.find_all_signal_values(signal), Parsed.find_all_signal_values(signal))
+                self.assertEqual(Loaded.find_signal_values_at(start, signal), Parsed.find_signal_values_at(start, signal))
+                self.assertEqual(Loaded.find_signal_values_at_region(start, end, signal), Parsed.find_signal_values_at_region(start, end, signal))
+                self.assertEqual(Loaded.find_signals_values_at_region([signal], start, end, proc_num=1), Parsed.find_signals_values_at_region([signal], start, end, proc_num=1))
+
+                # same state as a constructed parser, so that every method finds its attributes
+                self.assertEqual(set(vars(Loaded)), set(vars(Parsed)))
+                self.assertEqual(list(Loaded.changes.timestamps), list(Parsed.changes.timestamps))
+
+                # every column, the global markers included, is compressed
+                if compress:
+                    self.assertLess(os.path.getsize(filename), os.path.getsize(BRANCH_UNIT_FILE) // 4)
+
+if __name__ == "__main__":
+    unittest.main()
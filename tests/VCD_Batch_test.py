@@ -0,0 +1,92 @@
+import unittest
+import shutil
+import tempfile
+import gzip
+import sys
+import os
+import io
+import csv
+import subprocess
+
+sys.path.insert(0, "../src/")
+
+from VCD_Batch import BatchQuery, expand, extract, run_batch, write_table
+from SVCD_Parser import SVCD_Parser
+
+WIKI_FILE = "../misc/wikipedia.vcd"
+BRANCH_UNIT_FILE = "../misc/branch_unit.vcd"
+
+class TestBatchProcessor(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+        for index in range(3):
+            shutil.copy(WIKI_FILE, os.path.join(self.directory, f"run_{index}.vcd"))
+
+        with open(WIKI_FILE, "rb") as VCDFILE, gzip.open(os.path.join(self.directory, "run_3.vcd.gz"), "wb") as GZFILE:
+            GZFILE.write(VCDFILE.read())
+
+        self.query = BatchQuery(["logic/data", "logic/tx_en"], initial_values=True, at=[0, 2211])
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_extract(self):
+
+        rows = extract(WIKI_FILE, self.query)
+        Parsed = SVCD_Parser(WIKI_FILE)
+
+        self.assertIn((WIKI_FILE, "logic/data", "initial", Parsed.find_signal_initial_value("logic/data")), rows)
+        self.assertIn((WIKI_FILE, "logic/data", "@0", Parsed.find_signal_values_at(0, "logic/data")), rows)
+        self.assertIn((WIKI_FILE, "logic/tx_en", "@2211", Parsed.find_signal_values_at(2211, "logic/tx_en")), rows)
+        self.assertEqual(len(rows), 6)
+
+    def test_missing_signal_is_reported(self):
+
+        rows = extract(WIKI_FILE, BatchQuery(["logic/no_such_signal"]))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][2], "error")
+
+    def test_run_batch(self):
+
+        files = expand(self.directory)
+        self.assertEqual(len(files), 4)
+
+        output = io.StringIO()
+        count = write_table(run_batch(files, self.query, proc_num=2), output)
+
+        table = list(csv.reader(io.StringIO(output.getvalue())))
+        self.assertEqual(table[0], ["file", "signal", "query", "value"])
+        self.assertEqual(count, 4 * 6)
+        self.assertEqual(len(table), count + 1)
+
+        # every file yields the same rows
+        per_file = dict()
+        for file, *row in table[1:]:
+            per_file.setdefault(file, set()).add(tuple(row))
+        self.assertEqual(len(set(map(frozenset, per_file.values()))), 1)
+
+    def test_cli_relative_glob(self):
+
+        sig_file = os.path.join(self.directory, "signals.txt")
+        with open(sig_file, "w") as SIGFILE:
+            SIGFILE.write("logic/data\nlogic/tx_en\n")
+
+        # run from the repository root, with paths relative to it
+        result = subprocess.run(
+            [sys.executable, "src/VCD_Batch.py", "misc/wiki*.vcd", "-s", sig_file, "-i", "-j", "1"],
+            cwd=os.path.dirname(os.path.abspath(os.path.dirname(WIKI_FILE))), capture_output=True, text=True, check=True
+        )
+
+        table = list(csv.reader(io.StringIO(result.stdout)))
+        self.assertEqual(table[1:], [
+            ["misc/wikipedia.vcd", "logic/data", "initial", "10000011"],
+            ["misc/wikipedia.vcd", "logic/tx_en", "initial", SVCD_Parser(WIKI_FILE).find_signal_initial_value("logic/tx_en")]
+        ])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,29 @@
 import unittest
+import shutil
+import gzip
+import lzma
+import bz2
+import tempfile
 import sys
+import os
+import asyncio
+import threading
+
+from unittest import mock
 
 sys.path.insert(0, "../src/")
 
 from VCD_Parser import VCD_Parser
+from SVCD_Parser import SVCD_Parser
 from utils import *
+from _Tokenizer import ValueChangeConsumer
+from _Scope import ScopeHasNoVar
+from _ParseStats import ProgressObserver
+from concurrent.futures import ProcessPoolExecutor
 
 EVCD_FILE = "../misc/VCDS/dumpports_rtl.openMSP430_3.vcd"
 SVCD_FILE = "../misc/bmu_full.vcd"
+WIKI_FILE = "../misc/wikipedia.vcd"
 
 class TestFileParsing(unittest.TestCase):
 
@@ -22,5 +38,687 @@ class TestFileParsing(unittest.TestCase):
         TestObject_SVCD = VCD_Parser(SVCD_FILE,VCD_Type.Standard)
         TestObject_EVCD = VCD_Parser(EVCD_FILE,VCD_Type.Extended)
 
+class TestStreaming(unittest.TestCase):
+
+    class Recorder(ValueChangeConsumer):
+
+        def __init__(self):
+            self.timestamps = list()
+            self.changes = list()
+            self.finished = False
+
+        def on_timestamp(self, timestamp):
+            self.timestamps.append(timestamp)
+
+        def on_change(self, timestamp, id, value):
+            self.changes.append((timestamp, id, value))
+
+        def on_finish(self):
+            self.finished = True
+
+    def test_streaming_skips_raw_sections(self):
+
+        TestObject = VCD_Parser(WIKI_FILE, VCD_Type.Standard, streaming=True)
+
+        self.assertEqual(TestObject.raw_sections[Section.Value_Change], [])
+        self.assertEqual(len(TestObject._changes.timestamps), 0)
+
+    def test_streaming_store_queries(self):
+
+        Streamed = SVCD_Parser(WIKI_FILE, streaming=True)
+
+        # nothing is kept : store-backed queries raise instead of answering from an empty store
+        with self.assertRaisesRegex(ValueError, "Streaming parsers"):
+            Streamed.find_signal_values_at(2296, "logic/data")
+
+        with self.assertRaisesRegex(ValueError, "Streaming parsers"):
+            Streamed.find_signals_initial_values(["logic/data"], proc_num=1)
+
+        # single pass queries still work, and an explicit load makes the store available
+        self.assertEqual(Streamed.find_signals_histories(["logic/data"])["logic/data"][1][-1], "0")
+
+        Streamed.load_value_changes()
+        self.assertEqual(Streamed.find_signal_values_at(2296, "logic/data"), "0")
+
+    def test_feed_matches_eager_parse(self):
+
+        Eager = VCD_Parser(WIKI_FILE, VCD_Type.Standard)
+        Streamed = VCD_Parser(WIKI_FILE, VCD_Type.Standard, streaming=True)
+
+        recorder = self.Recorder()
+        Streamed.feed(recorder)
+
+        self.assertTrue(recorder.finished)
+        self.assertEqual(recorder.timestamps, list(Eager.changes.timestamps))
+        self.assertEqual(sorted(recorder.changes), sorted((ts, id, val) for id in Eager.changes.times for ts, val in zip(*Eager.changes.history(id))))
+        self.assertIn((2296, '#', '0'), recorder.changes)
+
+class TestHierarchy(unittest.TestCase):
+
+    DUPLICATE_INSTANCES = "\n".join([
+        "$timescale 1ns $end",
+        "$scope module top $end",
+        "$scope module u0 $end", "$scope module cell $end", "$var wire 1 ! q $end", "$upscope $end", "$upscope $end",
+        "$scope module u1 $end", "$scope module cell $end", "$var wire 1 \" q $end", "$upscope $end", "$upscope $end",
+        "$upscope $end",
+        "$enddefinitions $end",
+        "#0", "0!", "1\"", ""
+    ])
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.vcd_file = os.path.join(self.directory, "duplicates.vcd")
+
+        with open(self.vcd_file, "w") as VCDFILE:
+            VCDFILE.write(self.DUPLICATE_INSTANCES)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_full_paths(self):
+
+        TestObject = VCD_Parser(self.vcd_file, VCD_Type.Standard)
+
+        self.assertEqual(TestObject.get_signal("top/u0/cell/q").get_id(), "!")
+        self.assertEqual(TestObject.get_signal("top/u1/cell/q").get_id(), '"')
+        self.assertEqual(TestObject.hierarchy.scope_paths, ["top", "top/u0", "top/u0/cell", "top/u1", "top/u1/cell"])
+        self.assertEqual(list(TestObject.hierarchy.parents), [-1, 0, 1, 0, 3])
+
+    def test_partial_paths(self):
+
+        TestObject = VCD_Parser(self.vcd_file, VCD_Type.Standard)
+
+        self.assertEqual(TestObject.get_signal("u1/cell/q").get_id(), '"')
+
+        with self.assertRaises(ValueError):
+            TestObject.get_signal("cell/q")
+
+        with self.assertRaises(ScopeHasNoVar):
+            TestObject.get_signal("u1/cell/d")
+
+class TestLazyParsing(unittest.TestCase):
+
+    def test_lazy_reads_definitions_only(self):
+
+        TestObject = VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard, lazy=True)
+
+        self.assertFalse(TestObject.raw_sections[Section.Value_Change])
+        self.assertEqual(TestObject.get_signal("uBranchExecuteUnit/branch_exec_done").get_id(), "N$")
+        self.assertTrue(TestObject.raw_sections[Section.Variable_Definition][-1].startswith("$enddefinitions"))
+
+    def test_lazy_loads_on_first_query(self):
+
+        Eager = VCD_Parser(WIKI_FILE, VCD_Type.Standard)
+        Lazy = VCD_Parser(WIKI_FILE, VCD_Type.Standard, lazy=True)
+
+        self.assertEqual(Lazy.changes.value_at("#", 2296), "0")
+        self.assertEqual(list(Lazy.changes.timestamps), list(Eager.changes.timestamps))
+
+        # neither keeps the raw value change lines next to the store
+        self.assertEqual(Lazy.raw_sections[Section.Value_Change], [])
+        self.assertEqual(Eager.raw_sections[Section.Value_Change], [])
+
+class TestFilteredParsing(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.sig_file = os.path.join(self.directory, "si.txt")
+
+        with open(self.sig_file, "w") as SIGFILE:
+            SIGFILE.write("uBranchExecuteUnit/branch_exec_done\n")
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_filtered_keeps_listed_signals_only(self):
+
+        Full = VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard)
+        Filtered = VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard, sig_file=self.sig_file, filtered=True)
+
+        self.assertEqual(Filtered.filter_ids, {"N$"})
+        self.assertEqual(list(Filtered.changes.times), ["N$"])
+        self.assertEqual(list(Filtered.changes.timestamps), list(Full.changes.timestamps))
+        self.assertEqual(Filtered.changes.history("N$")[1], Full.changes.history("N$")[1])
+        self.assertFalse(Filtered.raw_sections[Section.Value_Change])
+
+        with self.assertRaises(ValueError):
+            Filtered.save_index()
+
+    def test_filtered_rejects_other_signals(self):
+
+        with self.assertRaises(ValueError):
+            VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard, filtered=True)
+
+        Filtered = VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard, sig_file=self.sig_file, filtered=True)
+
+        with self.assertRaises(KeyError):
+            Filtered.find_signals_histories(["uBranchExecuteUnit/clk_in"])
+
+        with self.assertRaises(KeyError):
+            Filtered.map_signals(len, ["uBranchExecuteUnit/clk_in"], proc_num=2)
+
+        self.assertTrue(Filtered.find_signals_histories(["uBranchExecuteUnit/branch_exec_done"])["uBranchExecuteUnit/branch_exec_done"][1])
+
+class TestSidecarIndex(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.vcd_file = shutil.copy("../misc/branch_unit.vcd", self.directory)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_index_roundtrip(self):
+
+        Parsed = VCD_Parser(self.vcd_file, VCD_Type.Standard, index=True)
+        self.assertTrue(os.path.isfile(Parsed.index_filename))
+
+        Loaded = VCD_Parser(self.vcd_file, VCD_Type.Standard, index=True)
+        self.assertEqual(Loaded.raw_sections[Section.Value_Change], [])
+        self.assertEqual(list(Loaded.changes.timestamps), list(Parsed.changes.timestamps))
+        self.assertEqual(list(Loaded.mapped.offsets), list(Parsed.mapped.offsets))
+
+        id = Loaded.get_signal("uBranchExecuteUnit/branch_exec_done").get_id()
+        self.assertEqual(list(Loaded.changes.history(id)[0]), list(Parsed.changes.history(id)[0]))
+        self.assertEqual(Loaded.changes.history(id)[1], Parsed.changes.history(id)[1])
+
+    def test_stale_index_is_rebuilt(self):
+
+        VCD_Parser(self.vcd_file, VCD_Type.Standard, index=True)
+
+        with open(self.vcd_file, "a") as VCDFILE:
+            VCDFILE.write("#554970\n0L$\n")
+
+        Reparsed = VCD_Parser(self.vcd_file, VCD_Type.Standard, index=True)
+        self.assertEqual(Reparsed.changes.timestamps[-1], 554970)
+        self.assertEqual(Reparsed.changes.value_at("L$", 554970), "0")
+
+class TestCompressedInput(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+        with open(WIKI_FILE, "rb") as VCDFILE:
+            contents = VCDFILE.read()
+
+        # misleading suffixes: the codec is detected from the magic bytes
+        self.files = dict()
+        for name, codec in [("gzip", gzip), ("xz", lzma), ("bz2", bz2)]:
+            self.files[name] = os.path.join(self.directory, f"wikipedia_{name}.vcd")
+            with open(self.files[name], "wb") as DUMPFILE:
+                DUMPFILE.write(codec.compress(contents))
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_compressed_matches_plain(self):
+
+        Plain = VCD_Parser(WIKI_FILE, VCD_Type.Standard)
+
+        for name, filename in self.files.items():
+
+            Compressed = VCD_Parser(filename, VCD_Type.Standard)
+            self.assertEqual(Compressed.compression, name)
+            self.assertEqual(Compressed.raw_sections, Plain.raw_sections)
+            self.assertEqual(Compressed.changes.timestamps, Plain.changes.timestamps)
+            self.assertEqual(Compressed.find_signals_histories(["logic/data"]), Plain.find_signals_histories(["logic/data"]))
+            self.assertEqual(list(Compressed.stream_value_changes()), list(Plain.stream_value_changes()))
+
+            with self.assertRaises(ValueError):
+                Compressed.mapped
+
+    def test_compressed_index(self):
+
+        Parsed = VCD_Parser(self.files["gzip"], VCD_Type.Standard, index=True)
+        Loaded = VCD_Parser(self.files["gzip"], VCD_Type.Standard, index=True)
+
+        self.assertEqual(Loaded.raw_sections[Section.Value_Change], [])
+        self.assertEqual(list(Loaded.changes.timestamps), list(Parsed.changes.timestamps))
+
+class TestFollowMode(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.vcd_file = os.path.join(self.directory, "running.vcd")
+
+        with open(WIKI_FILE) as VCDFILE:
+            lines = VCDFILE.readlines()
+
+        split = next(index for index, line in enumerate(lines) if "$enddefinitions" in line) + 1
+        self.definitions, self.value_changes = lines[:split], lines[split:]
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_follow_appended_changes(self):
+
+        with open(self.vcd_file, "w") as VCDFILE:
+            VCDFILE.writelines(self.definitions)
+
+        Followed = VCD_Parser(self.vcd_file, VCD_Type.Standard, follow=True)
+        self.assertEqual(len(Followed.changes.timestamps), 0)
+
+        recorder = ValueChangeConsumer()
+        recorder.events = list()
+        recorder.on_change = lambda timestamp, id, value : recorder.events.append((timestamp, id, value))
+
+        # the simulator writes the rest of the file in chunks, possibly cutting lines in half
+        contents = "".join(self.value_changes)
+        for start in range(0, len(contents), 7):
+            with open(self.vcd_file, "a") as VCDFILE:
+                VCDFILE.write(contents[start : start + 7])
+            Followed.poll(recorder)
+
+        Followed.poll(recorder, final=True)
+
+        Complete = VCD_Parser(WIKI_FILE, VCD_Type.Standard)
+        self.assertEqual(list(Followed.changes.timestamps), list(Complete.changes.timestamps))
+        self.assertEqual(Followed.find_signals_histories(["logic/data"]), Complete.find_signals_histories(["logic/data"]))
+        self.assertEqual(recorder.events, [event for event in Complete.stream_value_changes() if event[1] is not None])
+
+    def test_follow_bounded_chunks(self):
+
+        with open(self.vcd_file, "w") as VCDFILE:
+            VCDFILE.writelines(self.definitions + self.value_changes[:len(self.value_changes) // 2])
+
+        # chunks far smaller than the lines : the markers and the lines straddle the chunk boundaries
+        with mock.patch("VCD_Parser.FOLLOW_CHUNK", 5):
+
+            Followed = VCD_Parser(self.vcd_file, VCD_Type.Standard, follow=True)
+
+            with open(self.vcd_file, "a") as VCDFILE:
+                VCDFILE.writelines(self.value_changes[len(self.value_changes) // 2:])
+
+            Followed.poll()
+            Followed.poll(final=True)
+
+        Complete = VCD_Parser(WIKI_FILE, VCD_Type.Standard)
+        self.assertEqual(list(Followed.changes.timestamps), list(Complete.changes.timestamps))
+        self.assertEqual(Followed.find_signals_histories(["logic/data", "logic/tx_en"]), Complete.find_signals_histories(["logic/data", "logic/tx_en"]))
+
+    def test_follow_until_idle(self):
+
+        with open(self.vcd_file, "w") as VCDFILE:
+            VCDFILE.writelines(self.definitions + self.value_changes)
+
+        Followed = VCD_Parser(self.vcd_file, VCD_Type.Standard, follow=True)
+        Followed.follow(interval=0.01, idle_timeout=0.05)
+
+        Complete = VCD_Parser(WIKI_FILE, VCD_Type.Standard)
+        self.assertEqual(list(Followed.changes.timestamps), list(Complete.changes.timestamps))
+
+class TestAsyncAPI(unittest.TestCase):
+
+    def test_open_async(self):
+
+        async def _open_many(executor):
+            return await asyncio.gather(
+                VCD_Parser.open_async(WIKI_FILE, VCD_Type.Standard, executor=executor),
+                VCD_Parser.open_async("../misc/branch_unit.vcd", VCD_Type.Standard, executor=executor)
+            )
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            wiki, branch_unit = asyncio.run(_open_many(executor))
+
+        for Opened, vcd_file in [(wiki, WIKI_FILE), (branch_unit, "../misc/branch_unit.vcd")]:
+            Parsed = VCD_Parser(vcd_file, VCD_Type.Standard)
+            self.assertTrue(Opened._loaded)
+            self.assertEqual(list(Opened.changes.timestamps), list(Parsed.changes.timestamps))
+            self.assertEqual(Opened.changes.values, Parsed.changes.values)
+
+    def test_async_queries(self):
+
+        async def _query():
+            Lazy = await VCD_Parser.open_async(WIKI_FILE, VCD_Type.Standard, lazy=True)
+            histories = await Lazy.find_signals_histories_async(["logic/data"])
+            self.assertFalse(Lazy._loaded)
+            value = await Lazy.query_async(Lazy.get_signal, "logic/data")
+            return histories, value, Lazy._loaded
+
+        histories, signal, loaded = asyncio.run(_query())
+        Parsed = VCD_Parser(WIKI_FILE, VCD_Type.Standard)
+
+        self.assertEqual(histories, Parsed.find_signals_histories(["logic/data"]))
+        self.assertEqual(signal.get_id(), "#")
+        self.assertTrue(loaded)
+
+    def test_concurrent_loads(self):
+
+        Lazy = VCD_Parser(WIKI_FILE, VCD_Type.Standard, lazy=True)
+        started, release = threading.Event(), threading.Event()
+        load = Lazy._load_value_changes
+
+        def _slow_load():
+            started.set()
+            release.wait()
+            load()
+
+        Lazy._load_value_changes = _slow_load
+
+        loader = threading.Thread(target=Lazy.load_value_changes)
+        loader.start()
+        started.wait()
+
+        # a load in progress is not reported as loaded
+        self.assertFalse(Lazy._loaded)
+
+        async def _load_async():
+            task = asyncio.ensure_future(Lazy.load_value_changes_async())
+            await asyncio.sleep(0.05)
+            release.set()
+            await task
+
+        asyncio.run(_load_async())
+        loader.join()
+
+        # the async load waited for the sync one and kept its (complete) store
+        Parsed = VCD_Parser(WIKI_FILE, VCD_Type.Standard)
+        self.assertTrue(Lazy._loaded)
+        self.assertEqual(list(Lazy.changes.timestamps), list(Parsed.changes.timestamps))
+        self.assertEqual(Lazy.raw_sections[Section.Value_Change], Parsed.raw_sections[Section.Value_Change])
+
+class TestWaveDiff(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.golden = "../misc/branch_unit.vcd"
+        self.faulty = os.path.join(self.directory, "faulty.vcd")
+
+        # stuck-at-0 on the first rising edge of branch_exec_done
+        with open(self.golden, "rb") as VCDFILE, open(self.faulty, "wb") as FAULTYFILE:
+            FAULTYFILE.write(VCDFILE.read().replace(b"\n1N$", b"\n0N$", 1))
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_identical_dumps(self):
+
+        Golden = VCD_Parser(self.golden, VCD_Type.Standard, lazy=True)
+        report = Golden.diff(VCD_Parser(self.golden, VCD_Type.Standard, lazy=True))
+
+        self.assertTrue(report.identical())
+        self.assertEqual(report.mismatches, 0)
+        self.assertEqual(len(report.signals), len(Golden.hierarchy.paths))
+
+    def test_first_divergence(self):
+
+        Golden = VCD_Parser(self.golden, VCD_Type.Standard, lazy=True)
+        Faulty = VCD_Parser(self.faulty, VCD_Type.Standard, lazy=True)
+
+        path = "uBranchExecuteUnit/branch_exec_done"
+        times, values = Golden.find_signals_histories([path])[path]
+        rising = times[values.index("1")]
+
+        report = Golden.diff(Faulty)
+        self.assertEqual(report.first_mismatch, rising)
+        self.assertEqual(report.mismatches, 1)
+        self.assertEqual(len(report.mismatching()), 1)
+        self.assertTrue(report.mismatching()[0].path.endswith(path))
+        self.assertFalse(report.stopped)
+
+        report = Golden.diff(Faulty, signals=[path], stop_at_first=True)
+        self.assertEqual(report.first_mismatch, rising)
+        self.assertTrue(report.stopped)
+
+    def test_diff_loaded_and_columnar(self):
+
+        Golden = VCD_Parser(self.golden, VCD_Type.Standard, lazy=True)
+        Faulty = VCD_Parser(self.faulty, VCD_Type.Standard)
+
+        columnar = os.path.join(self.directory, "faulty.col")
+        Faulty.export_columnar(columnar)
+        Columnar = VCD_Parser.load_columnar(columnar)
+
+        # the loaded and the columnar dumps are replayed from their stores, without any file
+        streamed = Golden.diff(VCD_Parser(self.faulty, VCD_Type.Standard, lazy=True))
+        Loaded = VCD_Parser(self.golden, VCD_Type.Standard)
+
+        with mock.patch.object(VCD_Parser, "stream_value_changes", side_effect=AssertionError("no file expected")):
+            for report in [Faulty.diff(Columnar), Columnar.diff(Columnar)]:
+                self.assertTrue(report.identical())
+
+            loaded = Loaded.diff(Columnar)
+
+        self.assertEqual(loaded.first_mismatch, streamed.first_mismatch)
+        self.assertEqual(loaded.mismatches, streamed.mismatches)
+        self.assertEqual([diff.path for diff in loaded.mismatching()], [diff.path for diff in streamed.mismatching()])
+
+class TestSwitchingActivity(unittest.TestCase):
+
+    def test_switching_activity(self):
+
+        TestObject = VCD_Parser(WIKI_FILE, VCD_Type.Standard)
+        activity = TestObject.switching_activity()
+
+        # data : b10000011 at #0, b0 at #2296, the file ends at #2302
+        data = activity.of(TestObject.get_signal("logic/data").get_id())
+        self.assertEqual(data[0], (1, 6, 2296, 0))
+        self.assertEqual(data[2], (0, 2302, 0, 0))
+        self.assertEqual(activity.totals(TestObject.get_signal("logic/tx_en").get_id()), (1, 91, 2211, 0))
+
+        # the window clips both the time and the toggles
+        windowed = TestObject.switching_activity(start=2200, end=2300)
+        self.assertEqual(windowed.of(TestObject.get_signal("logic/data").get_id())[0], (1, 4, 96, 0))
+
+        Lazy = VCD_Parser(WIKI_FILE, VCD_Type.Standard, lazy=True)
+        self.assertEqual(Lazy.activity_per_scope(), TestObject.activity_per_scope())
+        self.assertEqual(Lazy.activity_per_scope(scope="logic")[Lazy.hierarchy.scope_paths.index("logic")][0], 8)
+        self.assertFalse(Lazy._loaded)
+
+    def test_write_saif(self):
+
+        TestObject = VCD_Parser(WIKI_FILE, VCD_Type.Standard, lazy=True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "wikipedia.saif")
+            TestObject.write_saif(filename)
+            with open(filename) as SAIFFILE:
+                saif = SAIFFILE.read()
+
+        self.assertIn("(TIMESCALE 1 ps)", saif)
+        self.assertIn("(DURATION 2302)", saif)
+        self.assertIn("(INSTANCE logic", saif)
+        self.assertIn("(data\\[7\\]\n      (T0 6) (T1 2296) (TX 0)\n      (TC 1) (IG 0)", saif)
+        self.assertEqual(saif.count("(TC "), 14)
+        self.assertEqual(saif.count("("), saif.count(")"))
+
+    def test_activity_reentered_scope(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            filename = os.path.join(directory, "reentered.vcd")
+            with open(filename, "w") as VCDFILE:
+                VCDFILE.write("\n".join([
+                    "$timescale 1ns $end",
+                    "$scope module top $end",
+                    "$scope module u0 $end", "$var wire 1 ! a $end", "$upscope $end",
+                    "$scope module u0 $end", "$var wire 2 \" b $end", "$upscope $end",
+                    "$upscope $end",
+                    "$enddefinitions $end",
+                    "#0", "0!", "b00 \"", "#10", "1!", "b11 \"", "#20", ""
+                ]))
+
+            TestObject = VCD_Parser(filename, VCD_Type.Standard)
+
+        # both u0 share their path, each one keeps its own totals
+        self.assertEqual(TestObject.hierarchy.scope_paths, ["top", "top/u0", "top/u0"])
+        self.assertEqual(TestObject.activity_per_scope(), { 0 : (3, 30, 30, 0), 1 : (1, 10, 10, 0), 2 : (2, 20, 20, 0) })
+
+    def test_write_saif_bit_selects(self):
+
+        TestObject = VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard, lazy=True)
+
+        # bit-blasted nets (e.g., `warp_state_out [1]`) are parsed like any other $var
+        with open("../misc/branch_unit.vcd") as VCDFILE:
+            self.assertEqual(len(TestObject.hierarchy.paths), sum(line.startswith("$var") for line in VCDFILE))
+
+        self.assertEqual(TestObject.get_signal("uBranchExecuteUnit/warp_state_out [1]").get_id(), "!")
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "branch_unit.saif")
+            activity = TestObject.write_saif(filename)
+            with open(filename) as SAIFFILE:
+                saif = SAIFFILE.read()
+
+        self.assertIn("(warp_state_out\\[1\\]\n", saif)
+        self.assertIn("(stack_mem\\[31\\]\\[65\\]\n", saif)
+        self.assertEqual(saif.count("(TC "), len(activity.states))
+
+class TestSlicer(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_write_slice(self):
+
+        Original = VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard)
+        start, end = Original.changes.timestamps[100], Original.changes.timestamps[-100]
+        signals = ["uBranchExecuteUnit/branch_exec_done", "uBranchExecuteUnit/warp_div_grant_in"]
+
+        filename = os.path.join(self.directory, "slice.vcd")
+        Original.write_slice(filename, start, end, signals=signals)
+
+        Slice = VCD_Parser(filename, VCD_Type.Standard)
+        self.assertEqual(len(Slice.hierarchy.paths), 2)
+        self.assertEqual(Slice.changes.timestamps[0], start)
+        self.assertLessEqual(Slice.changes.timestamps[-1], end)
+
+        for signal in signals:
+            original_id, slice_id = Original.get_signal(signal).get_id(), Slice.get_signal(signal).get_id()
+            for at in Original.changes.timestamps:
+                if start <= at <= end:
+                    self.assertEqual(Slice.changes.value_at(slice_id, at), Original.changes.value_at(original_id, at))
+
+        # the streamed (lazy) and the seeking (loaded) slicers write the same file
+        streamed = os.path.join(self.directory, "streamed.vcd")
+        VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard, lazy=True).write_slice(streamed, start, end, signals=signals)
+
+        with open(filename) as SLICEFILE, open(streamed) as STREAMEDFILE:
+            self.assertEqual(SLICEFILE.read(), STREAMEDFILE.read())
+
+    def test_write_slice_columnar_and_filtered(self):
+
+        Original = VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard)
+        start, end = Original.changes.timestamps[100], Original.changes.timestamps[-100]
+        signals = ["uBranchExecuteUnit/branch_exec_done", "uBranchExecuteUnit/warp_div_grant_in"]
+
+        expected = os.path.join(self.directory, "expected.vcd")
+        Original.write_slice(expected, start, end, signals=signals)
+
+        # no file to seek into: replayed from the store
+        columnar = os.path.join(self.directory, "branch_unit.col")
+        Original.export_columnar(columnar)
+        sliced = os.path.join(self.directory, "columnar.vcd")
+        VCD_Parser.load_columnar(columnar).write_slice(sliced, start, end, signals=signals)
+
+        # warp_div_grant_in is outside the sig_file: streamed from the file rather than written as x
+        sig_file = os.path.join(self.directory, "si.txt")
+        with open(sig_file, "w") as SIGFILE:
+            SIGFILE.write(signals[0] + "\n")
+
+        filtered = os.path.join(self.directory, "filtered.vcd")
+        VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard, sig_file=sig_file, filtered=True).write_slice(filtered, start, end, signals=signals)
+
+        # the store does not keep the order of the changes within a timestamp: compare the parsed slices
+        Expected = VCD_Parser(expected, VCD_Type.Standard)
+
+        for filename in [sliced, filtered]:
+            Slice = VCD_Parser(filename, VCD_Type.Standard)
+            self.assertEqual(Slice.raw_sections, Expected.raw_sections)
+            self.assertEqual(Slice.changes.timestamps, Expected.changes.timestamps)
+            self.assertEqual(Slice.find_signals_histories(signals), Expected.find_signals_histories(signals))
+
+    def test_write_slice_scope(self):
+
+        Original = VCD_Parser(WIKI_FILE, VCD_Type.Standard, lazy=True)
+
+        filename = os.path.join(self.directory, "slice.vcd")
+        Original.write_slice(filename, 1000, 2300, scopes=["logic"])
+
+        Slice = VCD_Parser(filename, VCD_Type.Standard)
+        self.assertEqual(list(Slice.hierarchy.paths), list(Original.hierarchy.paths))
+        self.assertEqual(list(Slice.changes.timestamps), [1000, 2211, 2296])
+        self.assertEqual(Slice.changes.value_at(Slice.get_signal("logic/data").get_id(), 1000), "10000011")
+        self.assertEqual(Slice.changes.value_at(Slice.get_signal("logic/data").get_id(), 2296), "0")
+
+class RecordingObserver(ProgressObserver):
+
+    def __init__(self):
+        self.events = list()
+
+    def on_phase_start(self, phase):
+        self.events.append(("start", phase))
+
+    def on_progress(self, phase, done, total):
+        self.events.append(("progress", phase, done, total))
+
+    def on_phase_end(self, phase, stats):
+        self.events.append(("end", phase))
+
+class TestParseStats(unittest.TestCase):
+
+    def test_phases_and_counters(self):
+
+        Parsed = VCD_Parser("../misc/branch_unit.vcd", VCD_Type.Standard)
+        stats = Parsed.stats
+
+        self.assertEqual(list(stats.phases), ["header", "hierarchy", "value_changes"])
+        self.assertTrue(all(phase.calls == 1 and phase.wall >= 0 for phase in stats.phases.values()))
+        self.assertEqual(stats.counters["bytes"], os.path.getsize("../misc/branch_unit.vcd"))
+        self.assertEqual(stats.counters["lines"], sum(len(lines) for lines in Parsed.raw_sections.values()))
+        self.assertEqual(stats.counters["timestamps"], len(Parsed.changes.timestamps))
+        self.assertEqual(stats.counters["changes"], sum(len(times) for times in Parsed.changes.times.values()))
+        self.assertEqual(stats.counters["vars"], len(Parsed.hierarchy.paths))
+        self.assertEqual(stats.counters["scopes"], len(Parsed.hierarchy.scopes))
+        self.assertEqual(set(stats.as_dict()), {"phases", "counters", "peak_rss"})
+
+        if sys.platform.startswith("linux"):
+            self.assertGreater(stats.peak_rss, 0)
+
+    def test_progress_observer(self):
+
+        observer = RecordingObserver()
+        Parsed = VCD_Parser(WIKI_FILE, VCD_Type.Standard, progress=observer)
+
+        phases = [event[1] for event in observer.events if event[0] == "start"]
+        self.assertEqual(phases, ["header", "hierarchy", "value_changes"])
+        self.assertEqual(observer.events[-1], ("end", "value_changes"))
+
+        _, phase, done, total = observer.events[-2]
+        self.assertEqual(phase, "value_changes")
+        self.assertEqual(done, total)
+        self.assertEqual(total, os.path.getsize(WIKI_FILE) - Parsed.value_change_offset)
+
+    def test_stream_phase(self):
+
+        observer = RecordingObserver()
+        Lazy = VCD_Parser(WIKI_FILE, VCD_Type.Standard, lazy=True, progress=observer)
+        Lazy.feed(ValueChangeConsumer())
+
+        self.assertEqual(list(Lazy.stats.phases), ["header", "hierarchy", "stream"])
+        self.assertIn(("end", "stream"), observer.events)
+
+        # the lazy load of the value changes is a phase of its own
+        Lazy.changes
+        self.assertEqual(Lazy.stats.counters["timestamps"], len(Lazy.changes.timestamps))
+        self.assertIn("value_changes", Lazy.stats.phases)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file